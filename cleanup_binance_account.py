@@ -6,9 +6,19 @@
 """
 
 import asyncio
+import json
 import logging
-from exchange_interface import ExchangeInterface
-from config import Config
+import websockets
+from exchange_interface import ExchangeInterface, TokenBucket
+from config import Config, config
+
+# ccxt.pro提供WebSocket下单通道（比REST逐单下单少一次握手+RTT），不可用时退回REST
+try:
+    import ccxt.pro as ccxtpro
+    CCXT_PRO_AVAILABLE = True
+except ImportError:
+    ccxtpro = None
+    CCXT_PRO_AVAILABLE = False
 
 # 配置日志
 logging.basicConfig(
@@ -17,70 +27,165 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+class UserDataStream:
+    """用户数据流：通过listenKey的WebSocket推送维护挂单状态，免去确认时的REST轮询"""
+
+    def __init__(self, exchange_interface: ExchangeInterface):
+        self.exchange = exchange_interface
+        self.open_orders = {}  # order_id -> 订单信息
+        self.connected = False
+        self._task = None
+
+    async def start(self):
+        """获取listenKey并在后台维持用户数据流连接"""
+        listen_key = await self.exchange.get_listen_key()
+        if not listen_key:
+            logger.warning("⚠️  无法获取listenKey，确认步骤将退回REST查询")
+            return False
+
+        # 用一次REST查询作为初始快照，之后完全靠推送维护
+        orders = await self.exchange.fetch_open_orders()
+        self.open_orders = {order['id']: order for order in orders}
+
+        self._task = asyncio.create_task(self._run(listen_key))
+        return True
+
+    async def _run(self, listen_key):
+        url = f"{config.WEBSOCKET_URL}/{listen_key}"
+        try:
+            async with websockets.connect(url, ping_interval=20, ping_timeout=10) as ws:
+                self.connected = True
+                logger.info("✅ 用户数据流连接成功")
+                async for message in ws:
+                    self._handle_event(json.loads(message))
+        except Exception as e:
+            logger.warning("⚠️  用户数据流断开: %s", e)
+        finally:
+            self.connected = False
+
+    def _handle_event(self, data):
+        """根据ORDER_TRADE_UPDATE事件增删内存中的挂单记录"""
+        if data.get('e') != 'ORDER_TRADE_UPDATE':
+            return
+        order_data = data.get('o', {})
+        order_id = str(order_data.get('i'))
+        status = order_data.get('X')
+        if status in ('FILLED', 'CANCELED', 'EXPIRED', 'REJECTED'):
+            self.open_orders.pop(order_id, None)
+        elif status in ('NEW', 'PARTIALLY_FILLED'):
+            self.open_orders[order_id] = order_data
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
 class BinanceAccountCleaner:
-    def __init__(self):
-        """初始化币安账户清理器"""
-        self.exchange = ExchangeInterface()
-        
+    def __init__(self, exchange_interface=None):
+        """初始化币安账户清理器
+
+        Args:
+            exchange_interface: 已初始化的交易所接口；传入时复用其连接
+                与缓存（由调用方负责关闭），不传时自建
+        """
+        self.exchange = exchange_interface or ExchangeInterface()
+        self._owns_exchange = exchange_interface is None
+        self.user_stream = UserDataStream(self.exchange)
+        self.exchange_pro = None  # 懒加载的ccxt.pro实例，持有WebSocket下单连接
+        # 下单/撤单限速：币安合约300单/10秒=30/s，留安全边际取25/s
+        self.order_bucket = TokenBucket(rate_per_sec=25)
+
+    def _get_pro_exchange(self):
+        """懒加载ccxt.pro交易所实例（持久WebSocket交易连接）"""
+        if self.exchange_pro is None and CCXT_PRO_AVAILABLE:
+            self.exchange_pro = ccxtpro.binance({
+                'apiKey': config.API_KEY,
+                'secret': config.API_SECRET,
+                'enableRateLimit': True,
+                'options': {'defaultType': 'future'},
+            })
+        return self.exchange_pro
+
     async def get_all_open_orders(self):
         """获取所有挂单"""
         try:
             logger.info("📋 正在获取所有挂单...")
-            orders = self.exchange.fetch_open_orders()
-            logger.info(f"📊 找到 {len(orders)} 个挂单")
+            orders = await self.exchange.fetch_open_orders()
+            logger.info("📊 找到 %d 个挂单", len(orders))
             
             if orders:
                 logger.info("\n=== 当前挂单列表 ===")
                 for order in orders:
-                    logger.info(f"订单ID: {order['id']}, 交易对: {order['symbol']}, "
-                              f"类型: {order['side']}, 数量: {order['amount']}, "
-                              f"价格: {order['price']}, 状态: {order['status']}")
+                    logger.info("订单ID: %s, 交易对: %s, 类型: %s, 数量: %s, 价格: %s, 状态: %s",
+                              order['id'], order['symbol'], order['side'],
+                              order['amount'], order['price'], order['status'])
                 logger.info("=" * 50)
             
             return orders
         except Exception as e:
-            logger.error(f"❌ 获取挂单失败: {e}")
+            logger.error("❌ 获取挂单失败: %s", e)
             return []
     
     async def cancel_all_orders(self):
-        """撤销所有挂单"""
+        """撤销所有挂单：优先按交易对批量撤单，失败时并发逐单撤销"""
         try:
             orders = await self.get_all_open_orders()
             if not orders:
                 logger.info("✅ 没有需要撤销的挂单")
                 return True
-            
-            logger.info(f"🔄 开始撤销 {len(orders)} 个挂单...")
-            success_count = 0
-            failed_count = 0
-            
+
+            logger.info("🔄 开始撤销 %d 个挂单...", len(orders))
+
+            # 按交易对分组，每个交易对一次批量撤单REST调用，代替N次逐单撤销
+            orders_by_symbol = {}
             for order in orders:
-                try:
-                    self.exchange.cancel_order(
-                        order_id=order['id'],
-                        symbol=order['symbol']
-                    )
-                    logger.info(f"✅ 成功撤销订单: {order['id']} ({order['symbol']})")
-                    success_count += 1
-                    await asyncio.sleep(0.1)  # 避免请求过于频繁
-                except Exception as e:
-                    logger.error(f"❌ 撤销订单失败 {order['id']}: {e}")
-                    failed_count += 1
-            
-            logger.info(f"\n📊 撤销结果: 成功 {success_count} 个, 失败 {failed_count} 个")
+                orders_by_symbol.setdefault(order['symbol'], []).append(order)
+
+            remaining_orders = []
+            for symbol, symbol_orders in orders_by_symbol.items():
+                batch_ok = await self.exchange.cancel_all_orders(symbol)
+                if batch_ok:
+                    logger.info("✅ 批量撤销 %s 挂单 %d 个", symbol, len(symbol_orders))
+                else:
+                    remaining_orders.extend(symbol_orders)
+
+            # 批量接口不可用时的回退：并发逐单撤销，用信号量限制在途请求数
+            failed_count = 0
+            if remaining_orders:
+                logger.info("🔄 批量撤单不可用，并发逐单撤销 %d 个挂单...", len(remaining_orders))
+                semaphore = asyncio.Semaphore(8)
+
+                async def _cancel_one(order):
+                    async with semaphore:
+                        try:
+                            await self.order_bucket.acquire()
+                            await self.exchange.cancel_order(order['id'], order['symbol'])
+                            logger.info("✅ 成功撤销订单: %s (%s)", order['id'], order['symbol'])
+                            return True
+                        except Exception as e:
+                            logger.error("❌ 撤销订单失败 %s: %s", order['id'], e)
+                            return False
+
+                results = await asyncio.gather(*[_cancel_one(o) for o in remaining_orders])
+                failed_count = sum(1 for ok in results if not ok)
+
+            success_count = len(orders) - failed_count
+            logger.info("\n📊 撤销结果: 成功 %d 个, 失败 %d 个", success_count, failed_count)
             return failed_count == 0
-            
+
         except Exception as e:
-            logger.error(f"❌ 撤销挂单过程出错: {e}")
+            logger.error("❌ 撤销挂单过程出错: %s", e)
             return False
     
     async def get_account_positions(self):
         """获取账户持仓信息"""
         try:
             logger.info("📋 正在获取账户持仓信息...")
-            # 获取持仓信息
-            long_pos, short_pos = self.exchange.get_position()
-            logger.info(f"📊 当前持仓: 多头 {long_pos}, 空头 {short_pos}")
+            long_pos, short_pos = await self.exchange.get_position()
+            logger.info("📊 当前持仓: 多头 %s, 空头 %s", long_pos, short_pos)
             
             positions = []
             if long_pos != 0:
@@ -96,19 +201,19 @@ class BinanceAccountCleaner:
                     'symbol': 'XRP/USDT'
                 })
             
-            logger.info(f"📊 找到 {len(positions)} 个持仓")
+            logger.info("📊 找到 %d 个持仓", len(positions))
             
             if positions:
                 logger.info("\n=== 当前持仓状态 ===")
                 for pos in positions:
-                    logger.info(f"交易对: {pos['symbol']}, 方向: {pos['side']}, "
-                              f"数量: {pos['size']}")
+                    logger.info("交易对: %s, 方向: %s, 数量: %s",
+                              pos['symbol'], pos['side'], pos['size'])
                 logger.info("=" * 50)
             
             return positions
             
         except Exception as e:
-            logger.error(f"❌ 获取持仓信息失败: {e}")
+            logger.error("❌ 获取持仓信息失败: %s", e)
             return []
     
     async def close_all_positions(self, positions):
@@ -123,36 +228,50 @@ class BinanceAccountCleaner:
                     side = 'sell' if pos['side'] == 'long' else 'buy'
                     quantity = pos['size']
                     
-                    logger.info(f"📤 平仓 {pos['symbol']} {pos['side']} {quantity}")
-                    
-                    # 使用市价单平仓
-                    order = self.exchange.place_order(
-                        side=side,
-                        price=None,  # 市价单
-                        quantity=quantity,
-                        is_reduce_only=True,
-                        position_side=pos['side'],
-                        order_type='market'
-                    )
-                    
+                    logger.info("📤 平仓 %s %s %s", pos['symbol'], pos['side'], quantity)
+
+                    # 令牌桶限速代替固定sleep：有余量时零等待
+                    await self.order_bucket.acquire()
+
+                    # 优先走WebSocket下单通道，失败或不可用时退回REST
+                    order = None
+                    pro = self._get_pro_exchange()
+                    if pro is not None:
+                        try:
+                            order = await pro.create_order_ws(
+                                config.get_ccxt_symbol(), 'market', side, quantity, None,
+                                {'reduceOnly': True, 'positionSide': pos['side'].upper()}
+                            )
+                        except Exception as e:
+                            logger.warning("⚠️  WebSocket下单失败，退回REST: %s", e)
+
+                    if order is None:
+                        # 使用市价单平仓
+                        order = await self.exchange.place_order(
+                            side,
+                            None,  # 市价单
+                            quantity,
+                            True,
+                            pos['side'],
+                            'market'
+                        )
+
                     if order:
-                        logger.info(f"✅ 成功平仓: {pos['symbol']} {pos['side']} {quantity}")
+                        logger.info("✅ 成功平仓: %s %s %s", pos['symbol'], pos['side'], quantity)
                         success_count += 1
                     else:
-                        logger.error(f"❌ 平仓失败: {pos['symbol']} {pos['side']} {quantity}")
+                        logger.error("❌ 平仓失败: %s %s %s", pos['symbol'], pos['side'], quantity)
                         failed_count += 1
-                    
-                    await asyncio.sleep(0.5)  # 避免请求过于频繁
-                    
+
                 except Exception as e:
-                    logger.error(f"❌ 平仓操作失败 {pos['symbol']} {pos['side']}: {e}")
+                    logger.error("❌ 平仓操作失败 %s %s: %s", pos['symbol'], pos['side'], e)
                     failed_count += 1
             
-            logger.info(f"\n📊 平仓结果: 成功 {success_count} 个, 失败 {failed_count} 个")
+            logger.info("\n📊 平仓结果: 成功 %d 个, 失败 %d 个", success_count, failed_count)
             return failed_count == 0
             
         except Exception as e:
-            logger.error(f"❌ 平仓过程出错: {e}")
+            logger.error("❌ 平仓过程出错: %s", e)
             return False
     
     async def check_futures_positions(self):
@@ -164,7 +283,7 @@ class BinanceAccountCleaner:
             logger.info("ℹ️  合约持仓检查需要额外的API权限，请手动检查")
             return []
         except Exception as e:
-            logger.info(f"ℹ️  无法检查合约持仓（可能没有合约权限）: {e}")
+            logger.info("ℹ️  无法检查合约持仓（可能没有合约权限）: %s", e)
             return []
     
     async def cleanup_account(self):
@@ -175,29 +294,34 @@ class BinanceAccountCleaner:
         logger.info("\n🔄 步骤1: 撤销所有挂单")
         cancel_success = await self.cancel_all_orders()
         
-        # 2. 检查持仓状态
-        logger.info("\n📊 步骤2: 检查现货持仓")
-        positions = await self.get_account_positions()
-        
-        # 3. 检查合约持仓
-        logger.info("\n📊 步骤3: 检查合约持仓")
-        futures_positions = await self.check_futures_positions()
-        
-        # 4. 再次确认没有挂单
-        logger.info("\n🔍 步骤4: 最终确认挂单状态")
-        final_orders = await self.get_all_open_orders()
+        # 2-4. 持仓检查、合约持仓检查和挂单最终确认互相独立，并发发出，
+        # 把3次串行RTT压缩为1次。挂单确认优先读用户数据流内存快照（零RTT）
+        logger.info("\n📊 步骤2-4: 并发检查持仓、合约持仓和剩余挂单")
+        if self.user_stream.connected:
+            positions, futures_positions = await asyncio.gather(
+                self.get_account_positions(),
+                self.check_futures_positions()
+            )
+            final_orders = list(self.user_stream.open_orders.values())
+            logger.info("📊 用户数据流确认剩余挂单: %d 个", len(final_orders))
+        else:
+            positions, futures_positions, final_orders = await asyncio.gather(
+                self.get_account_positions(),
+                self.check_futures_positions(),
+                self.get_all_open_orders()
+            )
         
         # 总结
         logger.info("\n" + "=" * 60)
         logger.info("📋 === 清理结果汇总 ===")
-        logger.info(f"✅ 挂单撤销: {'成功' if cancel_success else '部分失败'}")
-        logger.info(f"📊 剩余挂单: {len(final_orders)} 个")
-        logger.info(f"💰 合约持仓: {len(positions)} 个持仓")
+        logger.info("✅ 挂单撤销: %s", '成功' if cancel_success else '部分失败')
+        logger.info("📊 剩余挂单: %d 个", len(final_orders))
+        logger.info("💰 合约持仓: %d 个持仓", len(positions))
         
         if positions:
             logger.info("\n⚠️  注意: 以下持仓仍存在，需要平仓:")
             for pos in positions:
-                logger.info(f"   - {pos['symbol']} {pos['side']}: {pos['size']}")
+                logger.info("   - %s %s: %s", pos['symbol'], pos['side'], pos['size'])
             
             # 自动平仓所有持仓
             logger.info("\n💡 自动平掉所有持仓...")
@@ -209,31 +333,50 @@ class BinanceAccountCleaner:
         logger.info("=" * 60)
         return cancel_success and len(final_orders) == 0
 
-async def main():
-    """主函数"""
-    cleaner = BinanceAccountCleaner()
-    
+async def run_cleanup(exchange_interface=None):
+    """清理流程的进程内入口
+
+    优雅退出管理器直接调用本函数并传入已建立的交易所接口，省掉
+    子进程的解释器启动和全新的ccxt握手；独立运行时不传参，由本
+    函数自建并负责关闭连接
+    """
+    cleaner = BinanceAccountCleaner(exchange_interface)
+    success = False
+
     try:
-        # 初始化交易所连接
-        cleaner.exchange.initialize_exchange()
-        logger.info("✅ 交易所连接初始化成功")
-        
+        # 独立运行时自建连接；注入接口时复用调用方已有的连接与缓存
+        if cleaner._owns_exchange:
+            await cleaner.exchange.initialize_exchange()
+            logger.info("✅ 交易所连接初始化成功")
+
+        # 启动用户数据流，用推送维护挂单状态
+        await cleaner.user_stream.start()
+
         # 执行清理
         success = await cleaner.cleanup_account()
-        
+
         if success:
             logger.info("\n🎉 账户清理完成！")
         else:
             logger.info("\n⚠️  账户清理部分完成，请检查上述警告信息")
-            
+
     except Exception as e:
-        logger.error(f"❌ 清理过程出错: {e}")
+        logger.error("❌ 清理过程出错: %s", e)
     finally:
-        # 关闭连接
-        if hasattr(cleaner.exchange, 'close'):
+        # 关闭连接（注入的交易所接口由调用方负责关闭）
+        await cleaner.user_stream.stop()
+        if cleaner.exchange_pro is not None:
+            await cleaner.exchange_pro.close()
+        if cleaner._owns_exchange and hasattr(cleaner.exchange, 'close'):
             await cleaner.exchange.close()
         logger.info("🔚 清理脚本执行完毕")
 
+    return success
+
+async def main():
+    """主函数"""
+    await run_cleanup()
+
 if __name__ == "__main__":
     print("🚀 币安账户清理脚本")
     print("⚠️  警告: 此脚本将自动撤销所有挂单并平掉所有持仓")
@@ -6,52 +6,67 @@
 """
 
 import os
+from dataclasses import dataclass, field
 from dotenv import load_dotenv
 
 # 加载环境变量
 load_dotenv()
 
+
+@dataclass(frozen=True, slots=True)
 class Config:
-    """配置类"""
-    
-    def __init__(self):
-        # ==================== API 配置 ====================
-        self.API_KEY = os.getenv('API_KEY', '')
-        self.API_SECRET = os.getenv('API_SECRET', '')
-        
-        # ==================== 交易配置 ====================
-        self.COIN_NAME = "XRP"  # 币种名称
-        self.CONTRACT_TYPE = "USDC"  # 合约类型：USDT 或 USDC
-        self.GRID_SPACING = 0.001  # 网格间距（0.1%）
-        self.INITIAL_QUANTITY = 3  # 初始下单数量
-        self.LEVERAGE = 15  # 杠杆倍数
-        self.TOTAL_CAPITAL = 300.0  # 总资金（USDC）
-        
-        # ==================== 风控配置 ====================
-        self.POSITION_THRESHOLD = 500  # 持仓阈值，超过此值进入保守模式
-        self.POSITION_LIMIT = 200  # 持仓数量阈值
-        self.SYNC_TIME = 10  # 同步时间（秒）
-        self.ORDER_FIRST_TIME = 10  # 首次挂单间隔时间（秒）
-        
-        # ==================== EMA+ADX 信号配置 ====================
-        self.EMA_SHORT_PERIOD = 20  # 短期EMA周期
-        self.EMA_MEDIUM_PERIOD = 50  # 中期EMA周期
-        self.EMA_LONG_PERIOD = 200  # 长期EMA周期
-        self.ADX_PERIOD = 14  # ADX计算周期
-        self.ADX_THRESHOLD = 25  # ADX强趋势阈值
-        
-        # ==================== WebSocket 配置 ====================
-        self.WEBSOCKET_URL = "wss://fstream.binance.com/ws"
-        
-        # ==================== 日志配置 ====================
-        self.LOG_LEVEL = "INFO"
-        self.LOG_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
-        self.LOG_FILE = "grid_trading.log"
-        
+    """配置类
+
+    冻结的slots数据类：属性访问走C级slot查找而不是实例__dict__，
+    且配置值在热路径上保证不可变
+    """
+
+    # ==================== API 配置 ====================
+    API_KEY: str = os.getenv('API_KEY', '')
+    API_SECRET: str = os.getenv('API_SECRET', '')
+
+    # ==================== 交易配置 ====================
+    COIN_NAME: str = "XRP"  # 币种名称
+    CONTRACT_TYPE: str = "USDC"  # 合约类型：USDT 或 USDC
+    GRID_SPACING: float = 0.001  # 网格间距（0.1%）
+    INITIAL_QUANTITY: int = 3  # 初始下单数量
+    LEVERAGE: int = 15  # 杠杆倍数
+    TOTAL_CAPITAL: float = 300.0  # 总资金（USDC）
+
+    # ==================== 风控配置 ====================
+    POSITION_THRESHOLD: int = 500  # 持仓阈值，超过此值进入保守模式
+    POSITION_LIMIT: int = 200  # 持仓数量阈值
+    SYNC_TIME: int = 10  # 同步时间（秒）
+    ORDER_FIRST_TIME: int = 10  # 首次挂单间隔时间（秒）
+
+    # ==================== EMA+ADX 信号配置 ====================
+    EMA_SHORT_PERIOD: int = 20  # 短期EMA周期
+    EMA_MEDIUM_PERIOD: int = 50  # 中期EMA周期
+    EMA_LONG_PERIOD: int = 200  # 长期EMA周期
+    ADX_PERIOD: int = 14  # ADX计算周期
+    ADX_THRESHOLD: int = 25  # ADX强趋势阈值
+
+    # ==================== WebSocket 配置 ====================
+    WEBSOCKET_URL: str = "wss://fstream.binance.com/ws"
+
+    # ==================== 日志配置 ====================
+    LOG_LEVEL: str = "INFO"
+    LOG_FORMAT: str = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+    LOG_FILE: str = "grid_trading.log"
+
+    # CCXT交易对符号，初始化时拼接一次，热路径直接读缓存值
+    _ccxt_symbol: str = field(init=False, default='')
+
+    def __post_init__(self):
+        object.__setattr__(
+            self, '_ccxt_symbol',
+            f"{self.COIN_NAME}/{self.CONTRACT_TYPE}:{self.CONTRACT_TYPE}"
+        )
+
     def get_ccxt_symbol(self):
         """获取CCXT格式的交易对符号"""
-        return f"{self.COIN_NAME}/{self.CONTRACT_TYPE}:{self.CONTRACT_TYPE}"
-    
+        return self._ccxt_symbol
+
     def print_config(self):
         """打印配置信息"""
         print("=" * 50)
@@ -69,4 +84,4 @@ class Config:
         print("=" * 50)
 
 # 创建全局配置实例
-config = Config()
\ No newline at end of file
+config = Config()
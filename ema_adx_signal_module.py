@@ -10,11 +10,94 @@ EMA+ADX信号生成模块
 import pandas as pd
 import numpy as np
 import warnings
+from collections import deque
 from datetime import datetime
 import logging
 
 warnings.filterwarnings('ignore')
 
+# Numba为可选加速依赖：存在时用JIT内核把ADX整条计算融合成单次遍历，
+# 不存在时退回纯pandas/numpy向量化实现
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+
+if NUMBA_AVAILABLE:
+    @njit(cache=True, fastmath=True)
+    def _adx_kernel(high, low, close, period):
+        """单遍历的ADX内核：TR/DM、Wilder平滑、DI、DX、ADX一次算完"""
+        n = len(close)
+        nan = np.nan
+        adx = np.full(n, nan)
+        plus_di = np.full(n, nan)
+        minus_di = np.full(n, nan)
+        dx = np.full(n, nan)
+        if n < period + 1:
+            return adx, plus_di, minus_di
+
+        # 种子：首个period窗口的简单平均（TR首位因无前收盘价而缺失）
+        tr_sum = 0.0
+        pdm_sum = 0.0
+        mdm_sum = 0.0
+        for i in range(1, period):
+            tr_i = max(high[i] - low[i], abs(high[i] - close[i-1]), abs(low[i] - close[i-1]))
+            up = high[i] - high[i-1]
+            dn = low[i-1] - low[i]
+            p = up if up > 0 else 0.0
+            m = dn if dn > 0 else 0.0
+            if p > 0 and m > 0:
+                if p <= m:
+                    p = 0.0
+                else:
+                    m = 0.0
+            tr_sum += tr_i
+            pdm_sum += p
+            mdm_sum += m
+
+        smoothed_tr = tr_sum / (period - 1)  # TR有效样本为period-1个
+        smoothed_pdm = pdm_sum / period
+        smoothed_mdm = mdm_sum / period
+        decay = 1.0 - 1.0 / period
+
+        di_sum_window = 0.0  # DX滚动和
+        dx_count = 0
+        for i in range(period - 1, n):
+            if i >= period:
+                tr_i = max(high[i] - low[i], abs(high[i] - close[i-1]), abs(low[i] - close[i-1]))
+                up = high[i] - high[i-1]
+                dn = low[i-1] - low[i]
+                p = up if up > 0 else 0.0
+                m = dn if dn > 0 else 0.0
+                if p > 0 and m > 0:
+                    if p <= m:
+                        p = 0.0
+                    else:
+                        m = 0.0
+                smoothed_tr = smoothed_tr * decay + tr_i
+                smoothed_pdm = smoothed_pdm * decay + p
+                smoothed_mdm = smoothed_mdm * decay + m
+
+            pdi = 100.0 * smoothed_pdm / smoothed_tr
+            mdi = 100.0 * smoothed_mdm / smoothed_tr
+            plus_di[i] = pdi
+            minus_di[i] = mdi
+            dx[i] = 100.0 * abs(pdi - mdi) / (pdi + mdi)
+
+            # ADX为DX的简单滚动平均
+            di_sum_window += dx[i]
+            dx_count += 1
+            if dx_count > period:
+                di_sum_window -= dx[i - period]
+                dx_count = period
+            if dx_count == period:
+                adx[i] = di_sum_window / period
+
+        return adx, plus_di, minus_di
+
+
 class EMAAdxSignalModule:
     """
     EMA+ADX信号生成模块
@@ -37,57 +120,129 @@ class EMAAdxSignalModule:
         self.ema_long = ema_long
         self.adx_period = adx_period
         self.adx_threshold = adx_threshold
+
+        # 递推常量只算一次：EMA的alpha/(1-alpha)和Wilder平滑的衰减系数
+        self._ema_alphas = {
+            period: (2.0 / (period + 1), 1.0 - 2.0 / (period + 1))
+            for period in (ema_short, ema_medium, ema_long)
+        }
+        self._wilder_decay = 1.0 - 1.0 / adx_period
         
         # 信号状态
         self.current_signal = 0  # 0: 震荡, 1: 强多, -1: 强空
         self.signal_start_time = None
         self.last_update_time = None
         
-        # 历史数据缓存
-        self.data_buffer = pd.DataFrame()
-        self.buffer_size = ema_long + 50  # 确保有足够数据计算指标，但不要过大
+        # 历史数据缓存：固定大小的NumPy环形缓冲区（按列存储），
+        # 避免每根K线pd.concat+tail带来的全量拷贝。
+        # 大小取指标预热所需的最小行数：EMA长周期需要ema_long行，
+        # ADX需要2*adx_period行（Wilder平滑+DX滚动平均各一个周期），
+        # 再加1行用于前一根K线的diff；预热完成后递推状态只有几个标量
+        self.buffer_size = max(ema_long, 2 * adx_period) + 1
+        self._buf_columns = ('open', 'high', 'low', 'close', 'volume')
+        # float32对信号判断精度绰绰有余，缓存占用和向量吞吐都比float64好一倍
+        self._buf = {col: np.empty(self.buffer_size, dtype=np.float32) for col in self._buf_columns}
+        self._ts_buf = np.empty(self.buffer_size, dtype=object)
+        self._head = 0  # 下一个写入位置
+        self._count = 0  # 当前有效行数
+
+        # 增量指标状态：缓存上一根K线的EMA和Wilder平滑值，
+        # 每根新K线只做一次递推更新（O(1)），避免全量重算整个缓冲区
+        self._incremental_ready = False
+        self._ema_values = {}  # {period: 最新EMA值}
+        self._ema20_prev = None  # 用于判断EMA20方向
+        self._smoothed_tr = None
+        self._smoothed_plus_dm = None
+        self._smoothed_minus_dm = None
+        self._dx_history = None  # deque(maxlen=adx_period)，用于ADX滚动平均
+        self._prev_high = None
+        self._prev_low = None
+        self._prev_close = None
         
         logging.info(f"EMA+ADX信号模块初始化完成 - EMA({ema_short},{ema_medium},{ema_long}) ADX({adx_period},{adx_threshold})")
     
     def calculate_ema(self, data, period):
         """计算指数移动平均线"""
         return data.ewm(span=period, adjust=False).mean()
-    
+
+    @staticmethod
+    def _wilder_smooth(series, period):
+        """向量化的Wilder平滑：s[i] = s[i-1]*(1-1/period) + x[i]
+
+        前period-1个值为NaN，第period-1位用简单平均作为种子。
+        利用 s = period * ewm(alpha=1/period, adjust=False) 的等价关系，
+        将Python循环下放到pandas的C实现中。
+        """
+        arr = series.to_numpy(dtype=float)
+        seed = np.nanmean(arr[:period])  # 与Series.mean()一致，跳过首行shift产生的NaN
+
+        # 种子放在递推序列首位，后续输入为原始值
+        recur_input = np.empty(len(arr) - period + 1, dtype=float)
+        recur_input[0] = seed / period
+        recur_input[1:] = arr[period:]
+        smoothed_tail = pd.Series(recur_input).ewm(alpha=1.0 / period, adjust=False).mean().to_numpy() * period
+
+        smoothed = np.full(len(arr), np.nan)
+        smoothed[period-1:] = smoothed_tail
+        return pd.Series(smoothed, index=series.index)
+
+    @staticmethod
+    def _compute_tr_dm(high, low, close):
+        """计算True Range和方向移动(+DM/-DM)序列"""
+        # 计算True Range (TR)：前收盘价只用numpy切片错位一次，
+        # 避免两次shift(1)各自分配并对齐一条完整Series
+        h_arr = high.to_numpy(dtype=np.float64)
+        l_arr = low.to_numpy(dtype=np.float64)
+        c_arr = close.to_numpy(dtype=np.float64)
+        prev_close = np.empty_like(c_arr)
+        prev_close[0] = np.nan
+        prev_close[1:] = c_arr[:-1]
+        tr = pd.Series(
+            np.maximum.reduce([h_arr - l_arr,
+                               np.abs(h_arr - prev_close),
+                               np.abs(l_arr - prev_close)]),
+            index=high.index
+        )
+
+        # 计算方向移动 (DM)：先截断负值，再用同一个掩码做"只保留较大的那个"的归零，
+        # 一次比较生成两个输出，避免串联多趟np.where和中间Series分配
+        up_raw = np.empty_like(h_arr)
+        up_raw[0] = np.nan
+        up_raw[1:] = h_arr[1:] - h_arr[:-1]
+        down_raw = np.empty_like(l_arr)
+        down_raw[0] = np.nan
+        down_raw[1:] = l_arr[:-1] - l_arr[1:]
+        up_move = np.where(up_raw > 0, up_raw, 0.0)
+        down_move = np.where(down_raw > 0, down_raw, 0.0)
+        plus_wins = up_move > down_move
+        plus_dm = pd.Series(np.where(plus_wins, up_move, 0.0), index=high.index)
+        minus_dm = pd.Series(np.where(~plus_wins & (down_move > 0), down_move, 0.0), index=high.index)
+
+        return tr, plus_dm, minus_dm
+
     def calculate_adx(self, high, low, close, period=14):
         """计算ADX指标 - 使用与Pine Script相同的Wilder平滑方法"""
-        # 计算True Range (TR)
-        high_low = high - low
-        high_close = np.abs(high - close.shift(1))
-        low_close = np.abs(low - close.shift(1))
-        tr = np.maximum(high_low, np.maximum(high_close, low_close))
-        
-        # 计算方向移动 (DM)
-        plus_dm = high.diff()
-        minus_dm = -low.diff()
-        
-        # 只保留正值，负值设为0
-        plus_dm = pd.Series(np.where(plus_dm > 0, plus_dm, 0), index=plus_dm.index)
-        minus_dm = pd.Series(np.where(minus_dm > 0, minus_dm, 0), index=minus_dm.index)
-        
-        # 当+DM和-DM同时为正时，只保留较大的那个
-        plus_dm = pd.Series(np.where((plus_dm > 0) & (minus_dm > 0) & (plus_dm <= minus_dm), 0, plus_dm), index=plus_dm.index)
-        minus_dm = pd.Series(np.where((plus_dm > 0) & (minus_dm > 0) & (minus_dm <= plus_dm), 0, minus_dm), index=minus_dm.index)
-        
+        if NUMBA_AVAILABLE:
+            adx, plus_di, minus_di = _adx_kernel(
+                high.to_numpy(dtype=np.float64),
+                low.to_numpy(dtype=np.float64),
+                close.to_numpy(dtype=np.float64),
+                period
+            )
+            index = close.index
+            return (pd.Series(adx, index=index),
+                    pd.Series(plus_di, index=index),
+                    pd.Series(minus_di, index=index))
+
+        tr, plus_dm, minus_dm = self._compute_tr_dm(high, low, close)
+
         # 使用Wilder平滑方法计算平滑的TR和DM（与Pine Script一致）
-        smoothed_tr = pd.Series(index=tr.index, dtype=float)
-        smoothed_plus_dm = pd.Series(index=plus_dm.index, dtype=float)
-        smoothed_minus_dm = pd.Series(index=minus_dm.index, dtype=float)
-        
-        # 初始化第一个period的值为简单平均
-        smoothed_tr.iloc[period-1] = tr.iloc[:period].mean()
-        smoothed_plus_dm.iloc[period-1] = plus_dm[:period].mean()
-        smoothed_minus_dm.iloc[period-1] = minus_dm[:period].mean()
-        
-        # 使用Wilder平滑公式：新值 = 前值 - (前值/period) + 当前值
-        for i in range(period, len(tr)):
-            smoothed_tr.iloc[i] = smoothed_tr.iloc[i-1] - (smoothed_tr.iloc[i-1] / period) + tr.iloc[i]
-            smoothed_plus_dm.iloc[i] = smoothed_plus_dm.iloc[i-1] - (smoothed_plus_dm.iloc[i-1] / period) + plus_dm.iloc[i]
-            smoothed_minus_dm.iloc[i] = smoothed_minus_dm.iloc[i-1] - (smoothed_minus_dm.iloc[i-1] / period) + minus_dm.iloc[i]
+        # 平滑公式：新值 = 前值 - (前值/period) + 当前值，即 s[i] = (1-1/p)*s[i-1] + x[i]
+        # 这是一阶IIR递推，等价于 p 倍的 ewm(alpha=1/p, adjust=False)，
+        # 把首个period的简单平均作为种子注入序列首位，即可用C级向量化代替Python循环
+        smoothed_tr = self._wilder_smooth(tr, period)
+        smoothed_plus_dm = self._wilder_smooth(plus_dm, period)
+        smoothed_minus_dm = self._wilder_smooth(minus_dm, period)
         
         # 计算DI+ 和 DI-
         plus_di = 100 * (smoothed_plus_dm / smoothed_tr)
@@ -101,34 +256,138 @@ class EMAAdxSignalModule:
         
         return adx, plus_di, minus_di
     
+    @property
+    def data_buffer(self):
+        """按时间顺序物化环形缓冲区为DataFrame（仅在全量计算时需要）"""
+        return self._get_ordered_frame()
+
+    @data_buffer.setter
+    def data_buffer(self, df):
+        """整体替换缓存数据（兼容外部直接赋值DataFrame的用法）"""
+        self._head = 0
+        self._count = 0
+        self._incremental_ready = False
+        if df is not None and len(df) > 0:
+            self._load_dataframe(df)
+
+    def _get_ordered_frame(self):
+        """把环形缓冲区展开为按写入顺序排列的DataFrame"""
+        if self._count < self.buffer_size:
+            data = {col: self._buf[col][:self._count] for col in self._buf_columns}
+            index = self._ts_buf[:self._count]
+        else:
+            # 缓冲区已满：head之后是最旧数据，head之前是最新数据
+            data = {col: np.concatenate([self._buf[col][self._head:], self._buf[col][:self._head]])
+                    for col in self._buf_columns}
+            index = np.concatenate([self._ts_buf[self._head:], self._ts_buf[:self._head]])
+        return pd.DataFrame(data, index=index)
+
+    def load_arrays(self, timestamps, open_, high, low, close, volume):
+        """用numpy列数组整批重载环形缓冲区（零pandas分配）
+
+        各数组等长且按时间升序；超出buffer_size时只保留末尾部分。
+        """
+        n = min(len(close), self.buffer_size)
+        sl = slice(len(close) - n, len(close))
+        self._buf['open'][:n] = open_[sl]
+        self._buf['high'][:n] = high[sl]
+        self._buf['low'][:n] = low[sl]
+        self._buf['close'][:n] = close[sl]
+        self._buf['volume'][:n] = volume[sl]
+        self._ts_buf[:n] = timestamps[sl]
+        self._head = n % self.buffer_size
+        self._count = n
+        self._incremental_ready = False
+
+    def merge_latest(self, timestamps, open_, high, low, close, volume):
+        """增量并入最新几根K线（同刻覆盖、新刻追加，零pandas分配）
+
+        与环形缓冲区末行按时间戳对齐：相同时刻视为当前周期未收盘的
+        K线，原地覆盖末位槽；更新的时刻追加；更旧的跳过。缓冲区为空
+        或新数据与末行之间出现断档（漏掉了整根K线）时返回False，
+        调用方应整批重载。
+        """
+        n = len(close)
+        if self._count == 0 or n == 0:
+            return False
+        last_idx = (self._head - 1) % self.buffer_size
+        last_ts = self._ts_buf[last_idx]
+        # 新数据自带的相邻间隔用于断档判断（limit>=2时可得）
+        if n >= 2 and timestamps[0] - last_ts > timestamps[1] - timestamps[0]:
+            return False
+        for i in range(n):
+            ts = timestamps[i]
+            if ts < last_ts:
+                continue
+            if ts == last_ts:
+                self._buf['open'][last_idx] = open_[i]
+                self._buf['high'][last_idx] = high[i]
+                self._buf['low'][last_idx] = low[i]
+                self._buf['close'][last_idx] = close[i]
+                self._buf['volume'][last_idx] = volume[i]
+            else:
+                self._append_row(ts, open_[i], high[i], low[i], close[i], volume[i])
+                last_idx = (self._head - 1) % self.buffer_size
+                last_ts = ts
+        self._incremental_ready = False
+        return True
+
+    def _load_dataframe(self, df):
+        """把DataFrame批量写入环形缓冲区（只保留最后buffer_size行）"""
+        df = df.tail(self.buffer_size)
+        n = len(df)
+        for col in self._buf_columns:
+            if col in df.columns:
+                self._buf[col][:n] = pd.to_numeric(df[col], errors='coerce').to_numpy(dtype=np.float32)
+            else:
+                self._buf[col][:n] = np.nan
+        self._ts_buf[:n] = df.index.to_numpy()
+        self._head = n % self.buffer_size
+        self._count = n
+
+    def _append_row(self, timestamp, open_, high, low, close, volume):
+        """向环形缓冲区写入一行（O(1)，无任何pandas分配）"""
+        head = self._head
+        self._buf['open'][head] = open_
+        self._buf['high'][head] = high
+        self._buf['low'][head] = low
+        self._buf['close'][head] = close
+        self._buf['volume'][head] = volume
+        self._ts_buf[head] = timestamp
+        self._head = (head + 1) % self.buffer_size
+        if self._count < self.buffer_size:
+            self._count += 1
+
     def update_data_buffer(self, new_data):
         """
         更新数据缓存
-        
+
         Args:
             new_data: 新的K线数据，包含timestamp, open, high, low, close, volume
         """
-        # 将新数据添加到缓存
         if isinstance(new_data, dict):
-            new_df = pd.DataFrame([new_data])
-            if 'timestamp' in new_df.columns:
-                new_df.set_index('timestamp', inplace=True)
-        else:
-            new_df = new_data.copy()
-        
-        # 合并数据
-        if self.data_buffer.empty:
-            self.data_buffer = new_df
+            # 快路径：只对新行做一次标量转换，直接写入环形缓冲区
+            def _to_float(value):
+                try:
+                    return float(value)
+                except (TypeError, ValueError):
+                    return np.nan
+
+            self._append_row(
+                new_data.get('timestamp'),
+                _to_float(new_data.get('open')),
+                _to_float(new_data.get('high')),
+                _to_float(new_data.get('low')),
+                _to_float(new_data.get('close')),
+                _to_float(new_data.get('volume')),
+            )
         else:
-            self.data_buffer = pd.concat([self.data_buffer, new_df])
-            # 保持缓存大小
-            if len(self.data_buffer) > self.buffer_size:
-                self.data_buffer = self.data_buffer.tail(self.buffer_size)
-        
-        # 确保数据类型正确
-        for col in ['open', 'high', 'low', 'close', 'volume']:
-            if col in self.data_buffer.columns:
-                self.data_buffer[col] = pd.to_numeric(self.data_buffer[col], errors='coerce')
+            # DataFrame路径：整批追加
+            if self._count == 0:
+                self._load_dataframe(new_data)
+            else:
+                combined = pd.concat([self._get_ordered_frame(), new_data])
+                self._load_dataframe(combined)
     
     def calculate_signals(self, df=None):
         """
@@ -141,8 +400,8 @@ class EMAAdxSignalModule:
             dict: 包含信号信息的字典
         """
         if df is None:
-            df = self.data_buffer.copy()
-        
+            df = self._get_ordered_frame()
+
         if len(df) < self.buffer_size:
             return {
                 'signal': 0,
@@ -152,85 +411,177 @@ class EMAAdxSignalModule:
                 'ema_alignment': False
             }
         
-        # 计算EMA指标
-        df['ema_20'] = self.calculate_ema(df['close'], self.ema_short)
-        df['ema_50'] = self.calculate_ema(df['close'], self.ema_medium)
-        df['ema_200'] = self.calculate_ema(df['close'], self.ema_long)
-        
-        # 计算ADX指标
-        df['adx'], df['plus_di'], df['minus_di'] = self.calculate_adx(
-            df['high'], df['low'], df['close'], self.adx_period
-        )
-        
-        # EMA20方向判断
-        df['ema20_direction'] = df['ema_20'].diff()
-        df['ema20_rising'] = df['ema20_direction'] > 0
-        df['ema20_declining'] = df['ema20_direction'] < 0
-        
-        # 趋势状态判断
-        df['market_above_200'] = df['close'] > df['ema_200']
-        df['market_below_200'] = df['close'] < df['ema_200']
-        df['ema_bullish_order'] = (df['ema_20'] > df['ema_50']) & (df['ema_50'] > df['ema_200'])
-        df['ema_bearish_order'] = (df['ema_20'] < df['ema_50']) & (df['ema_50'] < df['ema_200'])
-        df['strong_trend'] = df['adx'] > self.adx_threshold
-        
-        # 策略状态定义（加入EMA20方向过滤）
-        df['strong_uptrend'] = (
-            df['market_above_200'] & 
-            df['ema_bullish_order'] & 
-            df['strong_trend'] &
-            ~df['ema20_declining']  # EMA20不能向下
-        )
-        
-        df['strong_downtrend'] = (
-            df['market_below_200'] & 
-            df['ema_bearish_order'] & 
-            df['strong_trend'] &
-            ~df['ema20_rising']     # EMA20不能向上
-        )
-        
+        # 计算EMA和ADX序列（信号判断只需要末端值，不往df回写任何中间列）
+        close = df['close']
+        ema_20 = self.calculate_ema(close, self.ema_short)
+        ema_50 = self.calculate_ema(close, self.ema_medium)
+        ema_200 = self.calculate_ema(close, self.ema_long)
+        adx, plus_di, minus_di = self.calculate_adx(df['high'], df['low'], close, self.adx_period)
+
+        # 提取末端标量
+        current_close = close.iat[-1]
+        e20 = ema_20.iat[-1]
+        e20_prev = ema_20.iat[-2]
+        e50 = ema_50.iat[-1]
+        e200 = ema_200.iat[-1]
+        current_adx = adx.iat[-1]
+        current_adx = 0 if pd.isna(current_adx) else current_adx
+        current_plus_di = plus_di.iat[-1]
+        current_minus_di = minus_di.iat[-1]
+
+        # 趋势状态判断（与原列式逻辑一致，加入EMA20方向过滤）
+        ema20_direction = e20 - e20_prev
+        bullish_order = e20 > e50 > e200
+        bearish_order = e20 < e50 < e200
+        strong_trend = current_adx > self.adx_threshold
+
         # 生成交易信号
         signal = 0  # 默认震荡
-        if df['strong_uptrend'].iloc[-1]:
+        if current_close > e200 and bullish_order and strong_trend and not ema20_direction < 0:
             signal = 1  # 强多
-        elif df['strong_downtrend'].iloc[-1]:
+        elif current_close < e200 and bearish_order and strong_trend and not ema20_direction > 0:
             signal = -1  # 强空
-        
+
         # 信号名称映射
         signal_names = {0: 'Ranging/Weak', 1: 'Strong Uptrend', -1: 'Strong Downtrend'}
-        
+
         # 计算信号置信度（基于ADX强度）
-        current_adx = df['adx'].iloc[-1] if not pd.isna(df['adx'].iloc[-1]) else 0
         confidence = min(100, max(0, (current_adx - self.adx_threshold) / self.adx_threshold * 100)) if signal != 0 else 0
-        
+
         return {
             'signal': signal,
             'signal_name': signal_names[signal],
             'confidence': round(confidence, 2),
             'adx_value': round(current_adx, 2),
-            'ema_alignment': df['ema_bullish_order'].iloc[-1] if signal == 1 else df['ema_bearish_order'].iloc[-1] if signal == -1 else False,
-            'ema_20': round(df['ema_20'].iloc[-1], 4),
-            'ema_50': round(df['ema_50'].iloc[-1], 4),
-            'ema_200': round(df['ema_200'].iloc[-1], 4),
-            'plus_di': round(df['plus_di'].iloc[-1], 2) if not pd.isna(df['plus_di'].iloc[-1]) else 0,
-            'minus_di': round(df['minus_di'].iloc[-1], 2) if not pd.isna(df['minus_di'].iloc[-1]) else 0
+            'ema_alignment': bullish_order if signal == 1 else bearish_order if signal == -1 else False,
+            'ema_20': round(e20, 4),
+            'ema_50': round(e50, 4),
+            'ema_200': round(e200, 4),
+            'plus_di': round(current_plus_di, 2) if not pd.isna(current_plus_di) else 0,
+            'minus_di': round(current_minus_di, 2) if not pd.isna(current_minus_di) else 0
         }
     
+    def _warmup_incremental_state(self):
+        """全量计算一次指标，把末端值存为增量递推的初始状态"""
+        df = self.data_buffer
+        close = df['close']
+
+        # EMA末端值
+        self._ema_values = {
+            period: self.calculate_ema(close, period).iat[-1]
+            for period in (self.ema_short, self.ema_medium, self.ema_long)
+        }
+        self._ema20_prev = self.calculate_ema(close, self.ema_short).iat[-2]
+
+        # Wilder平滑末端值和DX历史
+        adx, plus_di, minus_di = self.calculate_adx(df['high'], df['low'], close, self.adx_period)
+        smoothed = [self._wilder_smooth(s, self.adx_period)
+                    for s in self._compute_tr_dm(df['high'], df['low'], close)]
+        self._smoothed_tr = smoothed[0].iat[-1]
+        self._smoothed_plus_dm = smoothed[1].iat[-1]
+        self._smoothed_minus_dm = smoothed[2].iat[-1]
+
+        dx = (100 * np.abs(plus_di - minus_di) / (plus_di + minus_di)).dropna()
+        self._dx_history = deque(dx.tail(self.adx_period), maxlen=self.adx_period)
+
+        self._prev_high = df['high'].iat[-1]
+        self._prev_low = df['low'].iat[-1]
+        self._prev_close = close.iat[-1]
+        self._incremental_ready = True
+
+    def _step_signals(self):
+        """对最新一根K线做O(1)增量递推，返回与calculate_signals相同格式的信号字典"""
+        last = (self._head - 1) % self.buffer_size
+        high = self._buf['high'][last]
+        low = self._buf['low'][last]
+        close = self._buf['close'][last]
+        period = self.adx_period
+
+        # 单步TR和方向移动
+        tr = max(high - low, abs(high - self._prev_close), abs(low - self._prev_close))
+        up_move = high - self._prev_high
+        down_move = self._prev_low - low
+        plus_dm = up_move if up_move > 0 else 0.0
+        minus_dm = down_move if down_move > 0 else 0.0
+        if plus_dm > 0 and minus_dm > 0:
+            if plus_dm <= minus_dm:
+                plus_dm = 0.0
+            else:
+                minus_dm = 0.0
+
+        # 单步Wilder平滑：新值 = 前值*(1-1/p) + 当前值
+        decay = self._wilder_decay
+        self._smoothed_tr = self._smoothed_tr * decay + tr
+        self._smoothed_plus_dm = self._smoothed_plus_dm * decay + plus_dm
+        self._smoothed_minus_dm = self._smoothed_minus_dm * decay + minus_dm
+
+        plus_di = 100 * self._smoothed_plus_dm / self._smoothed_tr
+        minus_di = 100 * self._smoothed_minus_dm / self._smoothed_tr
+        di_sum = plus_di + minus_di
+        dx = 100 * abs(plus_di - minus_di) / di_sum if di_sum > 0 else 0.0
+        self._dx_history.append(dx)
+        current_adx = sum(self._dx_history) / len(self._dx_history)
+
+        # 单步EMA递推：ema_new = alpha*close + (1-alpha)*ema_prev
+        self._ema20_prev = self._ema_values[self.ema_short]
+        for ema_period, (alpha, one_minus_alpha) in self._ema_alphas.items():
+            self._ema_values[ema_period] = alpha * close + one_minus_alpha * self._ema_values[ema_period]
+
+        self._prev_high = high
+        self._prev_low = low
+        self._prev_close = close
+
+        # 信号判断（与calculate_signals相同逻辑）
+        ema_20 = self._ema_values[self.ema_short]
+        ema_50 = self._ema_values[self.ema_medium]
+        ema_200 = self._ema_values[self.ema_long]
+        ema20_direction = ema_20 - self._ema20_prev
+        bullish_order = ema_20 > ema_50 > ema_200
+        bearish_order = ema_20 < ema_50 < ema_200
+        strong_trend = current_adx > self.adx_threshold
+
+        signal = 0
+        if close > ema_200 and bullish_order and strong_trend and not ema20_direction < 0:
+            signal = 1
+        elif close < ema_200 and bearish_order and strong_trend and not ema20_direction > 0:
+            signal = -1
+
+        signal_names = {0: 'Ranging/Weak', 1: 'Strong Uptrend', -1: 'Strong Downtrend'}
+        confidence = min(100, max(0, (current_adx - self.adx_threshold) / self.adx_threshold * 100)) if signal != 0 else 0
+
+        return {
+            'signal': signal,
+            'signal_name': signal_names[signal],
+            'confidence': round(confidence, 2),
+            'adx_value': round(current_adx, 2),
+            'ema_alignment': bullish_order if signal == 1 else bearish_order if signal == -1 else False,
+            'ema_20': round(ema_20, 4),
+            'ema_50': round(ema_50, 4),
+            'ema_200': round(ema_200, 4),
+            'plus_di': round(plus_di, 2),
+            'minus_di': round(minus_di, 2)
+        }
+
     def update_signal_state(self, new_data):
         """
         更新信号状态（用于实时监控）
-        
+
         Args:
             new_data: 新的K线数据
-            
+
         Returns:
             dict: 信号更新信息
         """
         # 更新数据缓存
         self.update_data_buffer(new_data)
-        
-        # 计算当前信号
-        signal_info = self.calculate_signals()
+
+        # 计算当前信号：状态就绪后只做O(1)递推，否则全量计算并预热增量状态
+        if self._incremental_ready:
+            signal_info = self._step_signals()
+        else:
+            signal_info = self.calculate_signals()
+            if self._count >= self.buffer_size:
+                self._warmup_incremental_state()
         new_signal = signal_info['signal']
         
         # 检查信号变化
@@ -301,7 +652,7 @@ class EMAAdxSignalModule:
             'signal_name': signal_names.get(self.current_signal, '未知'),
             'signal_start_time': self.signal_start_time.strftime('%Y-%m-%d %H:%M:%S') if self.signal_start_time else None,
             'last_update_time': self.last_update_time.strftime('%Y-%m-%d %H:%M:%S') if self.last_update_time else None,
-            'data_buffer_size': len(self.data_buffer),
+            'data_buffer_size': self._count,
             'parameters': {
                 'ema_short': self.ema_short,
                 'ema_medium': self.ema_medium,
@@ -5,118 +5,501 @@
 包含所有与币安API交互的功能
 """
 
-import ccxt
-import uuid
+import aiohttp
+import asyncio
+import ccxt.async_support as ccxt
+import itertools
+import json
+import os
+import random
 import time
 import logging
+import numpy as np
+from decimal import Decimal, ROUND_DOWN
 from config import config
 
+# ccxt.pro提供watch_orders/watch_positions推送流：订单和持仓状态由
+# WebSocket增量维护，读取变成内存查找而不是每次25-40ms的REST往返
+try:
+    import ccxt.pro as ccxtpro
+    CCXT_PRO_AVAILABLE = True
+except ImportError:
+    ccxtpro = None
+    CCXT_PRO_AVAILABLE = False
+
+# orjson（Rust实现）反序列化fetch_positions/fetch_ohlcv这类大响应比
+# 标准库json快2-5倍；ccxt解析响应统一走Exchange.on_json_response
+# （类属性，C函数不做方法绑定），换掉它即可全局生效，未安装时保持stdlib
+try:
+    import orjson
+    ccxt.Exchange.on_json_response = orjson.loads
+except ImportError:
+    orjson = None
+
 logger = logging.getLogger(__name__)
 
+# 交易记录入口在模块加载时绑定一次，避免place_order热路径上每单
+# 都走一遍import机制（sys.modules查找+导入锁）
+try:
+    from grid_scheduler import add_trade_record as _add_trade_record
+except ImportError:
+    _add_trade_record = None
+
+# 市场元数据本地缓存：先读本地，过期才请求远端，省去每次启动的load_markets往返。
+# 放在用户缓存目录下，机器人主程序和清理脚本等多个入口共享同一份缓存
+MARKETS_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'amethystflame')
+MARKETS_CACHE_FILE = os.path.join(MARKETS_CACHE_DIR, 'markets.json')
+MARKETS_CACHE_TTL = 24 * 3600  # 秒
+
+# 止盈方向查表：持仓方向 -> (平仓方向, positionSide参数)，
+# 代替每单一组if/elif分支和.upper()字符串分配
+_TP_MAP = {'long': ('sell', 'LONG'), 'short': ('buy', 'SHORT')}
+# positionSide大写形式查表，未命中（非常规写法）时才退回.upper()
+_POS_SIDE = {'long': 'LONG', 'short': 'SHORT', 'LONG': 'LONG', 'SHORT': 'SHORT'}
+
+class KlineArray:
+    """K线数据的列式封装
+
+    把ccxt返回的ohlcv列表整体转成一个(N,6)的float64矩阵（列依次为
+    timestamp/open/high/low/close/volume），代替每根K线一个dict的
+    AoS布局：省掉N次dict+装箱分配，列访问是连续内存的numpy视图，
+    可直接喂给向量化指标计算
+    """
+
+    __slots__ = ('arr',)
+
+    def __init__(self, arr):
+        self.arr = arr
+
+    def __len__(self):
+        return self.arr.shape[0]
+
+    def __bool__(self):
+        return self.arr.shape[0] > 0
+
+    def __iter__(self):
+        return iter(self.arr)
+
+    def __getitem__(self, i):
+        return self.arr[i]
+
+    @property
+    def timestamp(self):
+        return self.arr[:, 0]
+
+    @property
+    def open(self):
+        return self.arr[:, 1]
+
+    @property
+    def high(self):
+        return self.arr[:, 2]
+
+    @property
+    def low(self):
+        return self.arr[:, 3]
+
+    @property
+    def close(self):
+        return self.arr[:, 4]
+
+    @property
+    def volume(self):
+        return self.arr[:, 5]
+
+class TokenBucket:
+    """异步令牌桶限速器
+
+    按固定速率补充令牌，请求前acquire一个令牌：桶里有余量时零等待，
+    只在真正逼近限速时才按差额精确等待。相比固定sleep，既不会在低负载时
+    白白拖慢下单，也不会在高并发时超出币安下单限速（300单/10秒）触发-1003
+    """
+
+    def __init__(self, rate_per_sec, capacity=None):
+        self.rate = rate_per_sec
+        self.capacity = capacity if capacity is not None else rate_per_sec
+        self._tokens = float(self.capacity)
+        self._last_refill = None
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        """取走一个令牌，余量不足时等待到补满为止"""
+        async with self._lock:
+            now = asyncio.get_running_loop().time()
+            if self._last_refill is not None:
+                self._tokens = min(
+                    self.capacity,
+                    self._tokens + (now - self._last_refill) * self.rate
+                )
+            self._last_refill = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return
+            wait = (1 - self._tokens) / self.rate
+            self._tokens = 0.0
+            self._last_refill = now + wait
+        await asyncio.sleep(wait)
+
 class CustomGate(ccxt.binance):
     """自定义Gate交易所类，继承自ccxt.binance"""
-    
+
     def __init__(self, config_dict):
         super().__init__(config_dict)
         self.options['defaultType'] = 'future'  # 设置为期货交易
 
 class ExchangeInterface:
-    """交易所接口类"""
-    
+    """交易所接口类
+
+    基于ccxt.async_support的异步实现：所有REST调用共用同一个长连接
+    aiohttp会话（TCP+TLS keep-alive复用），且不会阻塞事件循环，
+    多个订单可以通过asyncio.gather在约一个RTT内并发发出
+    """
+
     def __init__(self):
         self.exchange = None
+        self._connector = None  # 显式调优的aiohttp连接器
+        self._session = None  # 自建并注入ccxt的aiohttp会话
         self.websocket_price = None  # WebSocket实时价格
         self.last_valid_price = None  # 最后有效价格
-        self.last_price_update_time = 0  # 最后价格更新时间
+        self.last_price_update_time = 0  # 最后价格更新时间（monotonic_ns整数刻度）
+        # 合理价格带（最后有效价±10%），更新缓存时预计算，
+        # 每个tick的校验只剩两次比较，不再做除法
+        self._price_low = 0.0
+        self._price_high = float('inf')
         self.price_precision = None
         self.amount_precision = None
         self.min_order_amount = None
         self.listen_key = None
-        
-    def initialize_exchange(self):
+        # 下单限速令牌桶：ccxt内置限速已关闭，由我们只对下单热路径限速
+        self._order_bucket = TokenBucket(rate_per_sec=25.0, capacity=50)
+        self._last_leverage = None  # 已生效的杠杆倍数，避免重复设置的RTT
+        self._listen_key_task = None  # listenKey续期后台任务
+
+        # WebSocket推送维护的内存缓存（见start_ws_streams）
+        self.exchange_pro = None  # ccxt.pro实例
+        self._ws_tasks = []
+        self._open_orders_cache = {}  # order_id -> 订单信息
+        # (仓位方向, 价格tick数, 买卖方向) -> order_id，用于O(1)查重
+        self._order_index = {}
+        self._order_done_events = {}  # 订单id -> asyncio.Event，终结时置位
+        self._price_tick = None
+        self._price_tick_dec = None  # Decimal形式的tick，用于无损量化
+        self._amount_tick_dec = None
+        self._orders_stream_ready = False
+        # 推送流在线时的REST对账：每隔一段时间拉一次快照校正缓存，
+        # 防止个别漏推导致内存状态与交易所漂移
+        self._orders_reconcile_interval = 60.0  # 秒
+        self._orders_last_reconcile = 0.0
+        self._long_position = 0
+        self._short_position = 0
+        self._positions_stream_ready = False
+
+        # 交易对符号绑定一次：热路径方法不再每次调用config函数，
+        # raw形式（无分隔符）给原生fapi端点直接用
+        self._symbol = config.get_ccxt_symbol()
+        self._symbol_raw = self._symbol.replace('/', '').replace(':USDC', '')
+
+        # 客户端订单ID：进程前缀+单调计数器，比uuid4省掉每单一次
+        # getrandom系统调用和36字符格式化，且进程内保证唯一
+        self._oid_prefix = f"AF{os.getpid():x}{int(time.time()):x}-"
+        self._oid_counter = itertools.count()
+
+    async def initialize_exchange(self):
         """初始化交易所连接"""
         try:
+            # 显式调优的TCP连接器：足够大的连接池+75秒keep-alive保证
+            # 下单请求总能复用热连接，DNS解析结果缓存5分钟。
+            # aiohttp在connection_made时即对每个客户端socket设置
+            # TCP_NODELAY（禁用Nagle），小POST立即刷出、不等ACK凑包
+            self._connector = aiohttp.TCPConnector(
+                limit=100,
+                keepalive_timeout=75,
+                ttl_dns_cache=300,
+                enable_cleanup_closed=True,
+            )
+            self._session = aiohttp.ClientSession(connector=self._connector, trust_env=True)
+
             exchange_config = {
                 'apiKey': config.API_KEY,
                 'secret': config.API_SECRET,
                 'sandbox': False,  # 设置为 False 使用实盘
-                'enableRateLimit': True,
+                # ccxt内置限速会在每次REST调用前同步sleep，查询路径纯属
+                # 拖慢；下单热路径由_order_bucket令牌桶精确限速
+                'enableRateLimit': False,
+                'session': self._session,
                 'options': {
                     'defaultType': 'future',  # 设置为期货交易
                 }
             }
-            
+
+            # 整个生命周期复用同一个aiohttp会话：连接池keep-alive，
+            # 避免每次调用重新握手
             self.exchange = CustomGate(exchange_config)
             logger.info("交易所连接初始化成功")
-            
+
+            # 预热连接池：先打一次无权重负担的/fapi/v1/time，把TCP+TLS握手
+            # （约2个RTT）在启动阶段付掉。公共和私有端点同属fapi.binance.com，
+            # 共用一个连接池，一次ping即可让后续首笔下单直接复用热连接
+            try:
+                await self.exchange.fapiPublicGetTime()
+                logger.debug("连接池预热完成")
+            except Exception as warm_e:
+                logger.warning("连接池预热失败（不影响后续请求）: %s", warm_e)
+
             # 设置杠杆倍数
-            self.set_leverage()
-            
+            await self.set_leverage()
+
             # 获取交易精度信息
-            self._get_price_precision()
-            
+            await self._get_price_precision()
+
         except Exception as e:
-            logger.error(f"交易所初始化失败: {e}")
+            logger.error("交易所初始化失败: %s", e)
             raise
-    
-    def _get_price_precision(self):
+
+    async def start_ws_streams(self):
+        """启动watch_orders/watch_positions推送流
+
+        启动后fetch_open_orders和get_position直接读内存缓存（O(1)），
+        不再逐次REST轮询。ccxt.pro不可用时保持REST路径不变
+        """
+        if not CCXT_PRO_AVAILABLE:
+            logger.info("ccxt.pro不可用，订单/持仓查询保持REST路径")
+            return False
+
+        self.exchange_pro = ccxtpro.binance({
+            'apiKey': config.API_KEY,
+            'secret': config.API_SECRET,
+            'enableRateLimit': True,
+            'options': {'defaultType': 'future'},
+        })
+        self._ws_tasks = [
+            asyncio.create_task(self._watch_orders_loop()),
+            asyncio.create_task(self._watch_positions_loop()),
+        ]
+        logger.info("订单/持仓WebSocket推送流已启动")
+        return True
+
+    async def _watch_orders_loop(self):
+        """订单推送循环：断线时退回REST并在重连后重新播种缓存"""
+        symbol = self._symbol
+        while True:
+            try:
+                if not self._orders_stream_ready:
+                    # 一次REST快照作为种子，之后完全靠推送增量维护
+                    orders = await self.exchange.fetch_open_orders(symbol=symbol)
+                    self._open_orders_cache = {o['id']: o for o in orders}
+                    self._order_index = {
+                        self._order_key(o): o['id'] for o in orders if o.get('price')
+                    }
+                    self._orders_stream_ready = True
+                    self._orders_last_reconcile = time.monotonic()
+                updates = await self.exchange_pro.watch_orders(symbol)
+                for order in updates:
+                    key = self._order_key(order) if order.get('price') else None
+                    if order.get('status') == 'open':
+                        self._open_orders_cache[order['id']] = order
+                        if key is not None:
+                            self._order_index[key] = order['id']
+                    else:
+                        self._open_orders_cache.pop(order['id'], None)
+                        if key is not None and self._order_index.get(key) == order['id']:
+                            del self._order_index[key]
+                        # 唤醒等待该订单终结的协程(事件驱动，免轮询)
+                        done_event = self._order_done_events.pop(order['id'], None)
+                        if done_event is not None:
+                            done_event.set()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("订单推送流中断，5秒后重连: %s", e)
+                self._orders_stream_ready = False
+                await asyncio.sleep(5)
+
+    async def _watch_positions_loop(self):
+        """持仓推送循环：断线时退回REST并在重连后重新播种缓存"""
+        symbol = self._symbol
+        while True:
+            try:
+                if not self._positions_stream_ready:
+                    long_pos, short_pos = await self._fetch_position_rest()
+                    self._long_position = long_pos
+                    self._short_position = short_pos
+                    self._positions_stream_ready = True
+                positions = await self.exchange_pro.watch_positions([symbol])
+                for position in positions:
+                    if position.get('symbol') != symbol:
+                        continue
+                    contracts = position.get('contracts', 0) or 0
+                    side = position.get('side')
+                    if side == 'long':
+                        self._long_position = contracts
+                    elif side == 'short':
+                        self._short_position = abs(contracts)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("持仓推送流中断，5秒后重连: %s", e)
+                self._positions_stream_ready = False
+                await asyncio.sleep(5)
+
+    async def close(self):
+        """关闭WebSocket推送流和底层aiohttp会话，释放连接"""
+        tasks = list(self._ws_tasks)
+        if self._listen_key_task is not None:
+            tasks.append(self._listen_key_task)
+            self._listen_key_task = None
+        for task in tasks:
+            task.cancel()
+        for task in tasks:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._ws_tasks = []
+        if self.exchange_pro is not None:
+            await self.exchange_pro.close()
+        if self.exchange is not None:
+            await self.exchange.close()
+        # 自建的会话ccxt不负责关闭（own_session为False），这里显式关闭
+        if self._session is not None:
+            await self._session.close()
+
+    async def _load_markets_cached(self, ttl=MARKETS_CACHE_TTL):
+        """加载市场信息，优先使用未过期的本地缓存
+
+        交易对的精度/限额信息变化极少，默认缓存24小时，可省掉每次脚本
+        启动时load_markets的一次或多次REST往返（约1MB元数据）
+        """
+        try:
+            if os.path.exists(MARKETS_CACHE_FILE):
+                age = time.time() - os.path.getmtime(MARKETS_CACHE_FILE)
+                if age < ttl:
+                    with open(MARKETS_CACHE_FILE, 'r', encoding='utf-8') as f:
+                        cached = json.load(f)
+                    markets = self.exchange.set_markets(cached)
+                    logger.info("已从本地缓存加载市场信息（%.0f秒前更新）", age)
+                    return markets
+        except Exception as e:
+            logger.warning("读取市场缓存失败，回退到远端获取: %s", e)
+
+        markets = await self.exchange.load_markets()
+        try:
+            os.makedirs(MARKETS_CACHE_DIR, exist_ok=True)
+            with open(MARKETS_CACHE_FILE, 'w', encoding='utf-8') as f:
+                json.dump(list(markets.values()), f)
+        except Exception as e:
+            logger.warning("写入市场缓存失败: %s", e)
+        return markets
+
+    async def _get_price_precision(self):
         """获取价格和数量精度"""
         try:
-            markets = self.exchange.load_markets()
-            symbol_info = markets.get(config.get_ccxt_symbol())
-            
+            markets = await self._load_markets_cached()
+            symbol_info = markets.get(self._symbol)
+
             if symbol_info:
                 self.price_precision = symbol_info['precision']['price']
                 self.amount_precision = symbol_info['precision']['amount']
                 self.min_order_amount = symbol_info['limits']['amount']['min']
-                
+
+                # 价格tick大小：precision可能是小数位数（整数）或tick本身（小数）
+                p = self.price_precision
+                self._price_tick = float(p) if (isinstance(p, float) and p < 1) else 10.0 ** -int(p)
+                self._price_tick_dec = Decimal(str(self._price_tick))
+                a = self.amount_precision
+                amount_tick = float(a) if (isinstance(a, float) and a < 1) else 10.0 ** -int(a)
+                self._amount_tick_dec = Decimal(str(amount_tick))
+
                 logger.info(
                     f"价格精度: {self.price_precision}, 数量精度: {self.amount_precision}, 最小下单数量: {self.min_order_amount}")
             else:
-                logger.error(f"无法获取 {config.get_ccxt_symbol()} 的市场信息")
-                
+                logger.error("无法获取 %s 的市场信息", self._symbol)
+
         except Exception as e:
-            logger.error(f"获取价格精度失败: {e}")
+            logger.error("获取价格精度失败: %s", e)
             raise
-    
-    def set_leverage(self, symbol=None, leverage=None):
-        """设置杠杆倍数"""
+
+    async def set_leverage(self, symbol=None, leverage=None):
+        """设置杠杆倍数
+
+        本会话已设置过相同倍数时直接返回；币安返回-4046（杠杆无需调整）
+        也视为成功并缓存，重启场景下省掉一次无效的往返重试
+        """
         try:
             if symbol is None:
-                symbol = config.get_ccxt_symbol()
+                symbol = self._symbol
             if leverage is None:
                 leverage = config.LEVERAGE
-                
+
+            if leverage == self._last_leverage:
+                return True
+
             # 使用币安API设置杠杆
             params = {
-                'symbol': symbol.replace('/', '').replace(':USDC', ''),
+                'symbol': self._symbol_raw if symbol == self._symbol
+                          else symbol.replace('/', '').replace(':USDC', ''),
                 'leverage': leverage
             }
-            response = self.exchange.fapiPrivatePostLeverage(params)
-            logger.info(f"成功设置杠杆倍数为 {leverage}x: {response}")
+            response = await self.exchange.fapiPrivatePostLeverage(params)
+            self._last_leverage = leverage
+            logger.info("成功设置杠杆倍数为 %sx: %s", leverage, response)
             return True
-            
+
         except Exception as e:
-            logger.error(f"设置杠杆失败: {e}")
+            if '-4046' in str(e):
+                # 杠杆已是目标倍数，等同成功
+                self._last_leverage = leverage
+                logger.info("杠杆已是 %sx，无需调整", leverage)
+                return True
+            logger.error("设置杠杆失败: %s", e)
             return False
-    
+
+    @staticmethod
+    def _quantize(value, tick):
+        """按tick向下取整量化：Decimal整数算术，无二进制浮点舍入误差"""
+        return float((Decimal(str(value)) / tick).to_integral_value(rounding=ROUND_DOWN) * tick)
+
+    def _q_price(self, price):
+        """价格量化到交易对tick。round(price, 小数位)在边界值上会舍出
+        非法价格（如round(0.0000042, 7) -> 0.0000041）触发-2010拒单重试"""
+        if self._price_tick_dec is None:
+            return round(price, self.price_precision)
+        return self._quantize(price, self._price_tick_dec)
+
+    def _q_amount(self, quantity):
+        """数量量化到交易对步长"""
+        if self._amount_tick_dec is None:
+            return round(quantity, self.amount_precision)
+        return self._quantize(quantity, self._amount_tick_dec)
+
+    def _price_to_ticks(self, price):
+        """把价格换算成整数tick数，避免索引键上的浮点相等比较"""
+        if self._price_tick:
+            return round(float(price) / self._price_tick)
+        return float(price)
+
+    def _order_key(self, order):
+        """订单索引键：(仓位方向, 价格tick数, 买卖方向)"""
+        position_side = order.get('info', {}).get('positionSide', 'BOTH')
+        return (position_side, self._price_to_ticks(order['price']), order.get('side'))
+
     def generate_client_order_id(self):
-        """生成唯一的客户端订单ID"""
-        return str(uuid.uuid4())
-    
-    def check_and_enable_hedge_mode(self):
+        """生成唯一的客户端订单ID（前缀含pid和启动时间，跨进程也不冲突）"""
+        return self._oid_prefix + format(next(self._oid_counter), 'x')
+
+    async def check_and_enable_hedge_mode(self):
         """检查并启用双向持仓模式"""
         try:
             # 使用ccxt的fetch_position_mode方法检查持仓模式
-            position_mode = self.exchange.fetch_position_mode(symbol=config.get_ccxt_symbol())
+            position_mode = await self.exchange.fetch_position_mode(symbol=self._symbol)
             if not position_mode['hedged']:
                 logger.info("当前为单向持仓模式，正在切换为双向持仓模式...")
                 # 启用双向持仓模式
                 params = {'dualSidePosition': 'true'}
-                self.exchange.fapiPrivatePostPositionSideDual(params)
-                
+                await self.exchange.fapiPrivatePostPositionSideDual(params)
+
                 # 二次验证
-                position_mode = self.exchange.fetch_position_mode(symbol=config.get_ccxt_symbol())
+                position_mode = await self.exchange.fetch_position_mode(symbol=self._symbol)
                 if not position_mode['hedged']:
                     logger.error("启用双向持仓模式失败，请手动启用双向持仓模式后再运行程序。")
                     raise Exception("启用双向持仓模式失败，请手动启用双向持仓模式后再运行程序。")
@@ -124,126 +507,249 @@ class ExchangeInterface:
                     logger.info("双向持仓模式已成功启用")
             else:
                 logger.info("双向持仓模式已启用")
-                
+
             return True
-            
+
         except Exception as e:
-            logger.error(f"检查/启用双向持仓模式失败: {e}")
+            logger.error("检查/启用双向持仓模式失败: %s", e)
             raise e  # 抛出异常，停止程序
-    
-    def get_listen_key(self):
-        """获取listenKey用于WebSocket连接"""
+
+    async def get_listen_key(self):
+        """获取listenKey用于WebSocket连接，并启动后台续期任务"""
         try:
-            response = self.exchange.fapiPrivatePostListenKey()
+            response = await self.exchange.fapiPrivatePostListenKey()
             listen_key = response.get('listenKey')
             if not listen_key:
                 raise ValueError("获取的 listenKey 为空")
-            logger.info(f"成功获取 listenKey: {listen_key}")
+            logger.info("成功获取 listenKey: %s", listen_key)
+            self.listen_key = listen_key
+            # 首次获取时启动专属续期任务，调用方不用再自己安排续期
+            if self._listen_key_task is None:
+                self._listen_key_task = asyncio.create_task(self._listen_key_keeper())
             return listen_key
         except Exception as e:
-            logger.error(f"获取listenKey失败: {e}")
+            logger.error("获取listenKey失败: %s", e)
             return None
-    
-    def keep_listen_key_alive(self, listen_key):
-        """保持listenKey活跃"""
+
+    async def _listen_key_keeper(self):
+        """listenKey续期循环
+
+        币安60分钟过期listenKey并断开用户数据流；每30分钟（±60秒抖动，
+        避免多实例同时打续期端点）续期一次，失败时直接重新申请新key，
+        保证WebSocket流不因key过期整体重连
+        """
+        while True:
+            await asyncio.sleep(1800 + random.uniform(-60, 60))
+            try:
+                await self.exchange.fapiPrivatePutListenKey()
+                logger.info("listenKey续期成功")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error("listenKey续期失败，重新申请: %s", e)
+                try:
+                    response = await self.exchange.fapiPrivatePostListenKey()
+                    new_key = response.get('listenKey')
+                    if new_key:
+                        self.listen_key = new_key
+                        logger.info("已重新申请 listenKey")
+                except Exception as retry_e:
+                    logger.error("重新申请listenKey失败: %s", retry_e)
+
+    async def get_position(self):
+        """获取当前持仓：推送流在线时读内存缓存，否则REST查询"""
+        if self._positions_stream_ready:
+            return self._long_position, self._short_position
+        return await self._fetch_position_rest()
+
+    async def _fetch_position_rest(self):
+        """通过REST获取当前持仓
+
+        直接打 /fapi/v2/positionRisk?symbol=... 端点：只返回本交易对的
+        双向持仓（最多LONG/SHORT/BOTH三行），比fetch_positions拉全账户
+        持仓再逐个比对symbol的响应体小得多，解析也从O(N)降到O(1)
+        """
         try:
-            self.exchange.fapiPrivatePutListenKey()
-            logger.info("listenKey续期成功")
+            rows = await self.exchange.fapiPrivateV2GetPositionRisk(
+                {'symbol': self._symbol_raw}
+            )
+
+            long_position = 0
+            short_position = 0
+
+            for row in rows:
+                amt = float(row['positionAmt'])
+                position_side = row.get('positionSide')
+                if position_side == 'LONG':
+                    long_position = amt
+                elif position_side == 'SHORT':
+                    short_position = abs(amt)
+
+            return long_position, short_position
+
         except Exception as e:
-            logger.error(f"listenKey续期失败: {e}")
-    
-    def get_position(self):
-        """获取当前持仓"""
+            logger.warning("positionRisk查询失败，回退到fetch_positions: %s", e)
+
+        # 回退路径：带symbol过滤的fetch_positions，ccxt把过滤下推到API，
+        # 循环最多只看到本交易对的LONG/SHORT两条，而不是全账户扫描
         try:
-            params = {'type': 'future'}  # 永续合约
-            positions = self.exchange.fetch_positions(params=params)
-            
+            positions = await self.exchange.fetch_positions(
+                symbols=[self._symbol], params={'type': 'future'}
+            )
+
             long_position = 0
             short_position = 0
-            
+
             for position in positions:
-                if position['symbol'] == config.get_ccxt_symbol():
-                    contracts = position.get('contracts', 0)
-                    side = position.get('side', None)
-                    
-                    if side == 'long':
-                        long_position = contracts
-                    elif side == 'short':
-                        short_position = abs(contracts)
-            
+                contracts = position.get('contracts', 0)
+                side = position.get('side')
+                if side == 'long':
+                    long_position = contracts
+                elif side == 'short':
+                    short_position = abs(contracts)
+
             return long_position, short_position
-            
+
         except Exception as e:
-            logger.error(f"获取持仓失败: {e}")
+            logger.error("获取持仓失败: %s", e)
             return 0, 0
-    
-    def fetch_open_orders(self, symbol=None):
-        """获取未成交订单"""
+
+    async def wait_order_done(self, order_id, timeout):
+        """等待订单终结(成交或撤销)
+
+        推送流在线时挂一个asyncio.Event，订单离开挂单簿的瞬间被唤醒，
+        延迟是一个WS往返而不是轮询间隔；流不可用时返回None让调用方
+        退回轮询。返回True=已终结，False=超时
+        """
+        if not self._orders_stream_ready:
+            return None
+        order_id = str(order_id)
+        if order_id not in self._open_orders_cache:
+            return True  # 已不在挂单簿，视为终结
+        event = self._order_done_events.setdefault(order_id, asyncio.Event())
+        try:
+            await asyncio.wait_for(event.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            self._order_done_events.pop(order_id, None)
+
+    async def fetch_open_orders(self, symbol=None):
+        """获取未成交订单：推送流在线时读内存缓存，否则REST查询"""
+        if self._orders_stream_ready:
+            now = time.monotonic()
+            if now - self._orders_last_reconcile >= self._orders_reconcile_interval:
+                # 周期性REST对账，校正推送缓存可能的漂移
+                self._orders_last_reconcile = now
+                try:
+                    orders = await self.exchange.fetch_open_orders(symbol=symbol or self._symbol)
+                    self._open_orders_cache = {o['id']: o for o in orders}
+                    self._order_index = {
+                        self._order_key(o): o['id'] for o in orders if o.get('price')
+                    }
+                except Exception as e:
+                    logger.warning("挂单REST对账失败，继续使用推送缓存: %s", e)
+            return list(self._open_orders_cache.values())
         try:
             if symbol is None:
-                symbol = config.get_ccxt_symbol()
-            return self.exchange.fetch_open_orders(symbol=symbol)
+                symbol = self._symbol
+            return await self.exchange.fetch_open_orders(symbol=symbol)
         except Exception as e:
-            logger.error(f"获取未成交订单失败: {e}")
+            logger.error("获取未成交订单失败: %s", e)
             return []
-    
-    def cancel_order(self, order_id, symbol=None):
+
+    async def cancel_order(self, order_id, symbol=None):
         """取消订单"""
         try:
             if symbol is None:
-                symbol = config.get_ccxt_symbol()
-            self.exchange.cancel_order(order_id, symbol)
-            logger.info(f"撤销订单成功, 订单ID: {order_id}")
+                symbol = self._symbol
+            await self.exchange.cancel_order(order_id, symbol)
+            logger.info("撤销订单成功, 订单ID: %s", order_id)
         except ccxt.BaseError as e:
-            logger.error(f"撤单失败: {e}")
-    
-    def place_order(self, side, price, quantity, is_reduce_only=False, position_side=None, order_type='limit'):
+            logger.error("撤单失败: %s", e)
+
+    async def cancel_all_orders(self, symbol=None):
+        """批量撤销某交易对的全部挂单（单次REST调用，对应币安 DELETE /fapi/v1/allOpenOrders）"""
+        try:
+            if symbol is None:
+                symbol = self._symbol
+            await self.exchange.cancel_all_orders(symbol)
+            logger.info("批量撤销 %s 全部挂单成功", symbol)
+            return True
+        except ccxt.BaseError as e:
+            logger.error("批量撤单失败: %s", e)
+            return False
+
+    async def cancel_orders_batch(self, order_ids):
+        """按订单ID批量撤单（币安 DELETE /fapi/v1/batchOrders，单次最多10个）
+
+        把N个订单的撤销压缩成ceil(N/10)次REST调用；失败时返回False，
+        由调用方退回逐单撤销
+        """
+        order_ids = list(order_ids)
+        if not order_ids:
+            return True
+        try:
+            for i in range(0, len(order_ids), 10):
+                chunk = order_ids[i:i + 10]
+                await self.exchange.fapiPrivateDeleteBatchOrders({
+                    'symbol': self._symbol_raw,
+                    'orderIdList': json.dumps(
+                        [int(oid) for oid in chunk], separators=(',', ':')
+                    ),
+                })
+            logger.info("批量撤销 %d 个订单成功", len(order_ids))
+            return True
+        except Exception as e:
+            logger.error("按ID批量撤单失败: %s", e)
+            return False
+
+    async def place_order(self, side, price, quantity, is_reduce_only=False, position_side=None, order_type='limit'):
         """下单函数"""
         try:
-            # 修正价格精度
+            # 修正价格精度（tick量化）
             if price is not None:
-                price = round(price, self.price_precision)
-            
+                price = self._q_price(price)
+
             # 修正数量精度并确保不低于最小下单数量
-            quantity = round(quantity, self.amount_precision)
-            quantity = max(quantity, self.min_order_amount)
-            
+            quantity = max(self._q_amount(quantity), self.min_order_amount)
+
             params = {
                 'newClientOrderId': self.generate_client_order_id(),
                 'reduce_only': is_reduce_only,
             }
-            
+
             if position_side is not None:
-                params['positionSide'] = position_side.upper()
-            
+                params['positionSide'] = _POS_SIDE.get(position_side) or position_side.upper()
+
+            await self._order_bucket.acquire()
             if order_type == 'market':
-                order = self.exchange.create_order(
-                    config.get_ccxt_symbol(), 'market', side, quantity, params=params
+                order = await self.exchange.create_order(
+                    self._symbol, 'market', side, quantity, params=params
                 )
             else:
                 if price is None:
                     logger.error("限价单必须提供 price 参数")
                     return None
-                order = self.exchange.create_order(
-                    config.get_ccxt_symbol(), 'limit', side, quantity, price, params
+                order = await self.exchange.create_order(
+                    self._symbol, 'limit', side, quantity, price, params
                 )
-            
+
             # 记录交易到汇总模块（仅在订单创建成功时）
-            if order and order.get('id'):
+            if order and order.get('id') and _add_trade_record is not None:
                 try:
-                    from grid_scheduler import add_trade_record
-                    
                     # 确定网格类型
                     grid_type = 'long' if position_side == 'LONG' else 'short'
-                    
+
                     # 计算预期盈利（简化计算，实际盈利在成交时计算）
                     estimated_profit = 0.0
                     if order_type == 'limit' and price:
                         # 对于限价单，预估盈利为0（实际盈利在成交时计算）
                         estimated_profit = 0.0
-                    
+
                     # 添加交易记录
-                    add_trade_record(
+                    _add_trade_record(
                         trade_type=side,
                         grid_type=grid_type,
                         price=price if price else 0.0,
@@ -252,98 +758,150 @@ class ExchangeInterface:
                         grid_level=0,  # 网格层级，可以后续优化
                         order_id=str(order['id'])
                     )
-                    
+
                 except Exception as e:
-                    logger.warning(f"记录交易到汇总模块失败: {e}")
-            
+                    logger.warning("记录交易到汇总模块失败: %s", e)
+
             return order
-            
+
         except ccxt.BaseError as e:
-            logger.error(f"下单报错: {e}")
+            logger.error("下单报错: %s", e)
             return None
-    
-    def get_klines(self, symbol=None, timeframe='5m', limit=200):
+
+    async def place_orders(self, orders_list):
+        """并发批量下单
+
+        orders_list中每项是place_order的关键字参数字典；N个订单通过
+        asyncio.gather并发发出，总耗时约等于一次RTT而不是N次
+        """
+        return await asyncio.gather(*[self.place_order(**o) for o in orders_list])
+
+    async def place_orders_batch(self, orders_list):
+        """原生批量下单（币安 POST /fapi/v1/batchOrders，每次最多5单）
+
+        与place_orders的并发单发相比，批量端点把HTTP请求数和限速权重
+        都压缩到原来的1/5。orders_list每项与place_order的关键字参数相同；
+        端点报错时退回gather并发逐单下单
+        """
+        if not orders_list:
+            return []
+
+        raw_symbol = self._symbol_raw
+        entries = []
+        for o in orders_list:
+            order_type = o.get('order_type', 'limit')
+            price = o.get('price')
+            if order_type == 'limit' and price is None:
+                logger.error("限价单必须提供 price 参数")
+                return None
+
+            entry = {
+                'symbol': raw_symbol,
+                'side': o['side'].upper(),
+                'type': order_type.upper(),
+                'quantity': str(max(self._q_amount(o['quantity']), self.min_order_amount)),
+                'newClientOrderId': self.generate_client_order_id(),
+            }
+            if order_type == 'limit':
+                entry['price'] = str(self._q_price(price))
+                entry['timeInForce'] = 'GTC'
+
+            position_side = o.get('position_side')
+            if position_side is not None:
+                entry['positionSide'] = _POS_SIDE.get(position_side) or position_side.upper()
+            elif o.get('is_reduce_only'):
+                # 双向持仓模式下reduceOnly由positionSide隐含，不能重复传
+                entry['reduceOnly'] = 'true'
+            entries.append(entry)
+
+        try:
+            results = []
+            for i in range(0, len(entries), 5):
+                chunk = entries[i:i + 5]
+                # 批量端点里每笔订单都计入下单限速，按单数取令牌
+                for _ in chunk:
+                    await self._order_bucket.acquire()
+                response = await self.exchange.fapiPrivatePostBatchOrders(
+                    {'batchOrders': json.dumps(chunk)}
+                )
+                results.extend(response)
+            logger.info("批量下单完成: %d 单 / %d 次请求", len(entries), (len(entries) + 4) // 5)
+            return results
+        except ccxt.BaseError as e:
+            logger.error("批量下单失败，退回并发逐单下单: %s", e)
+            return await self.place_orders(orders_list)
+
+    async def get_klines(self, symbol=None, timeframe='5m', limit=200):
         """获取K线数据"""
         try:
             if symbol is None:
-                symbol = config.get_ccxt_symbol()
-            
-            # 使用ccxt获取K线数据
-            ohlcv = self.exchange.fetch_ohlcv(symbol, timeframe, limit=limit)
-            
-            # 转换为更易用的格式
-            klines = []
-            for candle in ohlcv:
-                klines.append({
-                    'timestamp': candle[0],
-                    'open': candle[1],
-                    'high': candle[2],
-                    'low': candle[3],
-                    'close': candle[4],
-                    'volume': candle[5]
-                })
-            
-            logger.info(f"成功获取 {len(klines)} 根K线数据")
-            return klines
-            
+                symbol = self._symbol
+
+            # 使用ccxt获取K线数据，整体转成列式ndarray
+            ohlcv = await self.exchange.fetch_ohlcv(symbol, timeframe, limit=limit)
+            arr = np.asarray(ohlcv, dtype=np.float64)
+            if arr.ndim != 2:
+                arr = arr.reshape(0, 6)
+
+            logger.info("成功获取 %d 根K线数据", len(arr))
+            return KlineArray(arr)
+
         except Exception as e:
-            logger.error(f"获取K线数据失败: {e}")
-            return []
-    
-    def get_ticker(self, symbol=None):
+            logger.error("获取K线数据失败: %s", e)
+            return KlineArray(np.empty((0, 6), dtype=np.float64))
+
+    async def get_ticker(self, symbol=None):
         """获取ticker价格信息 - 混合策略"""
         try:
             # 优先使用WebSocket实时价格
             if self.websocket_price and self._validate_price(self.websocket_price):
-                logger.debug(f"使用WebSocket价格: {self.websocket_price}")
+                logger.debug("使用WebSocket价格: %s", self.websocket_price)
                 return {'price': self.websocket_price}
-            
+
             # 备用REST API
             if symbol is None:
-                symbol = config.get_ccxt_symbol()
-            
+                symbol = self._symbol
+
             # 使用ccxt获取ticker数据
-            ticker = self.exchange.fetch_ticker(symbol)
-            
+            ticker = await self.exchange.fetch_ticker(symbol)
+
             # 验证ticker数据的有效性
             if not ticker or 'last' not in ticker:
-                logger.error(f"获取到无效的ticker数据: {ticker}")
+                logger.error("获取到无效的ticker数据: %s", ticker)
                 return {'price': self.last_valid_price}  # 返回最后有效价格
-            
+
             price = ticker.get('last')  # 最新成交价
             if not self._validate_price(price):
-                logger.error(f"获取到无效的价格: {price}")
+                logger.error("获取到无效的价格: %s", price)
                 return {'price': self.last_valid_price}  # 返回最后有效价格
-            
+
             # 更新价格缓存
             self.update_price_cache(price)
-            logger.debug(f"成功获取REST API价格: {price}")
+            logger.debug("成功获取REST API价格: %s", price)
             return {'price': price}
-            
+
         except Exception as e:
-            logger.error(f"获取ticker失败: {e}")
+            logger.error("获取ticker失败: %s", e)
             return {'price': self.last_valid_price}  # 返回最后有效价格
 
     def _validate_price(self, price):
-        """简化的价格验证"""
-        if price is None or price <= 0:
-            return False
-        
-        # 只做基本的合理性检查，避免过度验证
-        if self.last_valid_price:
-            # 价格变动超过10%才认为异常
-            change_ratio = abs(price - self.last_valid_price) / self.last_valid_price
-            if change_ratio > 0.1:
-                logger.warning(f"价格变动异常: {self.last_valid_price} -> {price}")
-                return False
-        
-        return True
+        """简化的价格验证：落在预计算的±10%价格带内即有效"""
+        if price is not None and 0 < price and self._price_low <= price <= self._price_high:
+            return True
+        # 异常价格是罕见路径，日志降到debug避免刷屏
+        logger.debug("价格校验未通过: %s (当前价格带 %s ~ %s)",
+                     price, self._price_low, self._price_high)
+        return False
 
     def update_price_cache(self, price):
         """更新价格缓存"""
         if self._validate_price(price):
             self.last_valid_price = price
-            self.last_price_update_time = time.time()
+            self._price_low = price * 0.9
+            self._price_high = price * 1.1
+            # monotonic_ns返回整数且不受系统时钟回拨影响，WS每个tick都走这里，
+            # 比time.time()少一次浮点装箱；年龄判断用整数纳秒差
+            self.last_price_update_time = time.monotonic_ns()
 
     def update_websocket_price(self, price):
         """更新WebSocket价格"""
@@ -351,46 +909,50 @@ class ExchangeInterface:
             self.websocket_price = price
             self.update_price_cache(price)
 
-    def place_take_profit_order(self, side, price, quantity):
+    async def place_take_profit_order(self, side, price, quantity):
         """挂止盈单"""
         try:
-            # 检查是否已有相同价格的挂单
-            orders = self.fetch_open_orders()
-            for order in orders:
-                if (
-                    order['info'].get('positionSide') == side.upper()
-                    and float(order['price']) == price
-                    and order['side'] == ('sell' if side == 'long' else 'buy')
-                ):
-                    logger.info(f"已存在相同价格的 {side} 止盈单，跳过挂单")
+            # 持仓方向查表得到平仓方向和positionSide，两个分支合并成一条路径
+            tp_side, pos_side = _TP_MAP[side]
+
+            # 检查是否已有相同价格的挂单：推送流在线时O(1)查索引，
+            # 否则退回REST快照的线性扫描
+            if self._orders_stream_ready:
+                if (pos_side, self._price_to_ticks(price), tp_side) in self._order_index:
+                    logger.info("已存在相同价格的 %s 止盈单，跳过挂单", side)
                     return
-            
-            # 修正价格精度
-            price = round(price, self.price_precision)
-            
+            else:
+                orders = await self.fetch_open_orders()
+                for order in orders:
+                    if (
+                        order['info'].get('positionSide') == pos_side
+                        and float(order['price']) == price
+                        and order['side'] == tp_side
+                    ):
+                        logger.info("已存在相同价格的 %s 止盈单，跳过挂单", side)
+                        return
+
+            # 修正价格精度（tick量化）
+            price = self._q_price(price)
+
             # 修正数量精度并确保不低于最小下单数量
-            quantity = round(quantity, self.amount_precision)
-            quantity = max(quantity, self.min_order_amount)
-            
+            quantity = max(self._q_amount(quantity), self.min_order_amount)
+
             params = {
                 'newClientOrderId': self.generate_client_order_id(),
                 'reduce_only': True,
-                'positionSide': side.upper()
+                'positionSide': pos_side
             }
-            
-            if side == 'long':
-                order = self.exchange.create_order(
-                    config.get_ccxt_symbol(), 'limit', 'sell', quantity, price, params
-                )
-                logger.info(f"成功挂 long 止盈单: 卖出 {quantity} @ {price}")
-            elif side == 'short':
-                order = self.exchange.create_order(
-                    config.get_ccxt_symbol(), 'limit', 'buy', quantity, price, params
-                )
-                logger.info(f"成功挂 short 止盈单: 买入 {quantity} @ {price}")
-            
+
+            await self._order_bucket.acquire()
+            order = await self.exchange.create_order(
+                self._symbol, 'limit', tp_side, quantity, price, params
+            )
+            logger.info("成功挂 %s 止盈单: %s %s @ %s",
+                        side, '卖出' if tp_side == 'sell' else '买入', quantity, price)
+
             return order
-            
+
         except ccxt.BaseError as e:
-            logger.error(f"挂止盈单失败: {e}")
-            return None
\ No newline at end of file
+            logger.error("挂止盈单失败: %s", e)
+            return None
@@ -13,19 +13,84 @@
 """
 
 import asyncio
+import atexit
+import math
+import os
 import time
 import logging
 import json
+import numpy as np
+from collections import deque
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Tuple
+from typing import Deque, Dict, List, Optional
 from dataclasses import dataclass
 from config import config
 
 logger = logging.getLogger(__name__)
 
-@dataclass
+# orjson（Rust实现）序列化/反序列化比标准库json快数倍，
+# 未安装时状态持久化自动退回标准库
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Numba为可选加速依赖：存在时把趋势窗口高/低/中值和ATR回退计算
+# 融合成环形数组上的单次JIT遍历，不存在时退回numpy向量化实现
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+
+if NUMBA_AVAILABLE:
+    @njit(cache=True, fastmath=True)
+    def _tick_kernel(prices, head, count, window, period):
+        """单遍历tick内核：窗口最高/最低价与收盘差ATR一次算完"""
+        n = prices.shape[0]
+        hi = prices[(head - 1) % n]
+        lo = hi
+        for i in range(1, window):
+            v = prices[(head - 1 - i) % n]
+            if v > hi:
+                hi = v
+            if v < lo:
+                lo = v
+        atr = 0.0
+        if count >= period + 1:
+            s = 0.0
+            prev = prices[(head - period - 1) % n]
+            for i in range(period):
+                cur = prices[(head - period + i) % n]
+                d = cur - prev
+                s += d if d >= 0.0 else -d
+                prev = cur
+            atr = s / period
+        return hi, lo, atr
+else:
+    # 窗口下标模板按长度缓存一次：每tick只做一次整型加法广播，
+    # 不再重复构造arange
+    _OFFSET_CACHE = {}
+
+    def _tail_offsets(k):
+        offs = _OFFSET_CACHE.get(k)
+        if offs is None:
+            offs = _OFFSET_CACHE[k] = np.arange(-k, 0)
+        return offs
+
+    def _tick_kernel(prices, head, count, window, period):
+        """numpy退回实现：与JIT内核语义一致"""
+        w = prices.take(head + _tail_offsets(window), mode='wrap')
+        atr = 0.0
+        if count >= period + 1:
+            idx2 = head + _tail_offsets(period + 1)
+            atr = float(np.abs(np.diff(prices.take(idx2, mode='wrap'))).mean())
+        return float(w.max()), float(w.min()), atr
+
+@dataclass(slots=True, frozen=True)
 class KlineData:
-    """1小时K线数据类"""
+    """1小时K线数据类(slots免__dict__开销，frozen构造后不可变)"""
     timestamp: datetime
     open_price: float
     high_price: float
@@ -35,9 +100,9 @@ class KlineData:
     direction: str  # 'up', 'down', 'neutral'
     change_percent: float  # 单根K线涨跌幅
 
-@dataclass
+@dataclass(slots=True)
 class MarketState:
-    """市场状态数据类"""
+    """市场状态数据类(单实例原地复用，每tick只改字段不新建对象)"""
     timestamp: datetime
     price: float
     trend_start_price: float
@@ -49,7 +114,7 @@ class MarketState:
     is_extreme: bool
     protection_triggered: bool
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class ProtectionConfig:
     """防护配置"""
     extreme_threshold: float = 11.0  # 极端阈值 11%
@@ -71,20 +136,41 @@ class ExtremeMarketProtection:
     5. 自动恢复机制
     """
     
-    def __init__(self, config: ProtectionConfig = None):
+    def __init__(self, config: ProtectionConfig = None, exchange_interface=None):
         self.config = config or ProtectionConfig()
+        # 每个tick都要比对的阈值缓存成实例属性，省去config两级属性查找
+        self._extreme_threshold = self.config.extreme_threshold
         
-        # K线数据缓冲区
-        self.kline_buffer: List[KlineData] = []
-        self.max_kline_buffer_size = 168  # 保留7天的1小时K线数据
+        # 异步交易所接口(ExchangeInterface)：紧急撤单/平仓直接await其
+        # 协程方法，gather才是真正的并发而不是在事件循环里串行阻塞
+        self.exchange = exchange_interface
         
-        # 市场数据缓冲区(保留用于ATR计算)
-        self.price_buffer: List[Tuple[datetime, float]] = []
+        # K线数据缓冲区：SoA列式环形数组，每列连续内存，指标计算可以
+        # 直接在列上向量化；KlineData对象只在按需读取时临时构造
+        self.max_kline_buffer_size = 168  # 保留7天的1小时K线数据
+        n = self.max_kline_buffer_size
+        self._k_ts = np.empty(n, dtype=np.int64)  # epoch微秒
+        self._k_open = np.empty(n, dtype=np.float64)
+        self._k_high = np.empty(n, dtype=np.float64)
+        self._k_low = np.empty(n, dtype=np.float64)
+        self._k_close = np.empty(n, dtype=np.float64)
+        self._k_volume = np.empty(n, dtype=np.float64)
+        self._k_dir = np.empty(n, dtype=np.int8)  # 1=up, -1=down, 0=neutral
+        self._k_chg = np.empty(n, dtype=np.float64)
+        self._k_head = 0  # 下一个写入位置
+        self._k_len = 0
+        
+        # 市场数据缓冲区(用于ATR计算)：预分配定长float64环形数组，
+        # 每tick只写一个槽位，无Python对象分配，历史长度恒定
         self.max_buffer_size = 100
+        self._price_ring = np.empty(self.max_buffer_size, dtype=np.float64)
+        self._ring_head = 0  # 下一个写入位置
+        self._ring_len = 0
         
         # 连续同向K线趋势状态
         self.consecutive_trend_start_price = None
         self.consecutive_trend_start_time = None
+        self._consecutive_trend_start_iso = None  # 同步维护的iso串
         self.consecutive_trend_direction = 'neutral'
         self.consecutive_kline_count = 0
         self.cumulative_change_percent = 0.0
@@ -98,28 +184,61 @@ class ExtremeMarketProtection:
         # 防护状态
         self.protection_active = False
         self.hibernation_start_time = None
-        self.last_atr_values = []  # ATR历史值
+        self._hibernation_start_iso = None  # 与datetime同步维护的iso串，存盘直读
+        # 休眠计时用monotonic标量：经过时长就是一次浮点减法，
+        # 不用每次检查都构造datetime对象做timedelta运算，也不受系统对时影响
+        self._hibernation_start_monotonic = None
+        self.last_atr_values: Deque[float] = deque(maxlen=50)  # ATR历史值
         self.baseline_atr = None  # 基准ATR值
         
+        # K线路径的增量Wilder ATR状态：TR用高/低/前收计算，
+        # RMA平滑每根K线O(1)更新，无需回看窗口
+        self._atr_period = 14
+        self._prev_close = None
+        self._atr_value = None  # 种子期结束前为None
+        self._tr_seed_sum = 0.0
+        self._tr_seed_count = 0
+        
         # 状态文件路径
         self.state_file = "extreme_protection_state.json"
         
+        # 状态落盘去抖：变更只置脏标记，由后台任务每5秒合并写一次，
+        # 进程退出时atexit兜底补一次写
+        self._state_dirty = False
+        self._flusher_task = None
+        atexit.register(self._flush_state_on_exit)
+        
+        # 复用的市场状态对象：每tick原地改字段返回，省掉每秒N次的
+        # dataclass构造与GC压力(调用方同步消费，不跨tick持有引用)
+        _epoch = datetime.now()
+        self._market_state = MarketState(
+            timestamp=_epoch, price=0.0, trend_start_price=0.0,
+            trend_start_time=_epoch, trend_direction='neutral',
+            trend_magnitude=0.0, consecutive_klines=0, atr_value=0.0,
+            is_extreme=False, protection_triggered=False,
+        )
+        
         # 初始化
         self._load_state()
         
         logger.info("极端行情防护系统初始化完成")
-        logger.info(f"防护配置: 阈值={self.config.extreme_threshold}%, 休眠={self.config.hibernation_hours}小时")
+        logger.info("防护配置: 阈值=%s%%, 休眠=%s小时", self.config.extreme_threshold, self.config.hibernation_hours)
     
     def _load_state(self):
         """加载防护状态"""
         try:
-            with open(self.state_file, 'r', encoding='utf-8') as f:
-                state = json.load(f)
-                
+            with open(self.state_file, 'rb') as f:
+                raw = f.read()
+            state = orjson.loads(raw) if orjson is not None else json.loads(raw)
+            
             self.protection_active = state.get('protection_active', False)
             hibernation_start = state.get('hibernation_start_time')
             if hibernation_start:
                 self.hibernation_start_time = datetime.fromisoformat(hibernation_start)
+                self._hibernation_start_iso = hibernation_start
+                # 重启后按墙钟差值折算monotonic起点，续算剩余休眠时长
+                already_elapsed = (datetime.now() - self.hibernation_start_time).total_seconds()
+                self._hibernation_start_monotonic = time.monotonic() - already_elapsed
             
             self.baseline_atr = state.get('baseline_atr')
             
@@ -130,36 +249,75 @@ class ExtremeMarketProtection:
             
             if state.get('consecutive_trend_start_time'):
                 self.consecutive_trend_start_time = datetime.fromisoformat(state['consecutive_trend_start_time'])
+                self._consecutive_trend_start_iso = state['consecutive_trend_start_time']
             self.consecutive_trend_start_price = state.get('consecutive_trend_start_price')
             
-            logger.info(f"已加载防护状态: 激活={self.protection_active}, 休眠开始={self.hibernation_start_time}, "
-                      f"连续趋势={self.consecutive_trend_direction}, K线数={self.consecutive_kline_count}")
+            logger.info("已加载防护状态: 激活=%s, 休眠开始=%s, 连续趋势=%s, K线数=%s",
+                        self.protection_active, self.hibernation_start_time,
+                        self.consecutive_trend_direction, self.consecutive_kline_count)
             
         except FileNotFoundError:
             logger.info("未找到状态文件，使用默认状态")
         except Exception as e:
-            logger.error(f"加载状态文件失败: {e}")
+            logger.error("加载状态文件失败: %s", e)
     
     def _save_state(self):
         """保存保护状态"""
         try:
             state = {
                 'protection_active': self.protection_active,
-                'hibernation_start_time': self.hibernation_start_time.isoformat() if self.hibernation_start_time else None,
+                'hibernation_start_time': self._hibernation_start_iso,
                 'baseline_atr': self.baseline_atr,
                 'consecutive_trend_direction': self.consecutive_trend_direction,
                 'consecutive_kline_count': self.consecutive_kline_count,
                 'cumulative_change_percent': self.cumulative_change_percent,
-                'consecutive_trend_start_time': self.consecutive_trend_start_time.isoformat() if self.consecutive_trend_start_time else None,
+                'consecutive_trend_start_time': self._consecutive_trend_start_iso,
                 'consecutive_trend_start_price': self.consecutive_trend_start_price,
                 'last_update': datetime.now().isoformat()
             }
             
-            with open(self.state_file, 'w', encoding='utf-8') as f:
-                json.dump(state, f, indent=2, ensure_ascii=False)
+            # 紧凑序列化(去掉indent美化)后先写临时文件再原子改名，
+            # 进程在写入中途被杀也不会留下半截状态文件
+            if orjson is not None:
+                # OPT_SERIALIZE_NUMPY兜底：趋势/ATR字段若混入numpy标量
+                # 也能直接序列化，不会抛TypeError丢状态
+                raw = orjson.dumps(state, option=orjson.OPT_SERIALIZE_NUMPY)
+            else:
+                raw = json.dumps(state, ensure_ascii=False).encode('utf-8')
+            tmp_file = self.state_file + '.tmp'
+            with open(tmp_file, 'wb') as f:
+                f.write(raw)
+            os.replace(tmp_file, self.state_file)
                 
         except Exception as e:
-            logger.error(f"保存状态文件失败: {e}")
+            logger.error("保存状态文件失败: %s", e)
+    
+    def _mark_state_dirty(self):
+        """标记状态已变更，交给后台任务合并落盘；无事件循环时直接写"""
+        self._state_dirty = True
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # 同步调用场景(如脚本里手动重置)，没有循环可挂任务，直接落盘
+            self._state_dirty = False
+            self._save_state()
+            return
+        if self._flusher_task is None or self._flusher_task.done():
+            self._flusher_task = loop.create_task(self._state_flusher())
+    
+    async def _state_flusher(self):
+        """后台落盘循环：把突发的多次状态变更合并成每5秒至多一次磁盘写"""
+        while self._state_dirty:
+            await asyncio.sleep(5)
+            if self._state_dirty:
+                self._state_dirty = False
+                await asyncio.get_running_loop().run_in_executor(None, self._save_state)
+    
+    def _flush_state_on_exit(self):
+        """进程退出时补写未落盘的状态变更"""
+        if self._state_dirty:
+            self._state_dirty = False
+            self._save_state()
     
     def update_kline_data(self, open_price: float, high_price: float, low_price: float, 
                           close_price: float, volume: float, timestamp: datetime = None) -> MarketState:
@@ -179,61 +337,48 @@ class ExtremeMarketProtection:
         """
         current_time = timestamp or datetime.now()
         
-        # 计算K线涨跌幅和方向
+        # 计算K线涨跌幅和方向(单次除法+符号判断)
         change_percent = ((close_price - open_price) / open_price) * 100
-        if change_percent > 0.1:  # 上涨超过0.1%
-            direction = 'up'
-        elif change_percent < -0.1:  # 下跌超过0.1%
-            direction = 'down'
-        else:
-            direction = 'neutral'
-        
-        # 创建K线数据
-        kline_data = KlineData(
-            timestamp=current_time,
-            open_price=open_price,
-            high_price=high_price,
-            low_price=low_price,
-            close_price=close_price,
-            volume=volume,
-            direction=direction,
-            change_percent=change_percent
+        direction = 'up' if change_percent > 0.1 else 'down' if change_percent < -0.1 else 'neutral'
+        
+        # 写入K线列式环形缓冲区(满员自动覆盖最旧一根)
+        h = self._k_head
+        self._k_ts[h] = int(current_time.timestamp() * 1_000_000)
+        self._k_open[h] = open_price
+        self._k_high[h] = high_price
+        self._k_low[h] = low_price
+        self._k_close[h] = close_price
+        self._k_volume[h] = volume
+        self._k_dir[h] = 1 if direction == 'up' else (-1 if direction == 'down' else 0)
+        self._k_chg[h] = change_percent
+        self._k_head = (h + 1) % self.max_kline_buffer_size
+        if self._k_len < self.max_kline_buffer_size:
+            self._k_len += 1
+        
+        # 检测连续同向K线趋势(直接传标量，不为热路径构造对象)
+        self._detect_consecutive_trend(
+            direction, open_price, close_price, change_percent, current_time
         )
         
-        # 更新K线缓冲区
-        self.kline_buffer.append(kline_data)
-        if len(self.kline_buffer) > self.max_kline_buffer_size:
-            self.kline_buffer.pop(0)
-        
-        # 检测连续同向K线趋势
-        self._detect_consecutive_trend(kline_data)
-        
         # 更新价格缓冲区(用于ATR计算)
-        self.price_buffer.append((current_time, close_price))
-        if len(self.price_buffer) > self.max_buffer_size:
-            self.price_buffer.pop(0)
+        self._ingest_price(current_time, close_price)
         
-        # 计算ATR
-        atr_value = self._calculate_atr()
+        # 增量更新ATR(真实波幅含跳空，Wilder RMA平滑)
+        atr_value = self._update_atr(high_price, low_price, close_price)
         
         # 检测极端行情(基于连续同向K线累计涨跌幅)
-        is_extreme = abs(self.cumulative_change_percent) >= self.config.extreme_threshold
-        
-        # 创建市场状态
-        market_state = MarketState(
-            timestamp=current_time,
-            price=close_price,
-            trend_start_price=self.consecutive_trend_start_price or close_price,
-            trend_start_time=self.consecutive_trend_start_time or current_time,
-            trend_direction=self.consecutive_trend_direction,
-            trend_magnitude=self.cumulative_change_percent,
-            consecutive_klines=self.consecutive_kline_count,
-            atr_value=atr_value,
-            is_extreme=is_extreme,
-            protection_triggered=self.protection_active
+        is_extreme = math.fabs(self.cumulative_change_percent) >= self._extreme_threshold
+        
+        # 原地更新并返回复用的市场状态
+        return self._fill_state(
+            current_time, close_price,
+            self.consecutive_trend_start_price or close_price,
+            self.consecutive_trend_start_time or current_time,
+            self.consecutive_trend_direction,
+            self.cumulative_change_percent,
+            self.consecutive_kline_count,
+            atr_value, is_extreme,
         )
-        
-        return market_state
     
     def update_market_data(self, price: float, volume: float = None) -> MarketState:
         """
@@ -248,16 +393,26 @@ class ExtremeMarketProtection:
         """
         current_time = datetime.now()
         
-        # 更新价格缓冲区
-        self.price_buffer.append((current_time, price))
-        if len(self.price_buffer) > self.max_buffer_size:
-            self.price_buffer.pop(0)
-        
-        # 计算ATR
+        # 统一入口：价格缓冲区只在这里写一次，ATR每tick只算一次
+        self._ingest_price(current_time, price)
         atr_value = self._calculate_atr()
         
-        # 检测趋势转折点
-        trend_info = self._detect_trend_change(price, current_time)
+        # K线数据在流入时，连续同向K线检测是趋势的权威来源，
+        # 不再重复跑实时价格趋势检测器，直接复用K线趋势状态
+        if self._k_len > 0:
+            is_extreme = math.fabs(self.cumulative_change_percent) >= self._extreme_threshold
+            return self._fill_state(
+                current_time, price,
+                self.consecutive_trend_start_price or price,
+                self.consecutive_trend_start_time or current_time,
+                self.consecutive_trend_direction,
+                self.cumulative_change_percent,
+                self.consecutive_kline_count,
+                atr_value, is_extreme,
+            )
+        
+        # 纯价格流模式：检测趋势转折点
+        self._detect_trend_change(price, current_time)
         
         # 计算当前趋势幅度
         trend_magnitude = 0.0
@@ -267,32 +422,31 @@ class ExtremeMarketProtection:
                 trend_magnitude = abs(trend_magnitude)
         
         # 检测极端行情
-        is_extreme = abs(trend_magnitude) >= self.config.extreme_threshold
-        
-        # 创建市场状态(保持兼容性)
-        market_state = MarketState(
-            timestamp=current_time,
-            price=price,
-            trend_start_price=self.current_trend_start_price or price,
-            trend_start_time=self.current_trend_start_time or current_time,
-            trend_direction=self.current_trend_direction,
-            trend_magnitude=trend_magnitude,
-            consecutive_klines=0,  # 实时价格模式下设为0
-            atr_value=atr_value,
-            is_extreme=is_extreme,
-            protection_triggered=self.protection_active
+        is_extreme = math.fabs(trend_magnitude) >= self._extreme_threshold
+        
+        # 原地更新并返回复用的市场状态(实时价格模式下连续K线数为0)
+        return self._fill_state(
+            current_time, price,
+            self.current_trend_start_price or price,
+            self.current_trend_start_time or current_time,
+            self.current_trend_direction,
+            trend_magnitude, 0,
+            atr_value, is_extreme,
         )
-        
-        return market_state
     
-    def _detect_consecutive_trend(self, kline_data: KlineData):
+    def _detect_consecutive_trend(self, current_direction: str, open_price: float,
+                                  close_price: float, change_percent: float,
+                                  timestamp: datetime):
         """
         检测连续同向K线趋势并计算累计涨跌幅
         
         Args:
-            kline_data: 当前K线数据
+            current_direction: 当前K线方向('up'/'down'/'neutral')
+            open_price: 开盘价
+            close_price: 收盘价
+            change_percent: 单根K线涨跌幅
+            timestamp: K线时间戳
         """
-        current_direction = kline_data.direction
         
         # 如果当前K线方向与连续趋势方向相同，继续累计
         if current_direction == self.consecutive_trend_direction and current_direction != 'neutral':
@@ -301,7 +455,7 @@ class ExtremeMarketProtection:
             # 计算从趋势开始到当前的累计涨跌幅
             if self.consecutive_trend_start_price:
                 self.cumulative_change_percent = (
-                    (kline_data.close_price - self.consecutive_trend_start_price) / 
+                    (close_price - self.consecutive_trend_start_price) / 
                     self.consecutive_trend_start_price
                 ) * 100
                 
@@ -313,74 +467,154 @@ class ExtremeMarketProtection:
         elif current_direction != 'neutral' and current_direction != self.consecutive_trend_direction:
             # 开始新的连续趋势
             self.consecutive_trend_direction = current_direction
-            self.consecutive_trend_start_price = kline_data.open_price
-            self.consecutive_trend_start_time = kline_data.timestamp
+            self.consecutive_trend_start_price = open_price
+            self.consecutive_trend_start_time = timestamp
+            self._consecutive_trend_start_iso = timestamp.isoformat()
             self.consecutive_kline_count = 1
             
             # 计算初始累计涨跌幅
-            self.cumulative_change_percent = abs(kline_data.change_percent)
+            self.cumulative_change_percent = abs(change_percent)
             
-            logger.info(f"开始新的连续{current_direction}趋势，起始价格: {kline_data.open_price}")
+            logger.info("开始新的连续%s趋势，起始价格: %s", current_direction, open_price)
         
         # 如果是neutral K线，重置连续趋势
         elif current_direction == 'neutral':
             if self.consecutive_trend_direction != 'neutral':
-                logger.info(f"连续{self.consecutive_trend_direction}趋势结束，"
-                          f"持续{self.consecutive_kline_count}根K线，"
-                          f"累计涨跌幅: {self.cumulative_change_percent:.2f}%")
+                logger.info("连续%s趋势结束，持续%d根K线，累计涨跌幅: %.2f%%",
+                            self.consecutive_trend_direction, self.consecutive_kline_count,
+                            self.cumulative_change_percent)
             
             self._reset_consecutive_trend()
         
-        # 记录当前状态
-        logger.debug(f"连续趋势状态 - 方向: {self.consecutive_trend_direction}, "
-                    f"K线数: {self.consecutive_kline_count}, "
-                    f"累计涨跌幅: {self.cumulative_change_percent:.2f}%")
+        # 记录当前状态(先判级别，DEBUG未开启时连格式化都省掉)
+        logger.debug("连续趋势状态 - 方向: %s, K线数: %d, 累计涨跌幅: %.2f%%",
+                     self.consecutive_trend_direction, self.consecutive_kline_count,
+                     self.cumulative_change_percent)
+    
+    @property
+    def kline_count(self) -> int:
+        """缓冲区内K线数量"""
+        return self._k_len
+    
+    def kline_at(self, index: int) -> KlineData:
+        """按逻辑下标(0=最旧, -1=最新)从列式缓冲区构造KlineData视图"""
+        if not -self._k_len <= index < self._k_len:
+            raise IndexError("kline index out of range")
+        if index < 0:
+            index += self._k_len
+        i = (self._k_head - self._k_len + index) % self.max_kline_buffer_size
+        d = int(self._k_dir[i])
+        return KlineData(
+            timestamp=datetime.fromtimestamp(self._k_ts[i] / 1_000_000),
+            open_price=float(self._k_open[i]),
+            high_price=float(self._k_high[i]),
+            low_price=float(self._k_low[i]),
+            close_price=float(self._k_close[i]),
+            volume=float(self._k_volume[i]),
+            direction='up' if d == 1 else ('down' if d == -1 else 'neutral'),
+            change_percent=float(self._k_chg[i]),
+        )
     
     def _reset_consecutive_trend(self):
         """重置连续趋势状态"""
         self.consecutive_trend_direction = 'neutral'
         self.consecutive_trend_start_price = None
         self.consecutive_trend_start_time = None
+        self._consecutive_trend_start_iso = None
         self.consecutive_kline_count = 0
         self.cumulative_change_percent = 0.0
     
+    def _update_atr(self, high_price: float, low_price: float, close_price: float) -> float:
+        """
+        按Wilder平滑增量更新ATR: atr = atr + (tr - atr) / n
+        
+        真实波幅取max(高-低, |高-前收|, |低-前收|)，覆盖跳空缺口；
+        前period根K线累计种子均值，之后每根K线O(1)递推，
+        数值与整窗重算的Wilder ATR一致
+        
+        Returns:
+            float: 当前ATR值(种子期未满时为0.0)
+        """
+        if self._prev_close is None:
+            tr = high_price - low_price
+        else:
+            tr = max(
+                high_price - low_price,
+                abs(high_price - self._prev_close),
+                abs(low_price - self._prev_close),
+            )
+        self._prev_close = close_price
+        
+        if self._atr_value is None:
+            self._tr_seed_sum += tr
+            self._tr_seed_count += 1
+            if self._tr_seed_count < self._atr_period:
+                return 0.0
+            self._atr_value = self._tr_seed_sum / self._atr_period
+        else:
+            self._atr_value += (tr - self._atr_value) / self._atr_period
+        
+        self._record_atr(self._atr_value)
+        return self._atr_value
+    
+    def _record_atr(self, atr: float):
+        """记录ATR历史并在积累足够样本后固定基准ATR"""
+        self.last_atr_values.append(atr)
+        if self.baseline_atr is None and len(self.last_atr_values) >= 20:
+            self.baseline_atr = sum(self.last_atr_values) / len(self.last_atr_values)
+    
+    def _fill_state(self, timestamp, price, trend_start_price, trend_start_time,
+                    trend_direction, trend_magnitude, consecutive_klines,
+                    atr_value, is_extreme) -> MarketState:
+        """原地填充复用的MarketState并返回(调用方须同步消费，不要跨tick持有)"""
+        s = self._market_state
+        s.timestamp = timestamp
+        s.price = price
+        s.trend_start_price = trend_start_price
+        s.trend_start_time = trend_start_time
+        s.trend_direction = trend_direction
+        s.trend_magnitude = trend_magnitude
+        s.consecutive_klines = consecutive_klines
+        s.atr_value = atr_value
+        s.is_extreme = is_extreme
+        s.protection_triggered = self.protection_active
+        return s
+    
+    def _ingest_price(self, current_time: datetime, price: float):
+        """价格入缓冲区的唯一入口：只写环形数组的当前槽位，O(1)无分配"""
+        self._price_ring[self._ring_head] = price
+        self._ring_head = (self._ring_head + 1) % self.max_buffer_size
+        if self._ring_len < self.max_buffer_size:
+            self._ring_len += 1
+    
     def _calculate_atr(self, period: int = 14) -> float:
         """
         计算平均真实波幅(ATR)
         
+        优先返回K线路径维护的增量Wilder ATR；只有纯价格流(无K线)时
+        才退回环形数组上的收盘价差均值：最近period+1个价格通过模索引
+        一次取出，|diff|的均值在C层单趟算完
+        
         Args:
             period: ATR计算周期
             
         Returns:
             float: ATR值
         """
-        if len(self.price_buffer) < period + 1:
-            return 0.0
+        # K线路径已有增量Wilder ATR时直接复用，不再重算
+        if self._atr_value is not None:
+            return self._atr_value
         
-        true_ranges = []
-        for i in range(1, min(len(self.price_buffer), period + 1)):
-            current_price = self.price_buffer[-i][1]
-            previous_price = self.price_buffer[-i-1][1]
-            
-            # 简化ATR计算(仅使用价格变化)
-            true_range = abs(current_price - previous_price)
-            true_ranges.append(true_range)
+        if self._ring_len < period + 1:
+            return 0.0
         
-        if true_ranges:
-            atr = sum(true_ranges) / len(true_ranges)
-            
-            # 更新ATR历史
-            self.last_atr_values.append(atr)
-            if len(self.last_atr_values) > 50:  # 保留最近50个ATR值
-                self.last_atr_values.pop(0)
-            
-            # 设置基准ATR
-            if self.baseline_atr is None and len(self.last_atr_values) >= 20:
-                self.baseline_atr = sum(self.last_atr_values) / len(self.last_atr_values)
-            
-            return atr
+        _, _, atr = _tick_kernel(
+            self._price_ring, self._ring_head, self._ring_len,
+            min(self._ring_len, period + 1), period
+        )
         
-        return 0.0
+        self._record_atr(atr)
+        return atr
     
     def _detect_trend_change(self, current_price: float, current_time: datetime) -> Dict:
         """
@@ -393,15 +627,14 @@ class ExtremeMarketProtection:
         Returns:
             Dict: 趋势信息
         """
-        if len(self.price_buffer) < self.config.trend_detection_window:
+        if self._ring_len < self.config.trend_detection_window:
             return {'trend_changed': False}
         
-        # 获取最近的价格数据
-        recent_prices = [p[1] for p in self.price_buffer[-self.config.trend_detection_window:]]
-        
-        # 简单趋势检测：比较当前价格与窗口内的最高/最低价
-        window_high = max(recent_prices)
-        window_low = min(recent_prices)
+        # 简单趋势检测：窗口最高/最低价由tick内核在环形数组上单遍历算出
+        window_high, window_low, _ = _tick_kernel(
+            self._price_ring, self._ring_head, self._ring_len,
+            self.config.trend_detection_window, 14
+        )
         window_mid = (window_high + window_low) / 2
         
         new_direction = 'neutral'
@@ -422,7 +655,7 @@ class ExtremeMarketProtection:
             self.current_trend_start_price = current_price
             self.current_trend_start_time = current_time
             
-            logger.info(f"检测到趋势转折: {new_direction}, 起始价格: {current_price}")
+            logger.info("检测到趋势转折: %s, 起始价格: %s", new_direction, current_price)
         
         return {
             'trend_changed': trend_changed,
@@ -441,16 +674,22 @@ class ExtremeMarketProtection:
         Returns:
             bool: 是否触发了防护
         """
+        # 快速路径：未在防护状态且未达极端阈值(绝大多数tick)，立即返回
+        if not self.protection_active and not market_state.is_extreme:
+            return False
+        
         # 如果已经在防护状态，检查是否可以解除
         if self.protection_active:
             return await self._check_hibernation_end(market_state)
         
-        # 检查是否达到极端阈值(基于连续同向K线累计涨跌幅)
-        if market_state.is_extreme and not self.protection_active:
-            # 对于K线数据模式，检查连续K线数量
+        # 走到这里说明已达极端阈值(快速路径已排除其余情况)
+        # 对于K线数据模式，检查连续K线数量
+        if market_state.is_extreme:
             if market_state.consecutive_klines > 0:
-                logger.critical(f"检测到极端行情！连续{market_state.consecutive_klines}根{market_state.trend_direction}K线")
-                logger.critical(f"累计涨跌幅: {market_state.trend_magnitude:.2f}%, 超过阈值{self.config.extreme_threshold}%")
+                logger.critical("检测到极端行情！连续%d根%sK线",
+                                market_state.consecutive_klines, market_state.trend_direction)
+                logger.critical("累计涨跌幅: %.2f%%, 超过阈值%s%%",
+                                market_state.trend_magnitude, self._extreme_threshold)
                 
                 # 触发紧急防护
                 success = await self._trigger_emergency_protection(market_state)
@@ -460,8 +699,9 @@ class ExtremeMarketProtection:
                 trend_duration = (market_state.timestamp - market_state.trend_start_time).total_seconds() / 60
                 
                 if trend_duration >= self.config.min_trend_duration:
-                    logger.critical(f"检测到极端行情！趋势幅度: {market_state.trend_magnitude:.2f}%")
-                    logger.critical(f"趋势方向: {market_state.trend_direction}, 持续时间: {trend_duration:.1f}分钟")
+                    logger.critical("检测到极端行情！趋势幅度: %.2f%%", market_state.trend_magnitude)
+                    logger.critical("趋势方向: %s, 持续时间: %.1f分钟",
+                                    market_state.trend_direction, trend_duration)
                     
                     # 触发紧急防护
                     success = await self._trigger_emergency_protection(market_state)
@@ -480,13 +720,17 @@ class ExtremeMarketProtection:
             bool: 是否成功触发防护
         """
         try:
-            logger.critical("=" * 60)
-            logger.critical("触发极端行情紧急防护机制！")
-            logger.critical(f"当前价格: {market_state.price}")
-            logger.critical(f"趋势起始价格: {market_state.trend_start_price}")
-            logger.critical(f"趋势幅度: {market_state.trend_magnitude:.2f}%")
-            logger.critical(f"趋势方向: {market_state.trend_direction}")
-            logger.critical("=" * 60)
+            # 触发信息压成单条记录：一次handler调度，结构化负载便于事后检索
+            payload = {
+                'event': 'emergency_protection_triggered',
+                'price': market_state.price,
+                'trend_start_price': market_state.trend_start_price,
+                'trend_magnitude': round(market_state.trend_magnitude, 2),
+                'trend_direction': market_state.trend_direction,
+            }
+            payload_raw = (orjson.dumps(payload).decode('utf-8') if orjson is not None
+                           else json.dumps(payload, ensure_ascii=False))
+            logger.critical("触发极端行情紧急防护机制！%s", payload_raw)
             
             # 1. 立即停止所有新订单
             logger.critical("步骤1: 停止所有新订单")
@@ -503,10 +747,12 @@ class ExtremeMarketProtection:
             if cancel_success and close_success:
                 self.protection_active = True
                 self.hibernation_start_time = datetime.now()
-                self._save_state()
+                self._hibernation_start_iso = self.hibernation_start_time.isoformat()
+                self._hibernation_start_monotonic = time.monotonic()
+                self._mark_state_dirty()
                 
-                logger.critical(f"紧急防护激活成功！休眠开始时间: {self.hibernation_start_time}")
-                logger.critical(f"预计恢复时间: {self.hibernation_start_time + timedelta(hours=self.config.hibernation_hours)}")
+                logger.critical("紧急防护激活成功！休眠开始时间: %s", self.hibernation_start_time)
+                logger.critical("预计恢复时间: %s", self.hibernation_start_time + timedelta(hours=self.config.hibernation_hours))
                 
                 return True
             else:
@@ -514,7 +760,7 @@ class ExtremeMarketProtection:
                 return False
                 
         except Exception as e:
-            logger.error(f"触发紧急防护失败: {e}")
+            logger.error("触发紧急防护失败: %s", e)
             return False
     
     async def _cancel_all_orders(self) -> bool:
@@ -525,30 +771,35 @@ class ExtremeMarketProtection:
             bool: 是否成功
         """
         try:
-            # 获取所有开放订单
-            open_orders = self.exchange.get_open_orders()
+            # 直接打一键撤单端点：单次RPC撤掉全部挂单，不先花一次往返
+            # 列出订单(空挂单时该端点同样秒回成功)
+            if await self.exchange.cancel_all_orders():
+                return True
+            
+            # 端点失败才列出挂单并发逐单撤
+            open_orders = await self.exchange.fetch_open_orders()
             
             if not open_orders:
                 logger.info("没有需要取消的挂单")
                 return True
             
-            logger.info(f"发现 {len(open_orders)} 个挂单，开始取消...")
+            logger.info("发现 %d 个挂单，开始取消...", len(open_orders))
             
-            cancel_tasks = []
-            for order in open_orders:
-                task = asyncio.create_task(self._cancel_single_order(order['id']))
-                cancel_tasks.append(task)
+            # TaskGroup结构化并发：一次调度全部撤单协程，退出时全部完成
+            # (_cancel_single_order自捕获异常返回bool，不会触发组内连锁取消)
+            async with asyncio.TaskGroup() as tg:
+                cancel_tasks = [
+                    tg.create_task(self._cancel_single_order(order['id']))
+                    for order in open_orders
+                ]
             
-            # 并发取消所有订单
-            results = await asyncio.gather(*cancel_tasks, return_exceptions=True)
-            
-            success_count = sum(1 for r in results if r is True)
-            logger.info(f"订单取消结果: {success_count}/{len(open_orders)} 成功")
+            success_count = sum(1 for t in cancel_tasks if t.result() is True)
+            logger.info("订单取消结果: %d/%d 成功", success_count, len(open_orders))
             
             return success_count == len(open_orders)
             
         except Exception as e:
-            logger.error(f"取消所有订单失败: {e}")
+            logger.error("取消所有订单失败: %s", e)
             return False
     
     async def _cancel_single_order(self, order_id: str) -> bool:
@@ -562,10 +813,10 @@ class ExtremeMarketProtection:
             bool: 是否成功
         """
         try:
-            self.exchange.cancel_order(order_id)
+            await self.exchange.cancel_order(order_id)
             return True
         except Exception as e:
-            logger.error(f"取消订单 {order_id} 失败: {e}")
+            logger.error("取消订单 %s 失败: %s", order_id, e)
             return False
     
     async def _emergency_close_all_positions(self, current_price: float) -> bool:
@@ -580,92 +831,75 @@ class ExtremeMarketProtection:
         """
         try:
             # 获取当前持仓
-            positions = self.exchange.get_position()
+            long_position, short_position = await self.exchange.get_position()
             
-            if not positions:
+            if long_position <= 0 and short_position <= 0:
                 logger.info("没有需要平仓的持仓")
                 return True
             
-            close_tasks = []
-            
-            # 处理多头持仓
-            long_position = positions.get('long', 0)
-            if long_position > 0:
-                # 使用市价单紧急平仓
-                task = asyncio.create_task(
-                    self._place_emergency_close_order('sell', long_position, current_price, 'long')
-                )
-                close_tasks.append(task)
-            
-            # 处理空头持仓
-            short_position = positions.get('short', 0)
-            if short_position > 0:
-                # 使用市价单紧急平仓
-                task = asyncio.create_task(
-                    self._place_emergency_close_order('buy', short_position, current_price, 'short')
-                )
-                close_tasks.append(task)
-            
-            if not close_tasks:
-                logger.info("没有需要平仓的持仓")
-                return True
+            # TaskGroup并发双向平仓，退出时两边都已完成
+            async with asyncio.TaskGroup() as tg:
+                close_tasks = []
+                if long_position > 0:
+                    close_tasks.append(tg.create_task(
+                        self._place_emergency_close_order('sell', long_position, current_price, 'long')
+                    ))
+                if short_position > 0:
+                    close_tasks.append(tg.create_task(
+                        self._place_emergency_close_order('buy', short_position, current_price, 'short')
+                    ))
             
-            # 并发执行平仓
-            results = await asyncio.gather(*close_tasks, return_exceptions=True)
-            
-            success_count = sum(1 for r in results if r is True)
-            logger.info(f"持仓平仓结果: {success_count}/{len(close_tasks)} 成功")
+            success_count = sum(1 for t in close_tasks if t.result() is True)
+            logger.info("持仓平仓结果: %d/%d 成功", success_count, len(close_tasks))
             
             return success_count == len(close_tasks)
             
         except Exception as e:
-            logger.error(f"紧急平仓失败: {e}")
+            logger.error("紧急平仓失败: %s", e)
             return False
     
     async def _place_emergency_close_order(self, side: str, quantity: float, price: float, position_side: str) -> bool:
         """
-        下紧急平仓订单
+        下紧急市价平仓订单
         
         Args:
             side: 订单方向 ('buy' or 'sell')
             quantity: 数量
-            price: 价格
+            price: 当前价格(仅用于日志参考)
             position_side: 持仓方向 ('long' or 'short')
             
         Returns:
             bool: 是否成功
         """
         try:
-            # 使用侵略性限价单确保成交
-            if side == 'sell':
-                aggressive_price = price * 0.995  # 降低0.5%
-            else:
-                aggressive_price = price * 1.005  # 提高0.5%
+            # 市价单同步撮合：极端行情下0.5%的侵略性限价可能被瞬间穿越
+            # 永不成交，而防护恰恰在此时最需要确定性平仓；市价单在下单
+            # 响应里就带回成交结果，省掉整个30秒轮询等待
+            logger.critical("紧急市价平仓 %s: %s %s", position_side, side, quantity)
             
-            logger.critical(f"紧急平仓 {position_side}: {side} {quantity} @ {aggressive_price}")
-            
-            # 下单
-            order_result = self.exchange.place_order(
+            order_result = await self.exchange.place_order(
                 side=side,
-                price=aggressive_price,
+                price=None,
                 quantity=quantity,
-                reduce_only=True,
+                is_reduce_only=True,
                 position_side=position_side,
-                order_type='limit'
+                order_type='market'
             )
             
             if order_result:
-                logger.info(f"紧急平仓订单已下达: {order_result}")
-                
-                # 等待订单成交或超时
-                await self._wait_for_order_fill(order_result.get('id'), self.config.emergency_close_timeout)
+                status = order_result.get('status')
+                logger.info("紧急平仓订单已下达: id=%s, status=%s",
+                            order_result.get('id'), status)
+                if status in ('canceled', 'rejected', 'expired'):
+                    logger.error("紧急平仓订单被拒: %s", order_result)
+                    return False
                 return True
             else:
-                logger.error(f"紧急平仓订单下达失败")
+                logger.error("紧急平仓订单下达失败")
                 return False
                 
         except Exception as e:
-            logger.error(f"下紧急平仓订单失败: {e}")
+            logger.error("下紧急平仓订单失败: %s", e)
             return False
     
     async def _wait_for_order_fill(self, order_id: str, timeout: int):
@@ -676,26 +910,39 @@ class ExtremeMarketProtection:
             order_id: 订单ID
             timeout: 超时时间(秒)
         """
+        # 优先事件驱动：订单推送流在线时，订单离开挂单簿的瞬间被唤醒
+        try:
+            done = await self.exchange.wait_order_done(order_id, timeout)
+            if done is not None:
+                if done:
+                    logger.info("订单 %s 已终结(成交或撤销)", order_id)
+                else:
+                    logger.warning("订单 %s 等待成交超时", order_id)
+                return done
+        except Exception as e:
+            logger.error("等待订单事件失败，退回轮询: %s", e)
+        
+        # 退回轮询：指数退避50ms起步、1秒封顶，紧急平仓确认比固定1秒
+        # 间隔快一个数量级，又不会高频打满REST配额
         start_time = time.time()
+        delay = 0.05
         
         while time.time() - start_time < timeout:
             try:
-                order_status = self.exchange.get_order_status(order_id)
-                
-                if order_status and order_status.get('status') == 'filled':
-                    logger.info(f"订单 {order_id} 已成交")
+                open_orders = await self.exchange.fetch_open_orders()
+                if not any(str(o.get('id')) == str(order_id) for o in open_orders):
+                    logger.info("订单 %s 已终结(成交或撤销)", order_id)
                     return True
-                elif order_status and order_status.get('status') in ['canceled', 'rejected']:
-                    logger.warning(f"订单 {order_id} 状态异常: {order_status.get('status')}")
-                    return False
                 
-                await asyncio.sleep(1)
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, 1.0)
                 
             except Exception as e:
-                logger.error(f"检查订单状态失败: {e}")
-                await asyncio.sleep(1)
+                logger.error("检查订单状态失败: %s", e)
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, 1.0)
         
-        logger.warning(f"订单 {order_id} 等待成交超时")
+        logger.warning("订单 %s 等待成交超时", order_id)
         return False
     
     async def _check_hibernation_end(self, market_state: MarketState) -> bool:
@@ -711,15 +958,17 @@ class ExtremeMarketProtection:
         if not self.hibernation_start_time:
             return False
         
-        # 检查休眠时间是否已满
-        hibernation_duration = datetime.now() - self.hibernation_start_time
-        hibernation_hours = hibernation_duration.total_seconds() / 3600
+        # 检查休眠时间是否已满(monotonic标量差，免datetime构造)
+        if self._hibernation_start_monotonic is not None:
+            hibernation_hours = (time.monotonic() - self._hibernation_start_monotonic) / 3600
+        else:
+            hibernation_hours = (datetime.now() - self.hibernation_start_time).total_seconds() / 3600
         
         if hibernation_hours < self.config.hibernation_hours:
             # 休眠时间未满
             remaining_hours = self.config.hibernation_hours - hibernation_hours
             if int(hibernation_hours) % 6 == 0:  # 每6小时记录一次
-                logger.info(f"休眠中... 剩余时间: {remaining_hours:.1f} 小时")
+                logger.info("休眠中... 剩余时间: %.1f 小时", remaining_hours)
             return False
         
         # 休眠时间已满，检查ATR是否恢复正常
@@ -729,19 +978,21 @@ class ExtremeMarketProtection:
             # 结束防护状态
             self.protection_active = False
             self.hibernation_start_time = None
-            self._save_state()
+            self._hibernation_start_iso = None
+            self._hibernation_start_monotonic = None
+            self._mark_state_dirty()
             
             logger.critical("=" * 60)
             logger.critical("极端行情防护解除！")
-            logger.critical(f"休眠时长: {hibernation_hours:.1f} 小时")
-            logger.critical(f"当前ATR: {market_state.atr_value:.6f}")
-            logger.critical(f"基准ATR: {self.baseline_atr:.6f}")
+            logger.critical("休眠时长: %.1f 小时", hibernation_hours)
+            logger.critical("当前ATR: %.6f", market_state.atr_value)
+            logger.critical("基准ATR: %.6f", self.baseline_atr)
             logger.critical("网格策略即将重启...")
             logger.critical("=" * 60)
             
             return True
         else:
-            logger.info(f"休眠时间已满但ATR未恢复正常，继续等待 (当前ATR: {market_state.atr_value:.6f})")
+            logger.info("休眠时间已满但ATR未恢复正常，继续等待 (当前ATR: %.6f)", market_state.atr_value)
             return False
     
     def _is_atr_recovered(self, current_atr: float) -> bool:
@@ -806,11 +1057,13 @@ class ExtremeMarketProtection:
         
         self.protection_active = False
         self.hibernation_start_time = None
+        self._hibernation_start_iso = None
+        self._hibernation_start_monotonic = None
         self.current_trend_direction = 'neutral'
         self.current_trend_start_price = None
         self.current_trend_start_time = None
         
-        self._save_state()
+        self._mark_state_dirty()
         
         logger.warning("防护状态已强制重置")
 
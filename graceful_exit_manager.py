@@ -10,6 +10,7 @@ import sys
 import logging
 import asyncio
 import subprocess
+from collections import deque
 from typing import Optional
 
 class GracefulExitManager:
@@ -29,80 +30,123 @@ class GracefulExitManager:
         self.exit_requested = False
         self.exit_in_progress = False
         self.exit_completed = False
-        
+        # 紧急退路：置True时强制用子进程方式运行清理脚本
+        self.use_subprocess_cleanup = False
+        # 一次性闩锁：首个触发者创建退出任务，后续信号合并到同一个future，
+        # 避免布尔标志检查与任务创建之间的竞态产生重复退出任务
+        self._exit_future: Optional[asyncio.Future] = None
+
+        # 信号线程回传用的循环引用：构造时（通常在主循环内）抓取一次，
+        # 之后无论信号由哪个线程递送都投递到同一个循环
+        try:
+            self._loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self._loop = None
+
         # 注册信号处理器
         self._register_signal_handlers()
     
     def _register_signal_handlers(self):
-        """注册信号处理器"""
+        """注册信号处理器
+
+        优先使用loop.add_signal_handler：回调直接在事件循环内调度，
+        避免在C信号上下文里调用asyncio接口的重入风险；没有运行中的
+        事件循环或平台不支持（Windows）时退回signal.signal
+        """
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+
+        if loop is not None:
+            registered = []
+            try:
+                for sig in (signal.SIGINT, signal.SIGTERM):
+                    loop.add_signal_handler(sig, self._on_signal_from_loop, sig)
+                    registered.append(sig)
+                self.logger.info("信号处理器已注册到事件循环")
+                return
+            except NotImplementedError:
+                # Windows的事件循环不支持add_signal_handler，清掉已注册的再退回
+                for sig in registered:
+                    loop.remove_signal_handler(sig)
+
         try:
             # 注册SIGINT (Ctrl+C)
             signal.signal(signal.SIGINT, self._signal_handler)
-            
+
             # 在Windows上，SIGTERM可能不可用，尝试注册
             try:
                 signal.signal(signal.SIGTERM, self._signal_handler)
             except (OSError, ValueError):
                 self.logger.warning("SIGTERM信号在此平台不可用")
-            
+
             # 在Windows上注册SIGBREAK
             try:
                 if hasattr(signal, 'SIGBREAK'):
                     signal.signal(signal.SIGBREAK, self._signal_handler)
             except (OSError, ValueError):
                 pass
-            
+
             self.logger.info("信号处理器注册成功")
         except Exception as e:
             self.logger.error(f"注册信号处理器失败: {e}")
+
+    def _on_signal_from_loop(self, signum):
+        """事件循环内的信号回调：已运行在循环线程中，直接建任务即可"""
+        signal_name = signal.Signals(signum).name
+        self.logger.info(f"接收到{signal_name}信号，开始优雅退出...")
+
+        if self.exit_in_progress:
+            self.logger.warning("退出已在进行中，请稍候...")
+            return
+
+        self.exit_requested = True
+        self._trigger_exit()
+
+    def _trigger_exit(self):
+        """在事件循环线程内创建（或复用）唯一的退出任务"""
+        if self._exit_future is None:
+            self._exit_future = asyncio.ensure_future(self._graceful_exit())
+        return self._exit_future
     
     def _signal_handler(self, signum, frame):
-        """信号处理函数"""
+        """信号处理函数（signal.signal退回路径）"""
         signal_name = "SIGINT" if signum == signal.SIGINT else "SIGTERM"
         self.logger.info(f"接收到{signal_name}信号，开始优雅退出...")
-        
+
         if self.exit_in_progress:
             self.logger.warning("退出已在进行中，请稍候...")
             return
-        
+
         self.exit_requested = True
-        
-        # 在事件循环中执行异步退出
+        self._schedule_graceful_exit()
+
+    def _schedule_graceful_exit(self):
+        """把退出协程安全地投递到事件循环
+
+        call_soon_threadsafe保证无论调用来自信号上下文还是其他线程，
+        任务都建在构造时记录的循环上；没有可用循环时新建循环直接执行
+        """
         try:
-            loop = asyncio.get_event_loop()
-            if loop.is_running():
-                # 如果事件循环正在运行，创建任务
-                asyncio.create_task(self._graceful_exit())
-            else:
-                # 如果事件循环未运行，直接运行
-                loop.run_until_complete(self._graceful_exit())
+            if self._loop is not None and not self._loop.is_closed():
+                self._loop.call_soon_threadsafe(self._trigger_exit)
+            elif self._exit_future is None:
+                asyncio.run(self._graceful_exit())
         except Exception as e:
             self.logger.error(f"执行优雅退出时出错: {e}")
             # 强制退出
             sys.exit(1)
-    
+
     def request_exit(self):
         """请求退出（用于程序内部调用）"""
         if self.exit_in_progress:
             self.logger.warning("退出已在进行中，忽略重复请求")
             return
-            
+
         self.logger.info("程序请求优雅退出...")
         self.exit_requested = True
-        
-        # 在事件循环中执行异步退出
-        try:
-            loop = asyncio.get_event_loop()
-            if loop.is_running():
-                # 如果事件循环正在运行，创建任务
-                asyncio.create_task(self._graceful_exit())
-            else:
-                # 如果事件循环未运行，直接运行
-                loop.run_until_complete(self._graceful_exit())
-        except Exception as e:
-            self.logger.error(f"执行优雅退出时出错: {e}")
-            # 强制退出
-            sys.exit(1)
+        self._schedule_graceful_exit()
     
     async def _graceful_exit(self):
         """执行优雅退出流程"""
@@ -157,7 +201,19 @@ class GracefulExitManager:
                 self.logger.error(f"停止策略时出错: {e}")
     
     async def _run_cleanup_script(self):
-        """运行清理脚本"""
+        """运行清理流程：优先在进程内复用现有交易所连接"""
+        if not self.use_subprocess_cleanup:
+            try:
+                # 进程内直接调用清理入口，省掉子进程的解释器启动
+                # （约200-500ms）和一次全新的ccxt握手
+                from cleanup_binance_account import run_cleanup
+                self.logger.info("开始进程内账户清理...")
+                await run_cleanup(self.exchange)
+                self.logger.info("进程内账户清理完成")
+                return
+            except Exception as e:
+                self.logger.error(f"进程内清理失败，退回子进程方式: {e}")
+
         try:
             self.logger.info("开始运行清理脚本...")
             
@@ -169,27 +225,46 @@ class GracefulExitManager:
                 cwd='.'  # 在当前目录运行
             )
             
-            # 等待脚本完成
-            stdout, stderr = await process.communicate()
-            
+            # 增量读取输出，只保留尾部若干行：恒定内存占用，且避免
+            # 子进程因管道写满（64KiB）被阻塞，拖住整个退出流程
+            out_tail = deque(maxlen=20)
+            err_tail = deque(maxlen=20)
+
+            async def _tail(stream, tail):
+                async for line in stream:
+                    tail.append(line.decode('utf-8', errors='ignore'))
+
+            await asyncio.gather(
+                _tail(process.stdout, out_tail),
+                _tail(process.stderr, err_tail),
+                process.wait(),
+            )
+
             if process.returncode == 0:
                 self.logger.info("清理脚本执行成功")
-                # 记录输出（如果需要）
-                if stdout:
-                    output = stdout.decode('utf-8', errors='ignore')
-                    self.logger.info(f"清理脚本输出: {output[-500:]}...")  # 只显示最后500字符
+                # 记录输出尾部（如果需要）
+                if out_tail:
+                    self.logger.info(f"清理脚本输出(尾部): {''.join(out_tail)}")
             else:
                 self.logger.error(f"清理脚本执行失败，返回码: {process.returncode}")
-                if stderr:
-                    error = stderr.decode('utf-8', errors='ignore')
-                    self.logger.error(f"清理脚本错误: {error}")
+                if err_tail:
+                    self.logger.error(f"清理脚本错误(尾部): {''.join(err_tail)}")
                     
         except Exception as e:
             self.logger.error(f"运行清理脚本时出错: {e}")
             # 如果清理脚本失败，回退到原有的清理方法
             self.logger.info("回退到内置清理方法...")
-            await self._cancel_all_orders()
-            await self._close_all_positions()
+            # 撤单和持仓查询互相独立，并发发出，关机延迟取两者较大值
+            # 而不是两段RTT之和
+            cancel_task = asyncio.create_task(self._cancel_all_orders())
+            if self.exchange:
+                pos_task = asyncio.create_task(self.exchange.get_position())
+                await cancel_task
+                long_position, short_position = await pos_task
+                await self._close_all_positions(long_position, short_position)
+            else:
+                await cancel_task
+                await self._close_all_positions()
     
     async def _cancel_all_orders(self):
         """撤销所有挂单"""
@@ -201,103 +276,91 @@ class GracefulExitManager:
             self.logger.info("开始撤销所有挂单...")
             
             # 获取所有未成交订单
-            open_orders = self.exchange.fetch_open_orders()
+            open_orders = await self.exchange.fetch_open_orders()
             
             if not open_orders:
                 self.logger.info("没有需要撤销的挂单")
                 return
             
             self.logger.info(f"发现 {len(open_orders)} 个挂单，开始撤销...")
-            
-            # 撤销所有订单
-            cancelled_count = 0
-            for order in open_orders:
-                try:
-                    self.exchange.cancel_order(order['id'], order['symbol'])
-                    cancelled_count += 1
-                    self.logger.info(f"已撤销订单: {order['id']}")
-                except Exception as e:
-                    self.logger.error(f"撤销订单 {order['id']} 失败: {e}")
-            
-            self.logger.info(f"撤单完成，成功撤销 {cancelled_count}/{len(open_orders)} 个订单")
+
+            # 按交易对分组，每个交易对只发一次批量撤单请求（DELETE allOpenOrders），
+            # 代替逐单撤销的N次REST往返
+            failed_symbols = []
+            for symbol in {order.get('symbol') for order in open_orders}:
+                if await self.exchange.cancel_all_orders(symbol):
+                    self.logger.info(f"已批量撤销 {symbol} 全部挂单")
+                else:
+                    failed_symbols.append(symbol)
+
+            # 批量撤销失败的交易对退回逐单撤销：gather并发发出全部请求，
+            # 把N次串行往返压成一批流水线请求，信号量限制在途数量
+            if failed_symbols:
+                remaining = [o for o in open_orders if o.get('symbol') in failed_symbols]
+                semaphore = asyncio.Semaphore(10)
+
+                async def _cancel_one(order):
+                    async with semaphore:
+                        await self.exchange.cancel_order(order['id'], order['symbol'])
+
+                results = await asyncio.gather(
+                    *(_cancel_one(order) for order in remaining),
+                    return_exceptions=True
+                )
+                cancelled_count = 0
+                for order, result in zip(remaining, results):
+                    if isinstance(result, Exception):
+                        self.logger.error(f"撤销订单 {order['id']} 失败: {result}")
+                    else:
+                        cancelled_count += 1
+                self.logger.info(f"撤单完成，成功撤销 {cancelled_count}/{len(remaining)} 个订单")
+            else:
+                self.logger.info(f"撤单完成，共 {len(open_orders)} 个挂单")
             
         except Exception as e:
             self.logger.error(f"撤销挂单时出错: {e}")
     
-    async def _close_all_positions(self):
-        """平掉所有持仓"""
+    async def _close_all_positions(self, long_position=None, short_position=None):
+        """平掉所有持仓（持仓量可由调用方预取后传入，避免重复查询）"""
         if not self.exchange:
             self.logger.warning("交易所接口未设置，跳过平仓")
             return
-        
+
         try:
             self.logger.info("开始平掉所有持仓...")
-            
+
             # 获取当前持仓（返回多头和空头持仓）
-            long_position, short_position = self.exchange.get_position()
-            
+            if long_position is None or short_position is None:
+                long_position, short_position = await self.exchange.get_position()
+
             self.logger.info(f"当前持仓 - 多头: {long_position}, 空头: {short_position}")
-            
+
             if long_position == 0 and short_position == 0:
                 self.logger.info("没有需要平仓的持仓")
                 return
-            
-            success_count = 0
-            total_count = 0
-            
-            # 平掉多头持仓
+
+            # 两个方向的平仓单互相独立，并发提交
+            tasks = []
             if long_position > 0:
-                total_count += 1
-                try:
-                    self.logger.info(f"平掉多头持仓: {long_position}")
-                    order = self.exchange.place_order(
-                        side='sell',
-                        price=None,  # 市价单
-                        quantity=long_position,
-                        is_reduce_only=True,
-                        position_side='long',
-                        order_type='market'
-                    )
-                    
-                    if order:
-                        self.logger.info(f"多头平仓订单已提交: {order.get('id', 'N/A')}")
-                        success_count += 1
-                    else:
-                        self.logger.error("多头平仓订单提交失败")
-                        
-                except Exception as e:
-                    self.logger.error(f"平掉多头持仓时出错: {e}")
-            
-            # 平掉空头持仓
+                tasks.append(self._close_long(long_position))
             if short_position > 0:
-                total_count += 1
-                try:
-                    self.logger.info(f"平掉空头持仓: {short_position}")
-                    order = self.exchange.place_order(
-                        side='buy',
-                        price=None,  # 市价单
-                        quantity=short_position,
-                        is_reduce_only=True,
-                        position_side='short',
-                        order_type='market'
-                    )
-                    
-                    if order:
-                        self.logger.info(f"空头平仓订单已提交: {order.get('id', 'N/A')}")
-                        success_count += 1
-                    else:
-                        self.logger.error("空头平仓订单提交失败")
-                        
-                except Exception as e:
-                    self.logger.error(f"平掉空头持仓时出错: {e}")
-            
+                tasks.append(self._close_short(short_position))
+
+            results = await asyncio.gather(*tasks, return_exceptions=True)
+            total_count = len(tasks)
+            submitted_ids = [
+                result for result in results
+                if result and not isinstance(result, Exception)
+            ]
+            success_count = len(submitted_ids)
+
             # 等待订单执行
             if success_count > 0:
                 self.logger.info("等待平仓订单执行...")
-                await asyncio.sleep(3)
+                await self._wait_for_fills(submitted_ids)
                 
                 # 检查最终持仓
-                final_long, final_short = self.exchange.get_position()
+                final_long, final_short = await self.exchange.get_position()
                 self.logger.info(f"最终持仓 - 多头: {final_long}, 空头: {final_short}")
                 
                 if final_long == 0 and final_short == 0:
@@ -306,10 +369,76 @@ class GracefulExitManager:
                     self.logger.warning(f"⚠️ 持仓未完全平掉 - 多头: {final_long}, 空头: {final_short}")
             
             self.logger.info(f"平仓完成，成功提交 {success_count}/{total_count} 个平仓订单")
-            
+
         except Exception as e:
             self.logger.error(f"平仓时出错: {e}")
-    
+
+    async def _wait_for_fills(self, submitted_ids, timeout=5):
+        """事件驱动地等待平仓订单终结
+
+        推送流在线时在订单成交的瞬间返回（wait_order_done），不再无条件
+        等满3秒；流不可用或接口不支持时退回原来的固定等待
+        """
+        waiter = getattr(self.exchange, 'wait_order_done', None)
+        order_ids = [oid for oid in submitted_ids if isinstance(oid, str)]
+        if waiter is None or not order_ids:
+            await asyncio.sleep(3)
+            return
+
+        results = await asyncio.gather(
+            *(waiter(order_id, timeout) for order_id in order_ids),
+            return_exceptions=True
+        )
+        if any(result is None or isinstance(result, Exception) for result in results):
+            # 推送流不可用，退回保守的固定等待
+            await asyncio.sleep(3)
+
+    async def _close_long(self, quantity):
+        """市价平掉多头持仓"""
+        try:
+            self.logger.info(f"平掉多头持仓: {quantity}")
+            order = await self.exchange.place_order(
+                side='sell',
+                price=None,  # 市价单
+                quantity=quantity,
+                is_reduce_only=True,
+                position_side='long',
+                order_type='market'
+            )
+
+            if order:
+                self.logger.info(f"多头平仓订单已提交: {order.get('id', 'N/A')}")
+                return str(order['id']) if order.get('id') else True
+            self.logger.error("多头平仓订单提交失败")
+            return False
+
+        except Exception as e:
+            self.logger.error(f"平掉多头持仓时出错: {e}")
+            return False
+
+    async def _close_short(self, quantity):
+        """市价平掉空头持仓"""
+        try:
+            self.logger.info(f"平掉空头持仓: {quantity}")
+            order = await self.exchange.place_order(
+                side='buy',
+                price=None,  # 市价单
+                quantity=quantity,
+                is_reduce_only=True,
+                position_side='short',
+                order_type='market'
+            )
+
+            if order:
+                self.logger.info(f"空头平仓订单已提交: {order.get('id', 'N/A')}")
+                return str(order['id']) if order.get('id') else True
+            self.logger.error("空头平仓订单提交失败")
+            return False
+
+        except Exception as e:
+            self.logger.error(f"平掉空头持仓时出错: {e}")
+            return False
+
     async def _save_final_state(self):
         """保存最终状态"""
         try:
@@ -318,6 +447,11 @@ class GracefulExitManager:
             # 如果策略有保存状态的方法，调用它
             if self.strategy and hasattr(self.strategy, 'save_state'):
                 await self.strategy.save_state()
+
+            # 导出网格核心的数值快照（紧凑编码+原子替换，启动时对称恢复）
+            grid_core = getattr(self.strategy, 'grid_core', None) if self.strategy else None
+            if grid_core is not None and hasattr(grid_core, 'save_state_snapshot'):
+                grid_core.save_state_snapshot()
             
             # 生成最终汇总报告
             if self.strategy and hasattr(self.strategy, 'summary_module'):
@@ -6,18 +6,45 @@
 """
 
 import asyncio
+import json
+import os
 import time
 import logging
 from config import config
 from exchange_interface import ExchangeInterface
 
+# orjson编码数值快照比标准库json快数倍，未安装时自动退回
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 logger = logging.getLogger(__name__)
 
+# 关机状态快照文件（优雅退出时写入，启动时恢复动态间距等数值状态）
+GRID_STATE_FILE = 'grid_core_state.json'
+
+# (订单方向, 仓位方向) -> 计数槽位，把每单四条字符串比较链
+# 压成一次元组哈希查找；槽位顺序与check_orders_status的解包对应
+_ORDER_SLOT = {
+    ('buy', 'LONG'): 0,   # 多头买单
+    ('sell', 'LONG'): 1,  # 多头卖单
+    ('buy', 'SHORT'): 2,  # 空头买单
+    ('sell', 'SHORT'): 3,  # 空头卖单
+}
+
+# 撤单匹配集合：方向 -> (订单方向, 仓位方向, 是否平仓单)三元组集合，
+# 开仓单与止盈单的判定从多条布尔分支变成一次集合成员测试
+_CANCEL_MATCH = {
+    'long': frozenset({('buy', 'LONG', False), ('sell', 'LONG', True)}),
+    'short': frozenset({('sell', 'SHORT', False), ('buy', 'SHORT', True)}),
+}
+
 class GridCore:
     """网格策略核心类"""
     
     def __init__(self, exchange_interface: ExchangeInterface):
-        self.lock = asyncio.Lock()  # 初始化线程锁
+        self.lock = asyncio.Lock()  # 调整流程互斥锁（见adjust_grid_strategy）
         self.exchange = exchange_interface
         
         # 持仓状态
@@ -32,9 +59,10 @@ class GridCore:
         self.sell_short_orders = 0.0  # 空头卖出剩余挂单数量
         self.buy_short_orders = 0.0  # 空头买入剩余挂单数量
         
-        # 时间控制
-        self.last_long_order_time = 0  # 上次多头挂单时间
-        self.last_short_order_time = 0  # 上次空头挂单时间
+        # 时间控制（单调时钟：NTP校时/时钟回拨不会造成间隔误判；
+        # 挂单时间初值取负保证刚启动时首次挂单不被间隔限制拦下）
+        self.last_long_order_time = -config.ORDER_FIRST_TIME  # 上次多头挂单时间
+        self.last_short_order_time = -config.ORDER_FIRST_TIME  # 上次空头挂单时间
         self.last_position_update_time = 0  # 上次持仓更新时间
         self.last_orders_update_time = 0  # 上次订单更新时间
         
@@ -51,168 +79,261 @@ class GridCore:
         self.lower_price_short = 0  # short 网格下
         self.upper_price_short = 0  # short 网格上
         
-        # 动态网格间距支持
+        # 动态网格间距支持（属性setter会同步预计算的价格乘数）
         self.long_grid_spacing = config.GRID_SPACING  # 做多网格间距
         self.short_grid_spacing = config.GRID_SPACING  # 做空网格间距
         self.long_profit_spacing = config.GRID_SPACING  # 做多止盈间距
         self.short_profit_spacing = config.GRID_SPACING  # 做空止盈间距
-    
-    def check_orders_status(self):
+
+        # 恢复上次关机时保存的数值状态（文件不存在时静默跳过）
+        self.load_state_snapshot()
+
+    # 保存/恢复共用的数值状态字段清单
+    _STATE_FIELDS = (
+        'long_position', 'short_position',
+        'long_initial_quantity', 'short_initial_quantity',
+        'buy_long_orders', 'sell_long_orders', 'sell_short_orders', 'buy_short_orders',
+        'latest_price',
+        'mid_price_long', 'lower_price_long', 'upper_price_long',
+        'mid_price_short', 'lower_price_short', 'upper_price_short',
+        'long_grid_spacing', 'short_grid_spacing',
+        'long_profit_spacing', 'short_profit_spacing',
+    )
+
+    def save_state_snapshot(self, path=GRID_STATE_FILE):
+        """保存数值状态快照：紧凑编码+临时文件原子替换，崩溃也不会留下半个文件"""
+        try:
+            snapshot = {name: getattr(self, name) for name in self._STATE_FIELDS}
+            if orjson is not None:
+                payload = orjson.dumps(snapshot)
+            else:
+                payload = json.dumps(snapshot, separators=(',', ':')).encode('utf-8')
+            tmp_path = path + '.tmp'
+            with open(tmp_path, 'wb') as f:
+                f.write(payload)
+            os.replace(tmp_path, path)
+            logger.info(f"网格状态快照已保存: {path}")
+            return True
+        except Exception as e:
+            logger.error(f"保存网格状态快照失败: {e}")
+            return False
+
+    def load_state_snapshot(self, path=GRID_STATE_FILE):
+        """从快照恢复数值状态，忽略未知字段（文件不存在时返回False）"""
+        try:
+            if not os.path.exists(path):
+                return False
+            with open(path, 'rb') as f:
+                raw = f.read()
+            snapshot = orjson.loads(raw) if orjson is not None else json.loads(raw)
+            for name in self._STATE_FIELDS:
+                if name in snapshot:
+                    setattr(self, name, snapshot[name])
+            logger.info(f"已恢复网格状态快照: {path}")
+            return True
+        except Exception as e:
+            logger.error(f"加载网格状态快照失败: {e}")
+            return False
+
+    # 网格间距属性：setter在间距变化时同步预计算的价格乘数，
+    # update_mid_price的每跳热路径只剩两次乘法
+    @property
+    def long_grid_spacing(self):
+        return self._long_grid_spacing
+
+    @long_grid_spacing.setter
+    def long_grid_spacing(self, value):
+        self._long_grid_spacing = value
+        self._long_lower_mult = 1 - value  # 多头补仓价乘数
+
+    @property
+    def long_profit_spacing(self):
+        return self._long_profit_spacing
+
+    @long_profit_spacing.setter
+    def long_profit_spacing(self, value):
+        self._long_profit_spacing = value
+        self._long_upper_mult = 1 + value  # 多头止盈价乘数
+
+    @property
+    def short_grid_spacing(self):
+        return self._short_grid_spacing
+
+    @short_grid_spacing.setter
+    def short_grid_spacing(self, value):
+        self._short_grid_spacing = value
+        self._short_upper_mult = 1 + value  # 空头补仓价乘数
+
+    @property
+    def short_profit_spacing(self):
+        return self._short_profit_spacing
+
+    @short_profit_spacing.setter
+    def short_profit_spacing(self, value):
+        self._short_profit_spacing = value
+        self._short_lower_mult = 1 - value  # 空头止盈价乘数
+
+    async def check_orders_status(self):
         """检查当前所有挂单的状态，并更新多头和空头的挂单数量"""
-        orders = self.exchange.fetch_open_orders()
-        
-        # 初始化计数器
-        buy_long_orders = 0.0
-        sell_long_orders = 0.0
-        buy_short_orders = 0.0
-        sell_short_orders = 0.0
-        
+        orders = await self.exchange.fetch_open_orders()
+
+        # 单遍聚合：四个计数槽位，每单只做一次查表和一次累加
+        sums = [0.0, 0.0, 0.0, 0.0]
         for order in orders:
-            # 获取订单的原始委托数量（取绝对值）
-            orig_quantity = abs(float(order.get('info', {}).get('origQty', 0)))
-            side = order.get('side')  # 订单方向：buy 或 sell
-            position_side = order.get('info', {}).get('positionSide')  # 仓位方向：LONG 或 SHORT
-            
-            # 判断订单类型
-            if side == 'buy' and position_side == 'LONG':  # 多头买单
-                buy_long_orders += orig_quantity
-            elif side == 'sell' and position_side == 'LONG':  # 多头卖单
-                sell_long_orders += orig_quantity
-            elif side == 'buy' and position_side == 'SHORT':  # 空头买单
-                buy_short_orders += orig_quantity
-            elif side == 'sell' and position_side == 'SHORT':  # 空头卖单
-                sell_short_orders += orig_quantity
-        
-        # 更新实例变量
-        self.buy_long_orders = buy_long_orders
-        self.sell_long_orders = sell_long_orders
-        self.buy_short_orders = buy_short_orders
-        self.sell_short_orders = sell_short_orders
+            info = order.get('info', {})
+            slot = _ORDER_SLOT.get((order.get('side'), info.get('positionSide')))
+            if slot is not None:
+                sums[slot] += abs(float(info.get('origQty', 0)))
+
+        # 更新实例变量（解包顺序与_ORDER_SLOT槽位一致）
+        self.buy_long_orders, self.sell_long_orders, \
+            self.buy_short_orders, self.sell_short_orders = sums
+        self.last_orders_update_time = time.monotonic()
     
-    def cancel_orders_for_side(self, position_side):
+    async def cancel_orders_for_side(self, position_side):
         """撤销某个方向的所有挂单"""
-        orders = self.exchange.fetch_open_orders()
+        orders = await self.exchange.fetch_open_orders()
         
         if len(orders) == 0:
             logger.info("没有找到挂单")
-        else:
-            try:
-                for order in orders:
-                    # 获取订单的方向和仓位方向
-                    side = order.get('side')  # 订单方向：buy 或 sell
-                    reduce_only = order.get('reduceOnly', False)  # 是否为平仓单
-                    position_side_order = order.get('info', {}).get('positionSide', 'BOTH')  # 仓位方向
-                    
-                    if position_side == 'long':
-                        # 如果是多头开仓订单：买单且 reduceOnly 为 False
-                        if not reduce_only and side == 'buy' and position_side_order == 'LONG':
-                            self.exchange.cancel_order(order['id'])
-                        # 如果是多头止盈订单：卖单且 reduceOnly 为 True
-                        elif reduce_only and side == 'sell' and position_side_order == 'LONG':
-                            self.exchange.cancel_order(order['id'])
-                    
-                    elif position_side == 'short':
-                        # 如果是空头开仓订单：卖单且 reduceOnly 为 False
-                        if not reduce_only and side == 'sell' and position_side_order == 'SHORT':
-                            self.exchange.cancel_order(order['id'])
-                        # 如果是空头止盈订单：买单且 reduceOnly 为 True
-                        elif reduce_only and side == 'buy' and position_side_order == 'SHORT':
-                            self.exchange.cancel_order(order['id'])
-            except Exception as e:
-                logger.error(f"撤单失败: {e}")
-                self.check_orders_status()  # 强制更新挂单状态
+            return
+
+        # 先用匹配集合一趟过滤出该方向的订单ID，再一次性批量撤销
+        # （每10个一次REST调用），代替逐单cancel_order的串行往返
+        match_set = _CANCEL_MATCH.get(position_side)
+        if match_set is None:
+            return
+
+        target_ids = [
+            order['id'] for order in orders
+            if (order.get('side'),
+                order.get('info', {}).get('positionSide', 'BOTH'),
+                bool(order.get('reduceOnly', False))) in match_set
+        ]
+
+        if not target_ids:
+            return
+
+        try:
+            if not await self.exchange.cancel_orders_batch(target_ids):
+                # 批量接口失败时退回逐单撤销：gather并发发出，把N次串行往返
+                # 压成一批流水线请求，信号量限制在途数量以尊重币安权重限制
+                semaphore = asyncio.Semaphore(10)
+
+                async def _cancel_one(order_id):
+                    async with semaphore:
+                        await self.exchange.cancel_order(order_id)
+
+                await asyncio.gather(
+                    *(_cancel_one(order_id) for order_id in target_ids),
+                    return_exceptions=True
+                )
+        except Exception as e:
+            logger.error(f"撤单失败: {e}")
+            await self.check_orders_status()  # 强制更新挂单状态
     
     def update_mid_price(self, position_side, latest_price):
         """更新中间价和网格价格"""
         if position_side == 'long':
             self.mid_price_long = latest_price
-            # 使用动态网格间距：补仓使用long_grid_spacing，止盈使用long_profit_spacing
-            self.lower_price_long = self.mid_price_long * (1 - self.long_grid_spacing)  # 补仓价格
-            self.upper_price_long = self.mid_price_long * (1 + self.long_profit_spacing)  # 止盈价格
+            # 使用动态网格间距的预计算乘数：补仓对应long_grid_spacing，止盈对应long_profit_spacing
+            self.lower_price_long = latest_price * self._long_lower_mult  # 补仓价格
+            self.upper_price_long = latest_price * self._long_upper_mult  # 止盈价格
         elif position_side == 'short':
             self.mid_price_short = latest_price
-            # 使用动态网格间距：补仓使用short_grid_spacing，止盈使用short_profit_spacing
-            self.lower_price_short = self.mid_price_short * (1 - self.short_profit_spacing)  # 止盈价格
-            self.upper_price_short = self.mid_price_short * (1 + self.short_grid_spacing)  # 补仓价格
+            # 使用动态网格间距的预计算乘数：补仓对应short_grid_spacing，止盈对应short_profit_spacing
+            self.lower_price_short = latest_price * self._short_lower_mult  # 止盈价格
+            self.upper_price_short = latest_price * self._short_upper_mult  # 补仓价格
     
     def get_take_profit_quantity(self, position, position_side):
         """计算止盈数量"""
+        # 配置项绑定为局部变量，省去热路径上重复的模块属性查找
+        position_limit = config.POSITION_LIMIT
+        initial_quantity = config.INITIAL_QUANTITY
         if position_side == 'long':
             # 如果持仓超过POSITION_LIMIT，使用双倍止盈数量
-            if position > config.POSITION_LIMIT:  # 200 XRP
-                self.long_initial_quantity = min(position, config.INITIAL_QUANTITY * 2)  # 3 * 2 = 6 XRP
+            if position > position_limit:  # 200 XRP
+                self.long_initial_quantity = min(position, initial_quantity * 2)  # 3 * 2 = 6 XRP
             else:
-                self.long_initial_quantity = min(position, config.INITIAL_QUANTITY)  # 3 XRP
+                self.long_initial_quantity = min(position, initial_quantity)  # 3 XRP
         elif position_side == 'short':
             # 如果持仓超过POSITION_LIMIT，使用双倍止盈数量
-            if position > config.POSITION_LIMIT:  # 200 XRP
-                self.short_initial_quantity = min(position, config.INITIAL_QUANTITY * 2)  # 3 * 2 = 6 XRP
+            if position > position_limit:  # 200 XRP
+                self.short_initial_quantity = min(position, initial_quantity * 2)  # 3 * 2 = 6 XRP
             else:
-                self.short_initial_quantity = min(position, config.INITIAL_QUANTITY)  # 3 XRP
+                self.short_initial_quantity = min(position, initial_quantity)  # 3 XRP
     
-    async def initialize_long_orders(self):
+    async def initialize_long_orders(self, now=None):
         """初始化多头挂单"""
-        # 检查上次挂单时间，确保间隔足够
-        current_time = time.time()
-        if current_time - self.last_long_order_time < config.ORDER_FIRST_TIME:
-            logger.info(f"距离上次多头挂单时间不足 {config.ORDER_FIRST_TIME} 秒，跳过本次挂单")
+        # 检查上次挂单时间，确保间隔足够（now由调用方传入可省一次取时）
+        order_first_time = config.ORDER_FIRST_TIME
+        current_time = now if now is not None else time.monotonic()
+        if current_time - self.last_long_order_time < order_first_time:
+            logger.info(f"距离上次多头挂单时间不足 {order_first_time} 秒，跳过本次挂单")
             return
         
         # 撤销所有多头挂单
-        self.cancel_orders_for_side('long')
+        await self.cancel_orders_for_side('long')
         
         # 挂出多头开仓单
-        self.exchange.place_order('buy', self.best_bid_price, config.INITIAL_QUANTITY, False, 'long')
+        await self.exchange.place_order('buy', self.best_bid_price, config.INITIAL_QUANTITY, False, 'long')
         logger.info(f"挂出多头开仓单: 买入 @ {self.latest_price}")
         
         # 更新上次多头挂单时间
-        self.last_long_order_time = time.time()
+        self.last_long_order_time = time.monotonic()
         logger.info("初始化多头挂单完成")
     
-    async def initialize_short_orders(self):
+    async def initialize_short_orders(self, now=None):
         """初始化空头挂单"""
-        # 检查上次挂单时间，确保间隔足够
-        current_time = time.time()
-        if current_time - self.last_short_order_time < config.ORDER_FIRST_TIME:
-            logger.info(f"距离上次空头挂单时间不足 {config.ORDER_FIRST_TIME} 秒，跳过本次挂单")
+        # 检查上次挂单时间，确保间隔足够（now由调用方传入可省一次取时）
+        order_first_time = config.ORDER_FIRST_TIME
+        current_time = now if now is not None else time.monotonic()
+        if current_time - self.last_short_order_time < order_first_time:
+            logger.info(f"距离上次空头挂单时间不足 {order_first_time} 秒，跳过本次挂单")
             return
         
         # 撤销所有空头挂单
-        self.cancel_orders_for_side('short')
+        await self.cancel_orders_for_side('short')
         
         # 挂出空头开仓单
-        self.exchange.place_order('sell', self.best_ask_price, config.INITIAL_QUANTITY, False, 'short')
+        await self.exchange.place_order('sell', self.best_ask_price, config.INITIAL_QUANTITY, False, 'short')
         logger.info(f"挂出空头开仓单: 卖出 @ {self.latest_price}")
         
         # 更新上次空头挂单时间
-        self.last_short_order_time = time.time()
+        self.last_short_order_time = time.monotonic()
         logger.info("初始化空头挂单完成")
     
     async def place_long_orders(self, latest_price):
         """挂多头订单"""
         try:
             self.get_take_profit_quantity(self.long_position, 'long')
-            
+            position_threshold = config.POSITION_THRESHOLD
+
             if self.long_position > 0:
                 # 检查持仓是否超过阈值
-                if self.long_position > config.POSITION_THRESHOLD:
-                    logger.info(f"多头持仓 {self.long_position} 超过阈值 {config.POSITION_THRESHOLD}，进入保守模式")
+                if self.long_position > position_threshold:
+                    logger.info(f"多头持仓 {self.long_position} 超过阈值 {position_threshold}，进入保守模式")
                     if self.sell_long_orders <= 0:
                         # 计算保守止盈价格
                         ratio = float((self.long_position / max(self.short_position, 1)) / 100 + 1)
                         profit_price = self.latest_price * ratio
-                        self.exchange.place_take_profit_order('long', profit_price, self.long_initial_quantity)
+                        await self.exchange.place_take_profit_order('long', profit_price, self.long_initial_quantity)
                 else:
                     # 正常网格模式
                     self.update_mid_price('long', latest_price)
-                    self.cancel_orders_for_side('long')
-                    
-                    # 挂止盈单
-                    self.exchange.place_take_profit_order('long', self.upper_price_long, self.long_initial_quantity)
-                    
-                    # 挂补仓单
-                    self.exchange.place_order('buy', self.lower_price_long, self.long_initial_quantity, False, 'long')
-                    
+                    await self.cancel_orders_for_side('long')
+
+                    # 止盈单和补仓单合并为一次批量下单请求，RTT和限速权重
+                    # 减半（该方向挂单刚撤净，无需再做止盈查重）
+                    await self.exchange.place_orders_batch([
+                        {'side': 'sell', 'price': self.upper_price_long,
+                         'quantity': self.long_initial_quantity,
+                         'position_side': 'long', 'is_reduce_only': True},
+                        {'side': 'buy', 'price': self.lower_price_long,
+                         'quantity': self.long_initial_quantity,
+                         'position_side': 'long'},
+                    ])
+
                     logger.info("挂多头止盈单和补仓单")
         
         except Exception as e:
@@ -222,38 +343,45 @@ class GridCore:
         """挂空头订单"""
         try:
             self.get_take_profit_quantity(self.short_position, 'short')
-            
+            position_threshold = config.POSITION_THRESHOLD
+
             if self.short_position > 0:
                 # 检查持仓是否超过阈值
-                if self.short_position > config.POSITION_THRESHOLD:
-                    logger.info(f"空头持仓 {self.short_position} 超过阈值 {config.POSITION_THRESHOLD}，进入保守模式")
+                if self.short_position > position_threshold:
+                    logger.info(f"空头持仓 {self.short_position} 超过阈值 {position_threshold}，进入保守模式")
                     if self.buy_short_orders <= 0:
                         # 计算保守止盈价格
                         ratio = float((self.short_position / max(self.long_position, 1)) / 100 + 1)
                         profit_price = self.latest_price / ratio
-                        self.exchange.place_take_profit_order('short', profit_price, self.short_initial_quantity)
+                        await self.exchange.place_take_profit_order('short', profit_price, self.short_initial_quantity)
                 else:
                     # 正常网格模式
                     self.update_mid_price('short', latest_price)
-                    self.cancel_orders_for_side('short')
-                    
-                    # 挂止盈单
-                    self.exchange.place_take_profit_order('short', self.lower_price_short, self.short_initial_quantity)
-                    
-                    # 挂补仓单
-                    self.exchange.place_order('sell', self.upper_price_short, self.short_initial_quantity, False, 'short')
-                    
+                    await self.cancel_orders_for_side('short')
+
+                    # 止盈单和补仓单合并为一次批量下单请求，RTT和限速权重
+                    # 减半（该方向挂单刚撤净，无需再做止盈查重）
+                    await self.exchange.place_orders_batch([
+                        {'side': 'buy', 'price': self.lower_price_short,
+                         'quantity': self.short_initial_quantity,
+                         'position_side': 'short', 'is_reduce_only': True},
+                        {'side': 'sell', 'price': self.upper_price_short,
+                         'quantity': self.short_initial_quantity,
+                         'position_side': 'short'},
+                    ])
+
                     logger.info("挂空头止盈单和补仓单")
         
         except Exception as e:
             logger.error(f"挂空头订单失败: {e}")
     
-    def check_and_reduce_positions(self):
+    async def check_and_reduce_positions(self):
         """检查并减少持仓（风控逻辑）"""
         try:
             # 如果双向持仓都超过阈值，进行风控处理
-            if (self.long_position > config.POSITION_THRESHOLD and 
-                self.short_position > config.POSITION_THRESHOLD):
+            position_threshold = config.POSITION_THRESHOLD
+            if (self.long_position > position_threshold and
+                self.short_position > position_threshold):
                 
                 logger.warning(f"双向持仓均超过阈值，多头: {self.long_position}, 空头: {self.short_position}")
                 
@@ -266,11 +394,11 @@ class GridCore:
                     aggressive_buy_price = self.latest_price * 1.001   # 稍高于市价买入
                     
                     # 平多头仓位
-                    self.exchange.place_order('sell', aggressive_sell_price, reduce_quantity, True, 'long', 'limit')
+                    await self.exchange.place_order('sell', aggressive_sell_price, reduce_quantity, True, 'long', 'limit')
                     logger.info(f"侵略性限价平仓多头 {reduce_quantity} @ {aggressive_sell_price}")
                     
                     # 平空头仓位
-                    self.exchange.place_order('buy', aggressive_buy_price, reduce_quantity, True, 'short', 'limit')
+                    await self.exchange.place_order('buy', aggressive_buy_price, reduce_quantity, True, 'short', 'limit')
                     logger.info(f"侵略性限价平仓空头 {reduce_quantity} @ {aggressive_buy_price}")
         
         except Exception as e:
@@ -278,20 +406,35 @@ class GridCore:
     
     async def adjust_grid_strategy(self):
         """根据最新价格和持仓调整网格策略"""
+        # 单飞锁：一次只允许一个调整流程在途。行情推送触发很频繁，
+        # 在途时直接跳过本次调用而不是排队，避免重入导致双重挂单
+        if self.lock.locked():
+            return
+        async with self.lock:
+            await self._adjust_grid_strategy_locked()
+
+    async def _adjust_grid_strategy_locked(self):
+        """adjust_grid_strategy的主体（调用方已持有self.lock）"""
         # 检查双向仓位库存，如果同时达到，就统一部分平仓减少库存风险
-        self.check_and_reduce_positions()
-        
+        await self.check_and_reduce_positions()
+
+        # 配置与时间在入口处取一次，传给下游分支复用
+        position_threshold = config.POSITION_THRESHOLD
+        now = time.monotonic()
+
         # 检测多头持仓
         if self.long_position == 0:
             logger.info(f"检测到没有多头持仓{self.long_position}，初始化多头挂单@ ticker")
-            await self.initialize_long_orders()
+            await self.initialize_long_orders(now)
         else:
             orders_valid = not (0 < self.buy_long_orders <= self.long_initial_quantity) or \
                           not (0 < self.sell_long_orders <= self.long_initial_quantity)
             if orders_valid:
-                if self.long_position < config.POSITION_THRESHOLD:
+                if self.long_position < position_threshold:
                     logger.info('如果 long 持仓没到阈值，同步后再次确认！')
-                    self.check_orders_status()
+                    # 订单状态足够新鲜（<0.5秒）时跳过同步，省一次查询
+                    if now - self.last_orders_update_time > 0.5:
+                        await self.check_orders_status()
                     # 重新检查订单状态
                     orders_valid = not (0 < self.buy_long_orders <= self.long_initial_quantity) or \
                                   not (0 < self.sell_long_orders <= self.long_initial_quantity)
@@ -302,15 +445,17 @@ class GridCore:
         
         # 检测空头持仓
         if self.short_position == 0:
-            await self.initialize_short_orders()
+            await self.initialize_short_orders(now)
         else:
             # 检查订单数量是否在合理范围内
             orders_valid = not (0 < self.sell_short_orders <= self.short_initial_quantity) or \
                           not (0 < self.buy_short_orders <= self.short_initial_quantity)
             if orders_valid:
-                if self.short_position < config.POSITION_THRESHOLD:
+                if self.short_position < position_threshold:
                     logger.info('如果 short 持仓没到阈值，同步后再次确认！')
-                    self.check_orders_status()
+                    # 订单状态足够新鲜（<0.5秒）时跳过同步，省一次查询
+                    if now - self.last_orders_update_time > 0.5:
+                        await self.check_orders_status()
                     # 重新检查订单状态
                     orders_valid = not (0 < self.sell_short_orders <= self.short_initial_quantity) or \
                                   not (0 < self.buy_short_orders <= self.short_initial_quantity)
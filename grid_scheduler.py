@@ -7,56 +7,148 @@
 版本：v5.1
 """
 
-import schedule
+import array
+import asyncio
+import heapq
+import itertools
+import os
 import time
 import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 import logging
+import numpy as np
+import queue
+from logging import handlers
 from typing import Callable, Optional
-from grid_summary_module import grid_summary, GridTradeRecord
+from grid_summary_module import grid_summary
 
 class GridScheduler:
     """网格交易定时任务调度器"""
-    
+
+    # 事件驱动备份阈值：积累满一批或距上次备份超过最大间隔才触发
+    _BACKUP_BATCH = 64
+    _BACKUP_MAX_INTERVAL = 3600.0
+
     def __init__(self):
         self.logger = self._setup_logger()
+        # 预绑定日志方法：热路径少走两层LOAD_ATTR
+        self._log_info = self.logger.info
+        self._log_warn = self.logger.warning
+        self._log_error = self.logger.error
         self.is_running = False
         self.scheduler_thread: Optional[threading.Thread] = None
         self.grid_strategy = None  # 将在集成时设置
+        # 调度线程的唤醒事件：精确睡到下一个任务触发，stop/wake可随时打断
+        self._wake = threading.Event()
+        # 任务执行线程池：调度线程只负责派发，慢任务（行情查询、文件清理）
+        # 不会拖延下一次run_pending的唤醒
+        self._pool: Optional[ThreadPoolExecutor] = ThreadPoolExecutor(
+            max_workers=2, thread_name_prefix='grid-sched'
+        )
+        # 每类任务一把锁：上一次还在执行时跳过本次触发，防止重叠运行
+        self._task_locks = {
+            name: threading.Lock()
+            for name in ('daily_summary', 'weekly_cleanup', 'hourly_backup')
+        }
+        # 配置读取缓存：按config对象身份（和取值）失效，
+        # 配置对象未更换时省去每次的getattr链和dict重建
+        self._cfg_cache: Optional[dict] = None
+        self._cfg_cache_key = None
+        self._capital_cache: Optional[float] = None
+        self._capital_cache_key = None
+        # 逐笔交易计数：next()在GIL下原子递增，hourly_backup_task按差值汇总
+        self._trade_counter = itertools.count(1)
+        self._trade_count = 0
+        self._trades_reported = 0
+        # 最后有效价格：预先声明，避免_get_current_price里的hasattr探测
+        self._last_valid_price = 0.0
+        # 近期价格环形窗口：中位数+MAD过滤异常价，样本不足时退回单点判断
+        self._recent_prices = np.zeros(32, dtype=np.float64)
+        self._rp_idx = 0
+        self._rp_count = 0
+        # 任务堆：(下次触发epoch, 序号, 任务名, 任务函数, 下次时刻计算函数)
+        # 取最近到期任务为O(log n)，且与_wake的精确休眠天然配合
+        self._heap: list = []
+        self._job_seq = itertools.count()
+        # 策略事件循环：set_grid_strategy时捕获，用于跨线程投递异步取价
+        self._strategy_loop = None
+        # 报告目录上次清理后的mtime：目录无变化时跳过每周扫描
+        self._last_cleanup_mtime: Optional[float] = None
+        # 事件驱动备份：成交流入计数触发，而非固定每小时轮询
+        self._pending_trades = 0
+        self._last_backup = time.monotonic()
+        # SoA成交缓冲：热路径只向并行数组追加标量，
+        # 满一批才构造记录对象整批移交汇总模块
+        self._buf_lock = threading.Lock()
+        self._buf_price = array.array('d')
+        self._buf_qty = array.array('d')
+        self._buf_profit = array.array('d')
+        self._buf_meta: list = []
+        # 任务名到任务体的映射：建一次，run_task_now直接查
+        self._task_map = {
+            'daily_summary': self.daily_summary_task,
+            'weekly_cleanup': self.weekly_cleanup_task,
+            'hourly_backup': self.hourly_backup_task
+        }
         
     def _setup_logger(self) -> logging.Logger:
-        """设置日志记录器"""
+        """设置日志记录器（QueueHandler异步写入，任务线程不等磁盘IO）"""
         logger = logging.getLogger('GridScheduler')
         logger.setLevel(logging.INFO)
-        
+        self._log_listener: Optional[handlers.QueueListener] = None
+
         if not logger.handlers:
-            handler = logging.FileHandler(
+            file_handler = logging.FileHandler(
                 'grid_summary_reports/scheduler.log',
                 encoding='utf-8'
             )
             formatter = logging.Formatter(
                 '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
             )
-            handler.setFormatter(formatter)
-            logger.addHandler(handler)
-        
+            file_handler.setFormatter(formatter)
+
+            log_queue: queue.Queue = queue.Queue(-1)
+            logger.addHandler(handlers.QueueHandler(log_queue))
+            self._log_listener = handlers.QueueListener(
+                log_queue, file_handler, respect_handler_level=True
+            )
+            self._log_listener.start()
+
         return logger
     
     def set_grid_strategy(self, strategy):
         """设置网格策略实例"""
         self.grid_strategy = strategy
+        # 记录策略所在事件循环：调度线程需要REST取价时投递协程过去执行
+        try:
+            self._strategy_loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self._strategy_loop = None
         self.logger.info("网格策略实例已设置")
     
     def daily_summary_task(self):
         """每日汇总任务 - 在每天0点执行"""
         try:
             yesterday = (datetime.now() - timedelta(days=1)).strftime('%Y-%m-%d')
+
+            # 报告已生成过（如0点后进程重启再次触发）则直接跳过整条生成链路
+            report_path = os.path.join(
+                grid_summary.summary_dir, f"summary_{yesterday}.json"
+            )
+            if os.path.exists(report_path) and os.path.getsize(report_path) > 0:
+                self.logger.info(f"每日汇总已存在，跳过: {yesterday}")
+                return
+
             self.logger.info(f"开始执行每日汇总任务: {yesterday}")
             
             if not self.grid_strategy:
                 self.logger.error("网格策略实例未设置，无法执行汇总任务")
                 return
             
+            # 先冲刷SoA缓冲，保证昨日尾盘的成交进入汇总
+            self._flush_trades()
+
             # 获取当前价格和网格配置
             try:
                 current_price = self._get_current_price()
@@ -86,10 +178,24 @@ class GridScheduler:
     def weekly_cleanup_task(self):
         """每周清理任务 - 清理超过30天的旧报告"""
         try:
+            # 目录mtime未变说明自上次清理后没有新增/删除文件，
+            # 一次os.stat换掉整个目录扫描
+            try:
+                dir_mtime = os.stat(grid_summary.summary_dir).st_mtime
+            except OSError:
+                dir_mtime = None
+            if dir_mtime is not None and dir_mtime == self._last_cleanup_mtime:
+                self.logger.info("报告目录自上次清理后无变化，跳过每周清理")
+                return
+
             self.logger.info("开始执行每周清理任务")
             grid_summary.cleanup_old_reports(days_to_keep=30)
+            try:
+                self._last_cleanup_mtime = os.stat(grid_summary.summary_dir).st_mtime
+            except OSError:
+                self._last_cleanup_mtime = None
             self.logger.info("每周清理任务完成")
-            
+
         except Exception as e:
             self.logger.error(f"每周清理任务执行失败: {e}")
     
@@ -97,57 +203,119 @@ class GridScheduler:
         """每小时备份任务 - 备份当前交易数据"""
         try:
             current_time = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-            
+            self._flush_trades()
+
             # 如果有新的交易记录，进行备份
             if hasattr(self.grid_strategy, 'get_recent_trades'):
                 recent_trades = self.grid_strategy.get_recent_trades(hours=1)
                 if recent_trades:
                     self.logger.info(f"备份 {len(recent_trades)} 条交易记录 - {current_time}")
-            
+
+            # 汇总输出add_trade_to_summary降级为DEBUG后积累的逐笔计数
+            new_trades = self._trade_count - self._trades_reported
+            if new_trades > 0:
+                self.logger.info(f"过去一小时新增 {new_trades} 条交易记录 - {current_time}")
+                self._trades_reported = self._trade_count
+
         except Exception as e:
             self.logger.error(f"每小时备份任务执行失败: {e}")
     
+    def _read_cached_price(self) -> float:
+        """从推送价缓存读当前价：零I/O，调度线程不发起网络请求"""
+        grid_core = getattr(self.grid_strategy, 'grid_core', None)
+        price = getattr(grid_core, 'latest_price', 0) if grid_core is not None else 0
+        if price and price > 0:
+            return float(price)
+
+        exchange = getattr(self.grid_strategy, 'exchange_interface', None)
+        if exchange is not None:
+            price = (getattr(exchange, 'websocket_price', None)
+                     or getattr(exchange, 'last_valid_price', None))
+            if price and price > 0:
+                return float(price)
+        return 0.0
+
+    def _fetch_price_threadsafe(self) -> float:
+        """把异步get_ticker投递到策略事件循环执行并等待结果
+
+        复用交易所接口已建立的HTTP会话，避免在调度线程里
+        另起同步连接；仅在推送价缓存为空时走到这里。
+        """
+        exchange = getattr(self.grid_strategy, 'exchange_interface', None)
+        loop = self._strategy_loop
+        if exchange is None or loop is None or loop.is_closed():
+            self.logger.error("网格策略实例未设置exchange，无法获取价格")
+            raise ValueError("无法获取价格：exchange未设置")
+
+        future = asyncio.run_coroutine_threadsafe(exchange.get_ticker(), loop)
+        ticker = future.result(timeout=10)
+        if ticker:
+            return float(ticker.get('price') or 0)
+        return 0.0
+
+    def _record_price(self, price: float):
+        """把有效价格写入环形窗口"""
+        self._recent_prices[self._rp_idx] = price
+        self._rp_idx = (self._rp_idx + 1) % 32
+        if self._rp_count < 32:
+            self._rp_count += 1
+
+    def _price_anomalous(self, price: float) -> bool:
+        """价格异常判断：中位数+MAD滑窗过滤
+
+        32个样本的定长窗口上做两次中位数，既不会被单笔闪崩价拉偏，
+        也不会在趋势行情里误杀正常波动；样本不足或窗口内价格完全
+        一致（MAD为0）时退回单点50%偏离判断。
+        """
+        n = self._rp_count
+        if n >= 8:
+            window = self._recent_prices if n == 32 else self._recent_prices[:n]
+            med = float(np.median(window))
+            mad = float(np.median(np.abs(window - med)))
+            if mad > 0.0:
+                return abs(price - med) > 6.0 * mad
+        # 交叉相乘等价于 abs(diff)/last > 0.5，省掉除法
+        last = self._last_valid_price
+        diff = price - last
+        return diff + diff > last or -diff - diff > last
+
     def _get_current_price(self) -> float:
         """获取当前价格，带有价格验证和异常处理"""
         try:
-            if hasattr(self.grid_strategy, 'exchange'):
-                # 从交易所获取当前价格
-                ticker = self.grid_strategy.exchange.get_ticker()
-                price = ticker.get('price', 0)
-                
-                # 价格有效性验证
-                if price and float(price) > 0:
-                    current_price = float(price)
-                    # 保存最后有效价格
-                    if not hasattr(self, '_last_valid_price'):
-                        self._last_valid_price = current_price
-                    else:
-                        # 价格合理性检查：新价格与上次价格差异不超过50%
-                        price_change_ratio = abs(current_price - self._last_valid_price) / self._last_valid_price
-                        if price_change_ratio > 0.5:
-                            self.logger.warning(f"价格变化异常: {self._last_valid_price} -> {current_price}, 变化幅度: {price_change_ratio:.2%}")
-                            # 如果价格变化过大，使用最后有效价格
-                            return self._last_valid_price
-                        else:
-                            self._last_valid_price = current_price
-                    
-                    return current_price
+            # 优先推送价缓存，缓存为空再跨线程走REST
+            price = self._read_cached_price()
+            if not price:
+                price = self._fetch_price_threadsafe()
+
+            # 价格有效性验证
+            if price and float(price) > 0:
+                current_price = float(price)
+                # 保存最后有效价格（0.0表示尚无历史价格）
+                if self._last_valid_price == 0.0:
+                    self._last_valid_price = current_price
+                    self._record_price(current_price)
+                elif self._price_anomalous(current_price):
+                    self.logger.warning(f"价格变化异常: {self._last_valid_price} -> {current_price}")
+                    # 价格异常时使用最后有效价格
+                    return self._last_valid_price
                 else:
-                    # 价格无效，直接抛出异常（不使用fallback）
-                    self.logger.error(f"获取到无效价格: {price}")
-                    raise ValueError(f"无效的价格数据: {price}")
+                    self._last_valid_price = current_price
+                    self._record_price(current_price)
+
+                return current_price
             else:
-                # 如果无法获取实时价格，抛出异常而不是返回0
-                self.logger.error("网格策略实例未设置exchange，无法获取价格")
-                raise ValueError("无法获取价格：exchange未设置")
-                
+                # 价格无效，直接抛出异常（不使用fallback）
+                self.logger.error(f"获取到无效价格: {price}")
+                raise ValueError(f"无效的价格数据: {price}")
+
+
         except ValueError:
             # ValueError直接重新抛出，不使用fallback
             raise
         except Exception as e:
             self.logger.error(f"获取当前价格失败: {e}")
             # 只有在非价格验证错误时才使用fallback
-            if hasattr(self, '_last_valid_price') and self._last_valid_price > 0:
+            if self._last_valid_price > 0:
                 self.logger.warning(f"价格获取失败，使用最后有效价格: {self._last_valid_price}")
                 return self._last_valid_price
             else:
@@ -155,68 +323,175 @@ class GridScheduler:
                 raise ValueError(f"价格获取失败且无有效fallback价格: {e}")
     
     def _get_total_capital(self) -> float:
-        """获取总资金"""
+        """获取总资金（按配置对象身份+取值缓存）"""
         try:
-            if hasattr(self.grid_strategy, 'config'):
-                return float(self.grid_strategy.config.TOTAL_CAPITAL)
+            cfg = getattr(self.grid_strategy, 'config', None)
+            if cfg is not None:
+                raw = cfg.TOTAL_CAPITAL
+                key = (id(cfg), raw)
+                if key != self._capital_cache_key:
+                    self._capital_cache = float(raw)
+                    self._capital_cache_key = key
+                return self._capital_cache
             else:
                 self.logger.warning("无法获取总资金配置，使用默认值")
                 return 10000.0  # 默认值
         except Exception as e:
             self.logger.error(f"获取总资金失败: {e}")
             return 10000.0
-    
+
     def _get_grid_config(self) -> dict:
-        """获取网格配置"""
+        """获取网格配置（按配置对象身份缓存，更换config对象时自动失效）"""
         try:
-            if hasattr(self.grid_strategy, 'config'):
-                return {
-                    'active_grids': getattr(self.grid_strategy.config, 'GRID_COUNT', 20),
-                    'grid_spacing': getattr(self.grid_strategy.config, 'GRID_SPACING', 0.01),
+            cfg = getattr(self.grid_strategy, 'config', None)
+            key = id(cfg)
+            if key == self._cfg_cache_key and self._cfg_cache is not None:
+                return self._cfg_cache
+            if cfg is not None:
+                result = {
+                    'active_grids': getattr(cfg, 'GRID_COUNT', 20),
+                    'grid_spacing': getattr(cfg, 'GRID_SPACING', 0.01),
                 }
             else:
-                return {
+                result = {
                     'active_grids': 20,
                     'grid_spacing': 0.01,
                 }
+            self._cfg_cache = result
+            self._cfg_cache_key = key
+            return result
         except Exception as e:
             self.logger.error(f"获取网格配置失败: {e}")
             return {'active_grids': 20, 'grid_spacing': 0.01}
     
+    def _submit_task(self, task_name: str, task_func: Callable):
+        """把任务体提交到线程池执行；同类任务在途时跳过本次触发"""
+        if self._pool is None:
+            return
+        lock = self._task_locks[task_name]
+        if not lock.acquire(blocking=False):
+            self._log_warn(f"任务 {task_name} 仍在执行，跳过本次触发")
+            return
+
+        def _run():
+            try:
+                task_func()
+            finally:
+                lock.release()
+
+        try:
+            self._pool.submit(_run)
+        except RuntimeError:
+            # 线程池已关闭（正在停机）
+            lock.release()
+
+    @staticmethod
+    def _next_daily(hour: int, minute: int) -> Callable[[float], float]:
+        """返回计算下一个每天hour:minute触发时刻的函数"""
+        def _calc(after: float) -> float:
+            dt = datetime.fromtimestamp(after)
+            run = dt.replace(hour=hour, minute=minute, second=0, microsecond=0)
+            if run <= dt:
+                run += timedelta(days=1)
+            return run.timestamp()
+        return _calc
+
+    @staticmethod
+    def _next_weekly(weekday: int, hour: int, minute: int) -> Callable[[float], float]:
+        """返回计算下一个每周weekday（周一=0）hour:minute触发时刻的函数"""
+        def _calc(after: float) -> float:
+            dt = datetime.fromtimestamp(after)
+            run = dt.replace(hour=hour, minute=minute, second=0, microsecond=0)
+            run += timedelta(days=(weekday - dt.weekday()) % 7)
+            if run <= dt:
+                run += timedelta(days=7)
+            return run.timestamp()
+        return _calc
+
+    @staticmethod
+    def _next_interval(seconds: float) -> Callable[[float], float]:
+        """返回计算固定间隔下次触发时刻的函数"""
+        def _calc(after: float) -> float:
+            return after + seconds
+        return _calc
+
+    def _push_job(self, name: str, func: Callable, compute_next: Callable[[float], float]):
+        """把任务压入调度堆"""
+        heapq.heappush(
+            self._heap,
+            (compute_next(time.time()), next(self._job_seq), name, func, compute_next)
+        )
+
     def setup_schedules(self):
-        """设置定时任务"""
+        """设置定时任务（调度线程只派发，任务体在线程池执行）"""
+        self._heap = []
         # 每天0点执行每日汇总
-        schedule.every().day.at("00:00").do(self.daily_summary_task)
-        
+        self._push_job('daily_summary', self.daily_summary_task, self._next_daily(0, 0))
         # 每周日凌晨2点执行清理任务
-        schedule.every().sunday.at("02:00").do(self.weekly_cleanup_task)
-        
-        # 每小时执行备份任务
-        schedule.every().hour.do(self.hourly_backup_task)
-        
+        self._push_job('weekly_cleanup', self.weekly_cleanup_task, self._next_weekly(6, 2, 0))
+        # 备份任务改为事件驱动：由add_trade_to_summary的成交流入计数触发，
+        # 不再进堆按小时空转（见_maybe_backup）
+
         self.logger.info("定时任务已设置完成")
         self.logger.info("- 每日汇总: 每天 00:00")
         self.logger.info("- 每周清理: 每周日 02:00")
-        self.logger.info("- 每小时备份: 每小时执行")
-    
+        self.logger.info("- 数据备份: 事件驱动（成交满批或超过最大间隔）")
+
+    def _maybe_backup(self):
+        """按成交流入触发备份：满一批立即备，零散成交最多延迟一个最大间隔"""
+        if not self._pending_trades:
+            return
+        now = time.monotonic()
+        if (self._pending_trades < self._BACKUP_BATCH
+                and now - self._last_backup <= self._BACKUP_MAX_INTERVAL):
+            return
+        self._pending_trades = 0
+        self._last_backup = now
+        self._submit_task('hourly_backup', self.hourly_backup_task)
+
     def start_scheduler(self):
         """启动定时任务调度器"""
         if self.is_running:
             self.logger.warning("调度器已在运行中")
             return
-        
+
+        if self._pool is None:
+            # 上次stop_scheduler已关闭线程池，重启时重建
+            self._pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix='grid-sched')
         self.setup_schedules()
         self.is_running = True
         
         def run_scheduler():
             self.logger.info("定时任务调度器已启动")
+            # 出错重试间隔：连续出错时指数退避（60s→最长1小时），成功后复位
+            error_backoff = 60.0
             while self.is_running:
                 try:
-                    schedule.run_pending()
-                    time.sleep(60)  # 每分钟检查一次
+                    self._maybe_backup()
+                    if not self._heap:
+                        self._wake.wait(timeout=3600)
+                        self._wake.clear()
+                        continue
+                    # 只看堆顶（最近到期任务），按到期时刻精确休眠，
+                    # 消除每分钟的空转唤醒
+                    idle = self._heap[0][0] - time.time()
+                    if idle > 0:
+                        self._wake.wait(timeout=idle)
+                        self._wake.clear()
+                        continue  # 被唤醒后重新评估堆顶
+                    _, _, name, func, compute_next = heapq.heappop(self._heap)
+                    heapq.heappush(
+                        self._heap,
+                        (compute_next(time.time()), next(self._job_seq),
+                         name, func, compute_next)
+                    )
+                    self._submit_task(name, func)
+                    error_backoff = 60.0
                 except Exception as e:
-                    self.logger.error(f"调度器运行错误: {e}")
-                    time.sleep(60)
+                    self._log_error(f"调度器运行错误: {e}")
+                    self._wake.wait(timeout=error_backoff)
+                    self._wake.clear()
+                    error_backoff = min(error_backoff * 2, 3600.0)
         
         self.scheduler_thread = threading.Thread(target=run_scheduler, daemon=True)
         self.scheduler_thread.start()
@@ -230,55 +505,102 @@ class GridScheduler:
             return
         
         self.is_running = False
-        schedule.clear()
-        
+        self._heap.clear()
+        self._wake.set()  # 立即唤醒调度线程，不等它睡满当前间隔
+
         if self.scheduler_thread and self.scheduler_thread.is_alive():
             self.scheduler_thread.join(timeout=5)
-        
+
+        if self._pool is not None:
+            # 等在途任务跑完，未开始的直接取消
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._pool = None
+
+        # 停机前冲刷缓冲，不丢最后一批成交
+        self._flush_trades()
+
         self.logger.info("定时任务调度器已停止")
+
+        if self._log_listener is not None:
+            # 冲刷队列中未落盘的日志后停掉写入线程
+            self._log_listener.stop()
+            self._log_listener = None
+
+    def wake(self):
+        """唤醒调度线程，立即重新评估任务队列"""
+        self._wake.set()
     
     def run_task_now(self, task_name: str):
         """立即执行指定任务"""
-        task_map = {
-            'daily_summary': self.daily_summary_task,
-            'weekly_cleanup': self.weekly_cleanup_task,
-            'hourly_backup': self.hourly_backup_task
-        }
-        
-        if task_name in task_map:
-            self.logger.info(f"手动执行任务: {task_name}")
-            task_map[task_name]()
+        task_func = self._task_map.get(task_name)
+        if task_func is not None:
+            self._log_info(f"手动执行任务: {task_name}")
+            task_func()
+            self.wake()  # 手动执行后让调度线程重新评估下次触发时刻
         else:
-            self.logger.error(f"未知任务: {task_name}")
+            self._log_error(f"未知任务: {task_name}")
     
     def get_next_run_times(self) -> dict:
         """获取下次执行时间"""
         next_runs = {}
-        
-        for job in schedule.jobs:
-            task_name = job.job_func.__name__
-            next_run = job.next_run
-            if next_run:
-                next_runs[task_name] = next_run.strftime('%Y-%m-%d %H:%M:%S')
-        
+
+        for next_epoch, _, task_name, _, _ in self._heap:
+            next_runs[task_name] = datetime.fromtimestamp(next_epoch).strftime(
+                '%Y-%m-%d %H:%M:%S'
+            )
+
         return next_runs
     
-    def add_trade_to_summary(self, trade_type: str, grid_type: str, price: float, 
+    # 秒级时间戳缓存：同一秒内的交易复用已格式化的字符串，
+    # 把每单一次strftime压成每秒最多一次
+    _ts_cache = (0, '')
+
+    def _format_timestamp(self) -> str:
+        """返回当前秒的'%Y-%m-%d %H:%M:%S'字符串（秒未变时走缓存）"""
+        sec = int(time.time())
+        cached_sec, cached_str = self._ts_cache
+        if sec != cached_sec:
+            cached_str = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(sec))
+            GridScheduler._ts_cache = (sec, cached_str)
+        return cached_str
+
+    def _flush_trades(self):
+        """把SoA缓冲中的成交整批移交汇总模块"""
+        with self._buf_lock:
+            if not self._buf_meta:
+                return
+            prices = self._buf_price
+            qtys = self._buf_qty
+            profits = self._buf_profit
+            meta = self._buf_meta
+            self._buf_price = array.array('d')
+            self._buf_qty = array.array('d')
+            self._buf_profit = array.array('d')
+            self._buf_meta = []
+        grid_summary.add_trade_batch(prices, qtys, profits, meta)
+
+    def add_trade_to_summary(self, trade_type: str, grid_type: str, price: float,
                            quantity: float, profit: float, grid_level: int, order_id: str):
-        """添加交易记录到汇总模块"""
-        trade_record = GridTradeRecord(
-            timestamp=datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-            trade_type=trade_type,
-            grid_type=grid_type,
-            price=price,
-            quantity=quantity,
-            profit=profit,
-            grid_level=grid_level,
-            order_id=order_id
-        )
-        
-        grid_summary.add_trade_record(trade_record)
-        self.logger.info(f"交易记录已添加到汇总: {trade_type} {quantity} @ {price}")
+        """添加交易记录到汇总模块（热路径只追加SoA缓冲，按批移交）"""
+        with self._buf_lock:
+            self._buf_price.append(price)
+            self._buf_qty.append(quantity)
+            self._buf_profit.append(profit)
+            self._buf_meta.append(
+                (self._format_timestamp(), trade_type, grid_type, grid_level, order_id)
+            )
+            buffer_full = len(self._buf_meta) >= self._BACKUP_BATCH
+        if buffer_full:
+            self._flush_trades()
+        self._trade_count = next(self._trade_counter)
+        # 成交流入驱动备份：满一批或距上次备份超过最大间隔时唤醒调度线程
+        self._pending_trades += 1
+        if (self._pending_trades >= self._BACKUP_BATCH
+                or time.monotonic() - self._last_backup > self._BACKUP_MAX_INTERVAL):
+            self.wake()
+        # 高频成交下逐笔INFO是热点：降级为DEBUG，INFO汇总由hourly_backup_task统一输出
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug("交易记录已添加到汇总: %s %s @ %s", trade_type, quantity, price)
 
 # 全局调度器实例
 grid_scheduler = GridScheduler()
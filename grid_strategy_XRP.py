@@ -7,11 +7,15 @@ XRP网格交易策略 - 主程序
 """
 
 import asyncio
+import atexit
+import heapq
 import json
 import logging
+import queue
 import sys
 import time
 import websockets
+from logging.handlers import QueueHandler, QueueListener
 from config import config
 from exchange_interface import ExchangeInterface
 from grid_core import GridCore
@@ -20,18 +24,67 @@ from ema_adx_signal_module import EMAAdxSignalModule
 from grid_scheduler import grid_scheduler, add_trade_record
 from grid_summary_module import grid_summary
 
-# 配置日志
+# WebSocket热路径每帧都要解析JSON，orjson(C实现)比标准库快数倍；
+# 未安装时自动退回标准库，绑定为模块级函数省去每帧的属性查找
+try:
+    import orjson
+    _json_loads = orjson.loads
+    _json_dumps = orjson.dumps  # 返回bytes，websockets可直接发送
+except ImportError:
+    _json_loads = json.loads
+    _json_dumps = json.dumps
+
+# uvloop用libuv的C事件循环替换默认selector循环，纯I/O负载下吞吐
+# 可提升数倍；未安装（或Windows平台）时保持默认循环
+try:
+    import uvloop
+except ImportError:
+    uvloop = None
+
+# msgspec按类型声明做单遍解析，只物化bookTicker中实际消费的字段，
+# 跳过其余键的Python对象构建；未安装时退回整帧解析
+try:
+    import msgspec
+
+    class _BookTicker(msgspec.Struct):
+        """bookTicker帧里热路径消费的字段（其余键解析时直接跳过）"""
+        b: str = '0'
+        a: str = '0'
+        e: str = ''  # 帧类型，用于在收包循环里单遍识别ticker帧
+
+    _TICKER_DECODER = msgspec.json.Decoder(_BookTicker)
+except ImportError:
+    msgspec = None
+    _TICKER_DECODER = None
+
+# 配置日志：热路径只把记录塞进内存队列(微秒级)，文件/终端的同步IO
+# 由监听线程在事件循环之外完成，日志不再阻塞下单协程
+_log_queue = queue.SimpleQueue()
 logging.basicConfig(
     level=getattr(logging, config.LOG_LEVEL),
     format=config.LOG_FORMAT,
-    handlers=[
-        logging.FileHandler(config.LOG_FILE, encoding='utf-8'),
-        logging.StreamHandler(sys.stdout)
-    ]
+    handlers=[QueueHandler(_log_queue)]
 )
+_log_listener = QueueListener(
+    _log_queue,
+    logging.FileHandler(config.LOG_FILE, encoding='utf-8'),
+    logging.StreamHandler(sys.stdout),
+    respect_handler_level=True,
+)
+_log_listener.start()
+atexit.register(_log_listener.stop)
 
 logger = logging.getLogger(__name__)
 
+# (side, positionSide) -> (挂单计数属性, 持仓属性, 是否开仓方向)
+# 一张查找表替换挂单/持仓更新里重复的8路if/elif级联
+_ORDER_ATTR = {
+    ("BUY", "LONG"): ("buy_long_orders", "long_position", True),
+    ("SELL", "LONG"): ("sell_long_orders", "long_position", False),
+    ("SELL", "SHORT"): ("sell_short_orders", "short_position", True),
+    ("BUY", "SHORT"): ("buy_short_orders", "short_position", False),
+}
+
 class GridTradingBot:
     """网格交易机器人主类"""
     
@@ -40,8 +93,8 @@ class GridTradingBot:
         self.exchange_interface = ExchangeInterface()
         self.grid_core = GridCore(self.exchange_interface)
         
-        # 初始化极端行情防护
-        self.extreme_protection = ExtremeMarketProtection()
+        # 初始化极端行情防护(传入异步交易所接口供紧急撤单/平仓使用)
+        self.extreme_protection = ExtremeMarketProtection(exchange_interface=self.exchange_interface)
         self.is_sleeping = False  # 休眠状态标志
         self.sleep_start_time = 0  # 休眠开始时间
         
@@ -53,117 +106,137 @@ class GridTradingBot:
             adx_period=config.ADX_PERIOD,
             adx_threshold=config.ADX_THRESHOLD
         )
-        self.last_signal_check_time = 0  # 信号检查时间限速
-        
         # WebSocket相关
         self.listen_key = None
         self.last_ticker_update_time = 0  # ticker 时间限速
         
         # 添加锁机制用于订单更新处理
         self.lock = asyncio.Lock()
+
+        # 帧类型到处理器的分发表：一次hash查找替换逐个字符串比较
+        self._handlers = {
+            "bookTicker": self.handle_ticker_update,
+            "ORDER_TRADE_UPDATE": self.handle_order_update,
+        }
+
+        # 节流窗口内暂存的最新ticker原始帧：突发行情只保留最后一帧，
+        # 被覆盖的帧连JSON解析都不做
+        self._pending_tick = None
+        self._pending_tick_task = None
+
+        # 后台定期任务（持仓/订单/信号同步），run()里创建、退出时统一取消
+        self._bg_tasks = []
+
+        # 信号缓冲区是否已整批装入1小时K线（装入后改走增量并入）
+        self._klines_primed = False
+
+        # 异常价差预筛阈值：最新价×10%的绝对值，60秒刷新一次；
+        # 为0时预筛放行一切，退化为逐tick精确判断
+        self._price_jump_abs = 0.0
+        self._price_jump_refreshed = 0.0
+
+        # 挂单超时最小堆：(到期时刻, 订单id)，NEW时入堆；
+        # 已成交/已撤销的堆项惰性删除（检查时对照在途挂单丢弃）。
+        # 仅在monitor_orders运行时登记，否则堆无消费者会无限增长
+        self._expiry_heap = []
+        self._order_monitor_active = False
+
+        # 热路径上反复用到的配置组合，初始化时拼好，
+        # 省去每条消息上的属性查找与f-string拼接
+        self._expected_symbol = f"{config.COIN_NAME}{config.CONTRACT_TYPE}"
+        self._subscribe_ticker_payload = _json_dumps({
+            "method": "SUBSCRIBE",
+            "params": [f"{config.COIN_NAME.lower()}{config.CONTRACT_TYPE.lower()}@bookTicker"],
+            "id": 1
+        })
+        # 订单流订阅帧依赖运行期的listenKey，按key缓存序列化结果
+        self._order_sub_key = None
+        self._order_sub_payload = None
         
         # 初始化汇总功能
         self.config = config  # 提供配置访问
         grid_scheduler.set_grid_strategy(self)
-        
-        # 初始化交易所
-        self._initialize()
     
-    def _initialize(self):
+    async def _initialize(self):
         """初始化机器人"""
         try:
             # 打印配置信息
             config.print_config()
             
             # 初始化交易所连接
-            self.exchange_interface.initialize_exchange()
+            await self.exchange_interface.initialize_exchange()
             
             # 检查并启用双向持仓模式
-            hedge_mode_enabled = self.exchange_interface.check_and_enable_hedge_mode()
+            hedge_mode_enabled = await self.exchange_interface.check_and_enable_hedge_mode()
             if not hedge_mode_enabled:
                 logger.warning("双向持仓模式未启用，程序将在单向模式下运行")
             
             # 获取 listenKey
             try:
-                self.listen_key = self.exchange_interface.get_listen_key()
+                self.listen_key = await self.exchange_interface.get_listen_key()
                 logger.info("获取listenKey成功")
             except Exception as e:
                 logger.warning(f"获取listenKey失败: {e}，将使用轮询模式")
                 self.listen_key = None
-            
+
+            # 启动订单/持仓推送流，把热路径上的REST查询换成内存读取
+            await self.exchange_interface.start_ws_streams()
+
             logger.info("网格交易机器人初始化完成")
             
         except Exception as e:
             logger.error(f"初始化失败: {e}")
             raise
     
-    async def keep_listen_key_alive(self):
-        """保持 listenKey 活跃"""
-        if not self.listen_key:
-            return
-            
-        while True:
-            try:
-                await asyncio.sleep(1800)  # 每30分钟续期一次
-                self.exchange_interface.keep_listen_key_alive(self.listen_key)
-                logger.info("listenKey续期成功")
-            except Exception as e:
-                logger.error(f"listenKey续期失败: {e}")
-                # 添加重试机制
-                await asyncio.sleep(60)  # 等待60秒后重试
-                try:
-                    self.exchange_interface.keep_listen_key_alive(self.listen_key)
-                    logger.info("listenKey续期重试成功")
-                except Exception as retry_e:
-                    logger.error(f"listenKey续期重试失败: {retry_e}")
-    
     async def monitor_orders(self):
         """监控挂单状态，超过300秒未成交的挂单自动取消"""
-        while True:
-            try:
-                await asyncio.sleep(60)  # 每60秒检查一次
-                current_time = time.time()
-                orders = self.exchange_interface.fetch_open_orders()
-                
-                if not orders:
-                    logger.info("当前没有未成交的挂单")
-                    # 重置挂单计数
-                    self.grid_core.buy_long_orders = 0.0
-                    self.grid_core.sell_long_orders = 0.0
-                    self.grid_core.sell_short_orders = 0.0
-                    self.grid_core.buy_short_orders = 0.0
-                    continue
-                
-                for order in orders:
-                    order_id = order['id']
-                    order_timestamp = order.get('timestamp')
-                    create_time = float(order['info'].get('create_time', 0))
-                    
-                    # 优先使用 create_time，如果不存在则使用 timestamp
-                    order_time = create_time if create_time > 0 else order_timestamp / 1000
-                    
-                    if not order_time:
-                        logger.warning(f"订单 {order_id} 缺少时间戳，无法检查超时")
+        self._order_monitor_active = True
+        try:
+            while True:
+                try:
+                    await asyncio.sleep(60)  # 每60秒检查一次
+                    current_time = time.monotonic()
+                    heap = self._expiry_heap
+
+                    # 堆顶未到期说明没有任何挂单超时，这一轮连REST查询都不发
+                    if not heap or heap[0][0] > current_time:
                         continue
-                    
-                    if current_time - order_time > 300:  # 超过300秒未成交
+
+                    orders = await self.exchange_interface.fetch_open_orders()
+
+                    if not orders:
+                        logger.info("当前没有未成交的挂单")
+                        # 重置挂单计数
+                        self.grid_core.buy_long_orders = 0
+                        self.grid_core.sell_long_orders = 0
+                        self.grid_core.sell_short_orders = 0
+                        self.grid_core.buy_short_orders = 0
+                        heap.clear()
+                        continue
+
+                    live_ids = {str(order['id']) for order in orders}
+
+                    while heap and heap[0][0] <= current_time:
+                        _, order_id = heapq.heappop(heap)
+                        # 已成交/已撤销的陈旧堆项：惰性删除，直接丢弃
+                        if order_id not in live_ids:
+                            continue
                         logger.info(f"订单 {order_id} 超过300秒未成交，取消挂单")
                         try:
-                            self.exchange_interface.cancel_order(order_id)
+                            await self.exchange_interface.cancel_order(order_id)
                         except Exception as e:
                             logger.error(f"取消订单 {order_id} 失败: {e}")
-            
-            except Exception as e:
-                logger.error(f"监控挂单状态失败: {e}")
+
+                except Exception as e:
+                    logger.error(f"监控挂单状态失败: {e}")
+        finally:
+            # 任务退出后停止登记并清空残留堆项，避免无消费者堆积
+            self._order_monitor_active = False
+            self._expiry_heap.clear()
     
     async def subscribe_ticker(self, websocket):
         """订阅 ticker 数据"""
-        payload = {
-            "method": "SUBSCRIBE",
-            "params": [f"{config.COIN_NAME.lower()}{config.CONTRACT_TYPE.lower()}@bookTicker"],
-            "id": 1
-        }
-        await websocket.send(json.dumps(payload))
+        await websocket.send(self._subscribe_ticker_payload)
         logger.info(f"订阅 {config.COIN_NAME} ticker 数据")
     
     async def subscribe_orders(self, websocket):
@@ -171,55 +244,79 @@ class GridTradingBot:
         if not self.listen_key:
             logger.warning("没有listenKey，无法订阅挂单数据")
             return
-            
-        payload = {
-            "method": "SUBSCRIBE",
-            "params": [self.listen_key],
-            "id": 2
-        }
-        await websocket.send(json.dumps(payload))
+
+        # 订阅帧按listenKey缓存：断线风暴下的反复重连不再每次重新序列化，
+        # 只有listenKey轮换时才重建
+        key = self.exchange_interface.listen_key or self.listen_key
+        if key != self._order_sub_key:
+            self._order_sub_key = key
+            self._order_sub_payload = _json_dumps({
+                "method": "SUBSCRIBE",
+                "params": [key],
+                "id": 2
+            })
+        await websocket.send(self._order_sub_payload)
         logger.info("订阅挂单数据")
     
-    async def handle_ticker_update(self, message):
-        """处理 ticker 更新"""
+    async def handle_ticker_update(self, data):
+        """处理 ticker 更新（data为收包循环解析好的dict或_BookTicker）"""
         try:
-            data = json.loads(message)
-            
+            # 正在处理更新的帧，窗口内暂存的旧帧作废
+            self._pending_tick = None
             # 更新价格信息，添加价格有效性验证
-            best_bid = data.get('b', 0)
-            best_ask = data.get('a', 0)
+            if type(data) is dict:
+                best_bid = data.get('b', 0)
+                best_ask = data.get('a', 0)
+            else:
+                best_bid = data.b
+                best_ask = data.a
             
-            # 验证价格数据的有效性
-            if not best_bid or not best_ask or float(best_bid) <= 0 or float(best_ask) <= 0:
+            # 验证价格数据的有效性：只转换一次str->float，每帧省4次冗余转换
+            bid = float(best_bid or 0.0)
+            ask = float(best_ask or 0.0)
+            if not (bid > 0.0 and ask > 0.0):
                 logger.warning(f"收到无效的ticker数据: bid={best_bid}, ask={best_ask}")
                 return
-            
-            self.grid_core.best_bid_price = float(best_bid)
-            self.grid_core.best_ask_price = float(best_ask)
-            
+
+            # 热路径上grid_core的属性读写集中，绑定到局部变量少走LOAD_ATTR
+            gc = self.grid_core
+            gc.best_bid_price = bid
+            gc.best_ask_price = ask
+
             # 计算中间价并验证合理性
-            new_price = (self.grid_core.best_bid_price + self.grid_core.best_ask_price) / 2
-            
-            # 价格合理性检查
-            if hasattr(self.grid_core, 'latest_price') and self.grid_core.latest_price > 0:
-                price_change_ratio = abs(new_price - self.grid_core.latest_price) / self.grid_core.latest_price
+            new_price = (bid + ask) * 0.5
+
+            # 价格合理性检查（latest_price在GridCore.__init__预先声明）：
+            # 先用缓存的绝对阈值预筛，绝大多数tick只付一次减法和比较；
+            # 只有越过阈值的罕见情况才做除法算出精确幅度
+            prev = gc.latest_price
+            if prev > 0 and abs(new_price - prev) > self._price_jump_abs:
+                price_change_ratio = abs(new_price - prev) / prev
                 if price_change_ratio > 0.1:  # 10%的价格变化阈值
-                    logger.warning(f"价格变化异常: {self.grid_core.latest_price} -> {new_price}, 变化幅度: {price_change_ratio:.2%}")
+                    logger.warning(f"价格变化异常: {prev} -> {new_price}, 变化幅度: {price_change_ratio:.2%}")
                     # 如果价格变化过大，可以选择不更新或使用平滑处理
                     # 这里选择继续使用新价格，但记录警告
-            
-            self.grid_core.latest_price = new_price
+
+            gc.latest_price = new_price
             
             # 更新交易所接口的WebSocket价格
             self.exchange_interface.update_websocket_price(new_price)
             
-            # 时间限速，避免过于频繁的处理
-            current_time = time.time()
+            # 时间限速，避免过于频繁的处理；统一用单调时钟读一次，
+            # 后面所有间隔判断复用，不受系统时间回拨/NTP校时影响
+            current_time = time.monotonic()
             if current_time - self.last_ticker_update_time < 1:  # 1秒限制
                 return
             
             self.last_ticker_update_time = current_time
-            
+
+            # 刷新异常价差预筛的绝对阈值（每60秒一次；阈值略陈旧只影响
+            # 预筛松紧，精确的10%判断仍在慢路径里兜底）
+            if current_time - self._price_jump_refreshed > 60.0:
+                self._price_jump_abs = new_price * 0.1
+                self._price_jump_refreshed = current_time
+
+
             # 【最高优先级】检查是否处于休眠状态
             if self.is_sleeping:
                 if current_time - self.sleep_start_time < 24 * 3600:  # 24小时休眠
@@ -231,67 +328,129 @@ class GridTradingBot:
                     logger.info("24小时休眠结束，恢复正常交易")
             
             # 【最高优先级】极端行情防护检测
-            market_state = self.extreme_protection.update_market_data(self.grid_core.latest_price)
+            market_state = self.extreme_protection.update_market_data(new_price)
             if market_state.is_extreme:
                 await self.trigger_emergency_protection()
                 return  # 触发紧急防护后立即返回，不执行后续逻辑
-            
-            # 定期同步持仓（每30秒）
-            if current_time - self.grid_core.last_position_update_time > 30:
-                long_pos, short_pos = self.exchange_interface.get_position()
-                self.grid_core.long_position = long_pos
-                self.grid_core.short_position = short_pos
-                self.grid_core.last_position_update_time = current_time
-                logger.info(f"同步持仓: 多头 {long_pos} 张, 空头 {short_pos} 张 @ ticker")
-            
-            # 定期同步订单状态（每60秒）
-            if current_time - self.grid_core.last_orders_update_time > 60:
-                self.grid_core.check_orders_status()
-                self.grid_core.last_orders_update_time = current_time
-                logger.info(f"定期同步订单状态 @ ticker")
-            
-            # EMA+ADX信号检测（每小时检查一次）
-            if current_time - self.last_signal_check_time > 3600:  # 1小时
-                await self.update_signal_and_adjust_grid()
-                self.last_signal_check_time = current_time
-            
-            # 触发网格策略调整
-            await self.grid_core.adjust_grid_strategy()
+
+            # 持仓/订单/信号的定期同步都由独立后台任务驱动，
+            # ticker路径只做网格调整，不再被REST往返和信号计算拖住
+            await gc.adjust_grid_strategy()
             
         except Exception as e:
             logger.error(f"处理ticker更新失败: {e}")
     
+    async def _drain_pending_ticks(self):
+        """补处理节流窗口内暂存的最后一帧ticker
+
+        突发行情中收包循环只暂存原始帧；若随后链路转静，这里保证
+        暂存的最新价最迟在窗口结束后约100ms内被消费。
+        """
+        while True:
+            try:
+                await asyncio.sleep(0.1)
+                message = self._pending_tick
+                if message is None or time.monotonic() - self.last_ticker_update_time < 1.0:
+                    continue
+                self._pending_tick = None
+                if _TICKER_DECODER is not None:
+                    await self.handle_ticker_update(_TICKER_DECODER.decode(message))
+                else:
+                    await self.handle_ticker_update(_json_loads(message))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"处理暂存ticker失败: {e}")
+
+    async def _position_sync_loop(self):
+        """每30秒同步一次持仓（从ticker热路径移出的后台任务）"""
+        while True:
+            try:
+                await asyncio.sleep(30)
+                if self.is_sleeping:
+                    continue
+                long_pos, short_pos = await self.exchange_interface.get_position()
+                gc = self.grid_core
+                gc.long_position = long_pos
+                gc.short_position = short_pos
+                gc.last_position_update_time = time.monotonic()
+                logger.info(f"同步持仓: 多头 {long_pos} 张, 空头 {short_pos} 张 @ 后台")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"定期同步持仓失败: {e}")
+
+    async def _orders_sync_loop(self):
+        """每60秒同步一次挂单状态（从ticker热路径移出的后台任务）"""
+        while True:
+            try:
+                await asyncio.sleep(60)
+                if self.is_sleeping:
+                    continue
+                await self.grid_core.check_orders_status()
+                logger.info("定期同步订单状态 @ 后台")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"定期同步订单状态失败: {e}")
+
+    async def _signal_loop(self):
+        """每小时更新一次EMA+ADX信号（从ticker热路径移出的后台任务）
+
+        信号计算含K线REST拉取，耗时数百毫秒；放在独立任务里，
+        ticker处理不再每小时卡一次。
+        """
+        while True:
+            try:
+                await asyncio.sleep(3600)
+                if self.is_sleeping:
+                    continue
+                await self.update_signal_and_adjust_grid()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"定期信号更新失败: {e}")
+
     async def update_signal_and_adjust_grid(self):
         """更新EMA+ADX信号并调整网格参数"""
         try:
-            # 获取历史K线数据用于信号计算
-            klines = self.exchange_interface.get_klines(timeframe='1h', limit=300)  # 获取300根1小时K线
-            
-            if not klines or len(klines) < 200:  # 确保有足够数据计算EMA200
-                logger.warning("K线数据不足，跳过信号检测")
-                return
-            
-            # 转换为DataFrame格式
-            import pandas as pd
+            # 增量路径：缓冲区已装入整批1小时K线后，每小时只拉最近2根
+            # （最新收盘+进行中）并入，REST负载从300根降到2根
+            merged = False
+            if self._klines_primed:
+                recent = await self.exchange_interface.get_klines(timeframe='1h', limit=2)
+                if recent:
+                    merged = self.signal_module.merge_latest(
+                        recent.timestamp,
+                        recent.open,
+                        recent.high,
+                        recent.low,
+                        recent.close,
+                        recent.volume,
+                    )
+
+            if not merged:
+                # 首次或与缓冲区断档时整批重载历史K线
+                klines = await self.exchange_interface.get_klines(timeframe='1h', limit=300)  # 获取300根1小时K线
+
+                if not klines or len(klines) < 200:  # 确保有足够数据计算EMA200
+                    logger.warning("K线数据不足，跳过信号检测")
+                    return
+
+                # 直接把KlineArray的numpy列写入信号模块的环形缓冲区，
+                # 跳过DataFrame/Timestamp的整套构建
+                self.signal_module.load_arrays(
+                    klines.timestamp,
+                    klines.open,
+                    klines.high,
+                    klines.low,
+                    klines.close,
+                    klines.volume,
+                )
+                self._klines_primed = True
+
             from datetime import datetime
             
-            df_data = []
-            for kline in klines:
-                df_data.append({
-                    'timestamp': datetime.fromtimestamp(kline[0] / 1000),
-                    'open': float(kline[1]),
-                    'high': float(kline[2]),
-                    'low': float(kline[3]),
-                    'close': float(kline[4]),
-                    'volume': float(kline[5])
-                })
-            
-            df = pd.DataFrame(df_data)
-            df.set_index('timestamp', inplace=True)
-            
-            # 更新信号模块数据缓存
-            self.signal_module.data_buffer = df
-            
             # 计算当前信号
             signal_info = self.signal_module.calculate_signals()
             
@@ -353,42 +512,50 @@ class GridTradingBot:
     async def trigger_emergency_protection(self):
         """触发紧急防护：平仓所有持仓，撤销所有挂单，进入24小时休眠"""
         try:
-            current_time = time.time()
-            
+            current_time = time.monotonic()
+
             logger.critical(f"【紧急风控触发】检测到极端行情，当前价格: {self.grid_core.latest_price}")
             
-            # 1. 撤销所有挂单
+            # 1. 撤销所有挂单（并发发出，N次往返压成约1次往返的墙钟时间——
+            # 极端行情下每秒都在暴露风险）
             try:
-                orders = self.exchange_interface.fetch_open_orders()
+                orders = await self.exchange_interface.fetch_open_orders()
                 if orders:
                     logger.warning(f"撤销所有挂单，共{len(orders)}个订单")
-                    for order in orders:
-                        try:
-                            self.exchange_interface.cancel_order(order['id'])
-                        except Exception as e:
-                            logger.error(f"撤销订单{order['id']}失败: {e}")
+                    results = await asyncio.gather(
+                        *(self.exchange_interface.cancel_order(order['id']) for order in orders),
+                        return_exceptions=True,
+                    )
+                    for order, result in zip(orders, results):
+                        if isinstance(result, Exception):
+                            logger.error(f"撤销订单{order['id']}失败: {result}")
                 else:
                     logger.info("当前无挂单需要撤销")
             except Exception as e:
                 logger.error(f"撤销挂单失败: {e}")
-            
-            # 2. 平仓所有持仓
+
+            # 2. 平仓所有持仓（双向并发平仓）
             try:
-                long_pos, short_pos = self.exchange_interface.get_position()
-                
-                # 平多头持仓
+                long_pos, short_pos = await self.exchange_interface.get_position()
+
+                close_calls = []
                 if long_pos > 0:
                     logger.warning(f"平仓多头持仓: {long_pos}张")
-                    self.exchange_interface.place_order('sell', 0, long_pos, True, 'long')
-                
-                # 平空头持仓
+                    close_calls.append(
+                        self.exchange_interface.place_order('sell', 0, long_pos, True, 'long'))
                 if short_pos > 0:
                     logger.warning(f"平仓空头持仓: {short_pos}张")
-                    self.exchange_interface.place_order('buy', 0, short_pos, True, 'short')
-                
-                if long_pos == 0 and short_pos == 0:
+                    close_calls.append(
+                        self.exchange_interface.place_order('buy', 0, short_pos, True, 'short'))
+
+                if close_calls:
+                    results = await asyncio.gather(*close_calls, return_exceptions=True)
+                    for result in results:
+                        if isinstance(result, Exception):
+                            logger.error(f"平仓下单失败: {result}")
+                else:
                     logger.info("当前无持仓需要平仓")
-                    
+
             except Exception as e:
                 logger.error(f"平仓操作失败: {e}")
             
@@ -409,108 +576,108 @@ class GridTradingBot:
         except Exception as e:
             logger.error(f"紧急防护执行失败: {e}")
     
-    async def handle_order_update(self, message):
-        """处理挂单更新"""
-        async with self.lock:  # 添加锁机制
-            try:
-                data = json.loads(message)
-                order_data = data.get('o', {})
-                
-                # 获取订单信息
-                symbol = order_data.get('s')
-                side = order_data.get('S')  # BUY 或 SELL
-                position_side = order_data.get('ps')  # LONG 或 SHORT
-                order_status = order_data.get('X')  # 订单状态
-                execution_type = order_data.get('x')  # 执行类型
-                quantity = float(order_data.get('q', 0))  # 订单数量
-                filled = float(order_data.get('z', 0))  # 已成交数量
-                remaining = quantity - filled  # 剩余数量
-                
-                # 只处理我们关注的交易对
-                expected_symbol = f"{config.COIN_NAME}{config.CONTRACT_TYPE}"
-                if symbol != expected_symbol:
-                    return
-                
-                logger.info(f"订单更新: {side} {position_side} {order_status} 数量:{quantity} 成交:{filled}")
-                
-                # 详细的订单状态处理
-                if order_status == "NEW":
-                    # 新订单创建时更新挂单数量
-                    self._update_pending_orders(side, position_side, remaining, "add")
-                elif order_status == "FILLED":
+    async def handle_order_update(self, data):
+        """处理挂单更新（data为收包循环解析好的dict）"""
+        try:
+            order_data = data.get('o', {})
+
+            # 只处理我们关注的交易对
+            symbol = order_data.get('s')
+            if symbol != self._expected_symbol:
+                return
+
+            # 获取订单信息
+            side = order_data.get('S')  # BUY 或 SELL
+            position_side = order_data.get('ps')  # LONG 或 SHORT
+            order_status = order_data.get('X')  # 订单状态
+            # 合约张数恒为整数：解码时一次性转int，后续计数器走
+            # 整数加减，不积累浮点漂移
+            quantity = int(float(order_data.get('q', 0)))  # 订单数量
+            filled = int(float(order_data.get('z', 0)))  # 已成交数量
+            remaining = quantity - filled  # 剩余数量
+
+            logger.info(f"订单更新: {side} {position_side} {order_status} 数量:{quantity} 成交:{filled}")
+
+            # NEW走无锁快路径：只有本事件循环任务会改这些整数计数器，
+            # 无跨任务竞态，挂单突发时不再在锁上排队
+            if order_status == "NEW":
+                # 新订单创建时更新挂单数量，并登记300秒超时到期时刻
+                self._update_pending_orders(side, position_side, remaining, "add")
+                if self._order_monitor_active:
+                    heapq.heappush(self._expiry_heap,
+                                   (time.monotonic() + 300, str(order_data.get('i'))))
+                return
+
+            # 终结状态要发REST核对，保留锁防止与其他终结事件交叉
+            async with self.lock:
+                if order_status == "FILLED":
                     # 订单完全成交时更新持仓和挂单
                     self._update_position_and_orders(side, position_side, filled)
                 elif order_status in ["CANCELED", "EXPIRED"]:
                     # 订单取消或过期时更新挂单数量
                     self._update_pending_orders(side, position_side, remaining, "remove")
-                
+
                 # 如果订单完全成交或取消，更新挂单状态
                 if order_status in ['FILLED', 'CANCELED', 'EXPIRED']:
-                    self.grid_core.check_orders_status()
-                    
+                    await self.grid_core.check_orders_status()
+
                     # 如果是成交，同步持仓
                     if order_status == 'FILLED':
-                        long_pos, short_pos = self.exchange_interface.get_position()
+                        long_pos, short_pos = await self.exchange_interface.get_position()
                         self.grid_core.long_position = long_pos
                         self.grid_core.short_position = short_pos
                         logger.info(f"订单成交，同步持仓: 多头 {long_pos} 张, 空头 {short_pos} 张")
-            
-            except Exception as e:
-                logger.error(f"处理挂单更新失败: {e}")
+
+        except Exception as e:
+            logger.error(f"处理挂单更新失败: {e}")
     
     def _update_pending_orders(self, side, position_side, quantity, action):
         """更新挂单数量"""
         try:
+            entry = _ORDER_ATTR.get((side, position_side))
+            if entry is None:
+                return
+            orders_attr = entry[0]
+            gc = self.grid_core
+            cur = getattr(gc, orders_attr)
             if action == "add":
-                if side == "BUY" and position_side == "LONG":
-                    self.grid_core.buy_long_orders += quantity
-                elif side == "SELL" and position_side == "LONG":
-                    self.grid_core.sell_long_orders += quantity
-                elif side == "BUY" and position_side == "SHORT":
-                    self.grid_core.buy_short_orders += quantity
-                elif side == "SELL" and position_side == "SHORT":
-                    self.grid_core.sell_short_orders += quantity
+                setattr(gc, orders_attr, cur + quantity)
             elif action == "remove":
-                if side == "BUY" and position_side == "LONG":
-                    self.grid_core.buy_long_orders = max(0.0, self.grid_core.buy_long_orders - quantity)
-                elif side == "SELL" and position_side == "LONG":
-                    self.grid_core.sell_long_orders = max(0.0, self.grid_core.sell_long_orders - quantity)
-                elif side == "BUY" and position_side == "SHORT":
-                    self.grid_core.buy_short_orders = max(0.0, self.grid_core.buy_short_orders - quantity)
-                elif side == "SELL" and position_side == "SHORT":
-                    self.grid_core.sell_short_orders = max(0.0, self.grid_core.sell_short_orders - quantity)
+                setattr(gc, orders_attr, max(0, cur - quantity))
         except Exception as e:
             logger.error(f"更新挂单数量失败: {e}")
 
     def _update_position_and_orders(self, side, position_side, filled_quantity):
         """更新持仓和挂单状态"""
         try:
-            if side == "BUY":
-                if position_side == "LONG":  # 多头开仓单
-                    self.grid_core.long_position += filled_quantity
-                    self.grid_core.buy_long_orders = max(0.0, self.grid_core.buy_long_orders - filled_quantity)
-                elif position_side == "SHORT":  # 空头止盈单
-                    self.grid_core.short_position = max(0.0, self.grid_core.short_position - filled_quantity)
-                    self.grid_core.buy_short_orders = max(0.0, self.grid_core.buy_short_orders - filled_quantity)
-            elif side == "SELL":
-                if position_side == "LONG":  # 多头止盈单
-                    self.grid_core.long_position = max(0.0, self.grid_core.long_position - filled_quantity)
-                    self.grid_core.sell_long_orders = max(0.0, self.grid_core.sell_long_orders - filled_quantity)
-                elif position_side == "SHORT":  # 空头开仓单
-                    self.grid_core.short_position += filled_quantity
-                    self.grid_core.sell_short_orders = max(0.0, self.grid_core.sell_short_orders - filled_quantity)
+            entry = _ORDER_ATTR.get((side, position_side))
+            if entry is None:
+                return
+            orders_attr, pos_attr, opens_position = entry
+            gc = self.grid_core
+            if opens_position:
+                # 开仓单成交：持仓增加
+                setattr(gc, pos_attr, getattr(gc, pos_attr) + filled_quantity)
+            else:
+                # 止盈单成交：持仓减少
+                setattr(gc, pos_attr, max(0, getattr(gc, pos_attr) - filled_quantity))
+            setattr(gc, orders_attr, max(0, getattr(gc, orders_attr) - filled_quantity))
         except Exception as e:
             logger.error(f"更新持仓和挂单状态失败: {e}")
     
     async def connect_websocket(self):
         """连接 WebSocket 并订阅 ticker 和持仓数据"""
         try:
-            # 添加连接超时设置
+            # 添加连接超时设置；关闭permessage-deflate压缩协商
+            # （行情帧很小，压缩纯耗CPU），放开单帧大小上限避免
+            # 库层为限长做的额外检查
             async with websockets.connect(
                 config.WEBSOCKET_URL,
                 ping_interval=20,
                 ping_timeout=10,
-                close_timeout=10
+                close_timeout=10,
+                compression=None,
+                max_size=None
             ) as websocket:
                 logger.info("WebSocket 连接成功")
                 await self.subscribe_ticker(websocket)
@@ -522,14 +689,33 @@ class GridTradingBot:
                 while True:
                     try:
                         message = await websocket.recv()
-                        data = json.loads(message)
-                        
-                        if data.get("e") == "bookTicker":
-                            await self.handle_ticker_update(message)
-                        elif data.get("e") == "ORDER_TRADE_UPDATE":
-                            await self.handle_order_update(message)
-                            
-                    except json.JSONDecodeError as e:
+
+                        # 节流窗口内的ticker帧只暂存原始帧（新帧覆盖旧帧），
+                        # 解析开销随节流后的速率增长而不是链路帧率
+                        if time.monotonic() - self.last_ticker_update_time < 1.0:
+                            probe = message[:48]
+                            is_tick = (b'"bookTicker"' in probe
+                                       if isinstance(probe, bytes)
+                                       else '"bookTicker"' in probe)
+                            if is_tick:
+                                self._pending_tick = message
+                                continue
+
+                        # 每帧只解析一次：msgspec可用时先按ticker结构单遍
+                        # 试解码（绝大多数帧是bookTicker），其余帧才整帧解析
+                        if _TICKER_DECODER is not None:
+                            tick = _TICKER_DECODER.decode(message)
+                            if tick.e == "bookTicker":
+                                await self.handle_ticker_update(tick)
+                                continue
+
+                        data = _json_loads(message)
+                        handler = self._handlers.get(data.get("e"))
+                        if handler is not None:
+                            await handler(data)
+
+                    except ValueError as e:
+                        # orjson/msgspec/标准库的解码错误都归于ValueError
                         logger.error(f"WebSocket 消息解析失败: {e}")
                     except Exception as e:
                         logger.error(f"WebSocket 消息处理失败: {e}")
@@ -549,30 +735,28 @@ class GridTradingBot:
     
     async def run(self):
         """启动机器人"""
+        # 初始化交易所（异步接口需要在事件循环内完成）
+        await self._initialize()
+        
         # 在开始交易前，先下载历史数据并进行EMA+ADX计算
         logger.info("开始下载历史K线数据进行EMA+ADX计算...")
         try:
             # 下载足够的历史数据（至少200根K线用于EMA200计算）
-            klines = self.exchange_interface.get_klines(timeframe='5m', limit=300)
+            klines = await self.exchange_interface.get_klines(timeframe='5m', limit=300)
             if len(klines) < 200:
                 logger.error(f"历史数据不足，仅获取到 {len(klines)} 根K线，需要至少200根")
                 raise ValueError("历史数据不足")
             
-            # 提取价格数据
-            closes = [float(kline['close']) for kline in klines]
-            highs = [float(kline['high']) for kline in klines]
-            lows = [float(kline['low']) for kline in klines]
-            
             # 初始化信号模块的历史数据
             logger.info("初始化EMA+ADX信号模块历史数据...")
-            for i, kline in enumerate(klines):
+            for row in klines:
                 data_point = {
-                    'timestamp': kline['timestamp'],
-                    'open': kline['open'],
-                    'high': kline['high'],
-                    'low': kline['low'],
-                    'close': kline['close'],
-                    'volume': kline['volume']
+                    'timestamp': row[0],
+                    'open': row[1],
+                    'high': row[2],
+                    'low': row[3],
+                    'close': row[4],
+                    'volume': row[5]
                 }
                 self.signal_module.update_data_buffer(data_point)
             
@@ -588,7 +772,7 @@ class GridTradingBot:
             logger.error("程序将继续运行，但EMA+ADX功能可能不准确")
         
         # 初始化时获取一次持仓数据
-        long_pos, short_pos = self.exchange_interface.get_position()
+        long_pos, short_pos = await self.exchange_interface.get_position()
         self.grid_core.long_position = long_pos
         self.grid_core.short_position = short_pos
         logger.info(f"初始化持仓: 多头 {long_pos} 张, 空头 {short_pos} 张")
@@ -597,7 +781,7 @@ class GridTradingBot:
         await asyncio.sleep(5)
         
         # 初始化时获取一次挂单状态
-        self.grid_core.check_orders_status()
+        await self.grid_core.check_orders_status()
         logger.info(
             f"初始化挂单状态: 多头开仓={self.grid_core.buy_long_orders}, "
             f"多头止盈={self.grid_core.sell_long_orders}, "
@@ -609,8 +793,17 @@ class GridTradingBot:
         logger.info("启动网格交易汇总功能调度器...")
         grid_scheduler.start_scheduler()
         
-        # 启动后台任务
-        asyncio.create_task(self.keep_listen_key_alive())
+        # 补处理节流窗口内暂存的ticker帧
+        self._pending_tick_task = asyncio.create_task(self._drain_pending_ticks())
+
+        # 定期同步任务：各自独立sleep驱动，不占用ticker处理路径
+        self._bg_tasks = [
+            asyncio.create_task(self._position_sync_loop()),
+            asyncio.create_task(self._orders_sync_loop()),
+            asyncio.create_task(self._signal_loop()),
+        ]
+
+        # 可选后台任务（listenKey续期由ExchangeInterface的专属任务负责）
         # asyncio.create_task(self.monitor_orders())  # 可选：启用订单监控
         
         # 主循环：WebSocket连接
@@ -624,9 +817,16 @@ class GridTradingBot:
         except KeyboardInterrupt:
             logger.info("接收到停止信号，正在关闭程序...")
         finally:
+            # 停止暂存ticker补处理任务和定期同步任务
+            if self._pending_tick_task is not None:
+                self._pending_tick_task.cancel()
+            for task in self._bg_tasks:
+                task.cancel()
             # 停止调度器
             logger.info("停止网格交易汇总功能调度器...")
             grid_scheduler.stop_scheduler()
+            # 关闭交易所aiohttp会话
+            await self.exchange_interface.close()
 
 # ==================== 主程序 ====================
 async def main():
@@ -635,4 +835,6 @@ async def main():
     await bot.run()
 
 if __name__ == "__main__":
+    if uvloop is not None:
+        uvloop.install()
     asyncio.run(main())
\ No newline at end of file
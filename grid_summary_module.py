@@ -9,13 +9,87 @@
 
 import json
 import os
+from bisect import bisect_left, bisect_right, insort
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Tuple
 import numpy as np
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass, fields
 import logging
 
-@dataclass
+# orjson（Rust实现）序列化比标准库json快数倍，
+# 未安装时报告/索引写盘自动退回标准库
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Numba为可选加速依赖：存在时把夏普/最大回撤归约编译成单趟融合循环
+# （30天收益这类小数组上省掉逐个numpy调用的C包装开销），
+# 不存在时退回numpy向量化实现
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+
+if NUMBA_AVAILABLE:
+    @njit(cache=True, fastmath=True)
+    def _sharpe_kernel(returns, rf_daily):
+        """年化夏普：超额收益均值/标准差(ddof=0)，单趟两遍历"""
+        n = returns.shape[0]
+        if n < 2:
+            return 0.0
+        mean = 0.0
+        for i in range(n):
+            mean += returns[i] - rf_daily
+        mean /= n
+        var = 0.0
+        for i in range(n):
+            d = returns[i] - rf_daily - mean
+            var += d * d
+        var /= n
+        if var == 0.0:
+            return 0.0
+        return mean / var ** 0.5 * 365.0 ** 0.5
+
+    @njit(cache=True, fastmath=True)
+    def _mdd_kernel(cum):
+        """相对历史高点的最大回撤，单趟维护峰值与最差回撤"""
+        if cum.shape[0] < 2:
+            return 0.0
+        peak = cum[0]
+        worst = 0.0
+        for i in range(cum.shape[0]):
+            v = cum[i]
+            if v > peak:
+                peak = v
+            denom = peak if peak > 0.0 else 1.0
+            dd = (peak - v) / denom
+            if dd > worst:
+                worst = dd
+        return worst
+else:
+    def _sharpe_kernel(returns, rf_daily):
+        """numpy退回实现：与JIT内核语义一致"""
+        if returns.shape[0] < 2:
+            return 0.0
+        excess = returns - rf_daily
+        std = np.std(excess)
+        if std == 0:
+            return 0.0
+        return float(np.mean(excess) / std * np.sqrt(365))
+
+    def _mdd_kernel(cum):
+        """numpy退回实现：与JIT内核语义一致"""
+        if cum.shape[0] < 2:
+            return 0.0
+        running_max = np.maximum.accumulate(cum)
+        drawdown = (cum - running_max) / np.where(running_max > 0, running_max, 1.0)
+        return float(-drawdown.min())
+
+
+@dataclass(slots=True, frozen=True)
 class GridTradeRecord:
     """网格交易记录"""
     timestamp: str
@@ -27,7 +101,88 @@ class GridTradeRecord:
     grid_level: int
     order_id: str
 
-@dataclass
+# 字符串枚举压成int8码：列存后交易方向/网格方向的统计全部变成掩码运算
+_TYPE_CODE = {'buy': 0, 'sell': 1}
+_GRID_CODE = {'long': 0, 'short': 1}
+_TYPE_NAME = ('buy', 'sell')
+_GRID_NAME = ('long', 'short')
+
+
+class _TradeColumns:
+    """交易记录的SoA列式存储
+
+    数值列(price/quantity/profit)和int8方向码放在容量翻倍增长的
+    numpy数组里，聚合直接走向量化归约；时间戳/网格层级/订单id等
+    冷元数据留在并行Python列表中，按需重建GridTradeRecord视图。
+    """
+
+    __slots__ = ('n', 'timestamps', 'grid_levels', 'order_ids',
+                 'price', 'quantity', 'profit', 'cum_pnl',
+                 'type_code', 'grid_code')
+
+    _INIT_CAP = 256
+
+    def __init__(self):
+        self.n = 0
+        self.timestamps: List[str] = []
+        self.grid_levels: List[int] = []
+        self.order_ids: List[str] = []
+        cap = self._INIT_CAP
+        self.price = np.empty(cap, dtype=np.float64)
+        self.quantity = np.empty(cap, dtype=np.float64)
+        self.profit = np.empty(cap, dtype=np.float64)
+        # 累计盈亏前缀和：写入时增量维护，报告期免去整列cumsum
+        self.cum_pnl = np.empty(cap, dtype=np.float64)
+        self.type_code = np.empty(cap, dtype=np.int8)
+        self.grid_code = np.empty(cap, dtype=np.int8)
+
+    def __len__(self):
+        return self.n
+
+    def _grow(self, need: int):
+        """容量不足时翻倍扩容（摊还O(1)追加）"""
+        cap = self.price.shape[0]
+        if self.n + need <= cap:
+            return
+        while cap < self.n + need:
+            cap *= 2
+        for name in ('price', 'quantity', 'profit', 'cum_pnl', 'type_code', 'grid_code'):
+            old = getattr(self, name)
+            new = np.empty(cap, dtype=old.dtype)
+            new[:self.n] = old[:self.n]
+            setattr(self, name, new)
+
+    def append(self, timestamp: str, trade_type: str, grid_type: str,
+               price: float, quantity: float, profit: float,
+               grid_level: int, order_id: str):
+        self._grow(1)
+        i = self.n
+        self.price[i] = price
+        self.quantity[i] = quantity
+        self.profit[i] = profit
+        self.cum_pnl[i] = profit if i == 0 else self.cum_pnl[i - 1] + profit
+        self.type_code[i] = _TYPE_CODE.get(trade_type, 0)
+        self.grid_code[i] = _GRID_CODE.get(grid_type, 0)
+        self.timestamps.append(timestamp)
+        self.grid_levels.append(grid_level)
+        self.order_ids.append(order_id)
+        self.n = i + 1
+
+    def record_at(self, i: int) -> GridTradeRecord:
+        """按行号重建AoS记录视图（仅用于按需读取，不在聚合路径上）"""
+        return GridTradeRecord(
+            timestamp=self.timestamps[i],
+            trade_type=_TYPE_NAME[self.type_code[i]],
+            grid_type=_GRID_NAME[self.grid_code[i]],
+            price=float(self.price[i]),
+            quantity=float(self.quantity[i]),
+            profit=float(self.profit[i]),
+            grid_level=self.grid_levels[i],
+            order_id=self.order_ids[i],
+        )
+
+
+@dataclass(slots=True, frozen=True)
 class DailySummary:
     """每日汇总数据"""
     date: str
@@ -65,12 +220,77 @@ class DailySummary:
     used_capital: float
     available_capital: float
 
+# 字段名在导入时取一次；DailySummary为扁平结构，
+# 按字段直接取值建dict即可，避免asdict的递归深拷贝
+_SUMMARY_FIELDS = tuple(f.name for f in fields(DailySummary))
+
+
+def _summary_dict(summary: DailySummary) -> dict:
+    """把DailySummary转为普通dict（仅一层取值，无深拷贝）"""
+    return {name: getattr(summary, name) for name in _SUMMARY_FIELDS}
+
+
+# 报告模板在导入时解析一次，生成时只做format_map填充，
+# 不再每次重新构建f-string的静态文本部分
+_REPORT_TPL = """
+==========================================
+网格交易策略每日汇总报告
+日期: {date}
+==========================================
+
+📊 盈亏情况
+├─ 当日盈亏: {daily_pnl:,.2f} USDT
+├─ 总盈亏: {total_pnl:,.2f} USDT
+├─ 当日收益率: {daily_return_rate:.4%}
+└─ 总收益率: {total_return_rate:.4%}
+
+📈 交易统计
+├─ 总交易次数: {total_trades}
+├─ 当日交易次数: {daily_trades}
+├─ 做多交易次数: {long_trades} (当日: {daily_long_trades})
+└─ 做空交易次数: {short_trades} (当日: {daily_short_trades})
+
+💰 持仓情况
+├─ 总持仓量: {total_position:.4f}
+├─ 做多持仓: {long_position:.4f}
+└─ 做空持仓: {short_position:.4f}
+
+⚡ 风险指标
+├─ 夏普比率: {sharpe_ratio:.4f}
+├─ 最大回撤: {max_drawdown:.4%}
+└─ 胜率: {win_rate:.4%}
+
+🔧 网格状态
+├─ 活跃网格数: {active_grids}
+├─ 网格间距: {grid_spacing:.4f}
+└─ 当前价格: {current_price:.4f}
+
+💵 资金使用
+├─ 总资金: {total_capital:,.2f} USDT
+├─ 已用资金: {used_capital:,.2f} USDT
+└─ 可用资金: {available_capital:,.2f} USDT
+
+==========================================
+报告生成时间: {now}
+==========================================
+"""
+
+
 class GridSummaryModule:
     """网格交易汇总模块"""
     
     def __init__(self, summary_dir: str = "grid_summary_reports"):
         self.summary_dir = summary_dir
-        self.trade_records: List[GridTradeRecord] = []
+        # 汇总索引文件：全部每日汇总合并存一份，启动时一次读入，
+        # 免去逐日打开+解析几百个JSON文件
+        self._index_file = os.path.join(summary_dir, 'summaries_index.json')
+        self._cols = _TradeColumns()
+        # 按日累计盈亏：写入时增量维护，30天收益率退化成30次dict查找
+        self._pnl_by_date: Dict[str, float] = {}
+        # 按日行号索引 + 有序日期表：当日切片O(k)取行号，
+        # 截止日前缀用bisect定界，免去全量时间戳字符串比较
+        self._trades_by_date: Dict[str, List[int]] = {}
+        self._dates_sorted: List[str] = []
         self.daily_summaries: Dict[str, DailySummary] = {}
         self.logger = self._setup_logger()
         
@@ -79,6 +299,10 @@ class GridSummaryModule:
         
         # 加载历史数据
         self._load_historical_data()
+
+        # 有序汇总日期表：保存时insort维护，最近K天查询退化成
+        # 一次bisect定界+切片，不再逐日strftime拼串查dict
+        self._summary_dates: List[str] = sorted(self.daily_summaries)
     
     def _setup_logger(self) -> logging.Logger:
         """设置日志记录器"""
@@ -98,118 +322,171 @@ class GridSummaryModule:
         
         return logger
     
+    @property
+    def trade_records(self) -> List[GridTradeRecord]:
+        """全部交易记录的AoS视图（按需重建，聚合计算不走这里）"""
+        return [self._cols.record_at(i) for i in range(self._cols.n)]
+
     def add_trade_record(self, trade_record: GridTradeRecord):
         """添加交易记录"""
-        self.trade_records.append(trade_record)
+        self._cols.append(
+            trade_record.timestamp, trade_record.trade_type,
+            trade_record.grid_type, trade_record.price,
+            trade_record.quantity, trade_record.profit,
+            trade_record.grid_level, trade_record.order_id,
+        )
+        day = trade_record.timestamp[:10]
+        self._pnl_by_date[day] = self._pnl_by_date.get(day, 0.0) + trade_record.profit
+        self._index_day(day, self._cols.n - 1)
         self.logger.info(f"添加交易记录: {trade_record.trade_type} {trade_record.quantity} @ {trade_record.price}")
+
+    def add_trade_batch(self, prices, quantities, profits, meta):
+        """批量添加交易记录
+
+        prices/quantities/profits为并行数值数组，meta为等长的
+        (timestamp, trade_type, grid_type, grid_level, order_id)元组序列；
+        整批写入列存并只输出一条日志。
+        """
+        cols = self._cols
+        cols._grow(len(meta))
+        pnl_by_date = self._pnl_by_date
+        for (ts, tt, gt, lvl, oid), p, q, pf in zip(meta, prices, quantities, profits):
+            i = cols.n
+            cols.price[i] = p
+            cols.quantity[i] = q
+            cols.profit[i] = pf
+            cols.cum_pnl[i] = pf if i == 0 else cols.cum_pnl[i - 1] + pf
+            cols.type_code[i] = _TYPE_CODE.get(tt, 0)
+            cols.grid_code[i] = _GRID_CODE.get(gt, 0)
+            cols.timestamps.append(ts)
+            cols.grid_levels.append(lvl)
+            cols.order_ids.append(oid)
+            cols.n = i + 1
+            day = ts[:10]
+            pnl_by_date[day] = pnl_by_date.get(day, 0.0) + pf
+            self._index_day(day, i)
+        self.logger.info(f"批量添加 {len(meta)} 条交易记录")
+
+    def _index_day(self, day: str, row: int):
+        """把行号挂到按日索引上；首次出现的日期插入有序日期表"""
+        bucket = self._trades_by_date.get(day)
+        if bucket is None:
+            self._trades_by_date[day] = bucket = []
+            insort(self._dates_sorted, day)
+        bucket.append(row)
     
     def calculate_sharpe_ratio(self, returns: List[float], risk_free_rate: float = 0.02) -> float:
-        """计算夏普比率"""
-        if len(returns) < 2:
-            return 0.0
-        
-        returns_array = np.array(returns)
-        excess_returns = returns_array - risk_free_rate / 365  # 日化无风险利率
-        
-        if np.std(excess_returns) == 0:
-            return 0.0
-        
-        return np.mean(excess_returns) / np.std(excess_returns) * np.sqrt(365)
-    
-    def calculate_max_drawdown(self, pnl_series: List[float]) -> float:
-        """计算最大回撤"""
-        if len(pnl_series) < 2:
-            return 0.0
-        
-        cumulative_pnl = np.cumsum(pnl_series)
-        running_max = np.maximum.accumulate(cumulative_pnl)
-        drawdown = (cumulative_pnl - running_max) / np.maximum(running_max, 1)
-        
-        return abs(np.min(drawdown))
+        """计算夏普比率（日化无风险利率，归约在内核里单趟完成）"""
+        return float(_sharpe_kernel(
+            np.ascontiguousarray(returns, dtype=np.float64),
+            risk_free_rate / 365,
+        ))
+
+    def calculate_max_drawdown(self, cumulative_pnl: np.ndarray) -> float:
+        """计算最大回撤
+
+        入参为累计盈亏前缀和（调用方对profit列做一次cumsum得到），
+        不再在内部二次cumsum。回撤相对历史高点计算；高点非正时
+        分母退化为1（按绝对额计），避免负高点把回撤符号算反。
+        """
+        return float(_mdd_kernel(np.ascontiguousarray(cumulative_pnl, dtype=np.float64)))
     
-    def calculate_win_rate(self, trades: List[GridTradeRecord]) -> float:
-        """计算胜率"""
-        if not trades:
+    def calculate_win_rate(self, profits: np.ndarray) -> float:
+        """计算胜率（入参为profit列，盈利笔数占比一次归约算出）"""
+        if len(profits) == 0:
             return 0.0
-        
-        profitable_trades = sum(1 for trade in trades if trade.profit > 0)
-        return profitable_trades / len(trades)
-    
-    def generate_daily_summary(self, target_date: str, current_price: float, 
+
+        return float((profits > 0).mean())
+
+    def generate_daily_summary(self, target_date: str, current_price: float,
                              total_capital: float, grid_config: Dict) -> DailySummary:
         """生成指定日期的汇总报告"""
-        date_obj = datetime.strptime(target_date, '%Y-%m-%d')
-        
-        # 筛选当日交易记录
-        daily_trades = [
-            trade for trade in self.trade_records
-            if trade.timestamp.startswith(target_date)
-        ]
-        
-        # 筛选历史所有交易记录（到目标日期为止）
-        all_trades = [
-            trade for trade in self.trade_records
-            if datetime.strptime(trade.timestamp[:10], '%Y-%m-%d') <= date_obj
-        ]
-        
+        # fromisoformat为C实现，解析ISO日期比strptime快数倍
+        date_obj = datetime.fromisoformat(target_date)
+        cols = self._cols
+
+        # 按日索引直接给出当日行号；截止日前缀在有序日期表上bisect
+        # 定界后拼出行号数组，复杂度只与命中的交易数相关
+        daily_idx = np.asarray(self._trades_by_date.get(target_date, ()), dtype=np.intp)
+        pos = bisect_right(self._dates_sorted, target_date)
+        if pos:
+            all_idx = np.concatenate([
+                np.asarray(self._trades_by_date[d], dtype=np.intp)
+                for d in self._dates_sorted[:pos]
+            ])
+            # 恢复成交顺序（乱序补录时保证前缀和次序正确）
+            all_idx.sort()
+        else:
+            all_idx = np.empty(0, dtype=np.intp)
+
+        profit_all = cols.profit[all_idx]
+        quantity_all = cols.quantity[all_idx]
+        grid_all = cols.grid_code[all_idx]
+        type_all = cols.type_code[all_idx]
+
         # 计算盈亏
-        daily_pnl = sum(trade.profit for trade in daily_trades)
-        total_pnl = sum(trade.profit for trade in all_trades)
-        
+        daily_pnl = float(cols.profit[daily_idx].sum())
+        total_pnl = float(profit_all.sum())
+
         # 计算收益率
         daily_return_rate = daily_pnl / total_capital if total_capital > 0 else 0
         total_return_rate = total_pnl / total_capital if total_capital > 0 else 0
-        
-        # 统计交易次数
-        daily_long_trades = sum(1 for trade in daily_trades if trade.grid_type == 'long')
-        daily_short_trades = sum(1 for trade in daily_trades if trade.grid_type == 'short')
-        long_trades = sum(1 for trade in all_trades if trade.grid_type == 'long')
-        short_trades = sum(1 for trade in all_trades if trade.grid_type == 'short')
-        
-        # 计算持仓（简化计算，实际应根据具体策略调整）
-        long_position = sum(trade.quantity for trade in all_trades 
-                          if trade.grid_type == 'long' and trade.trade_type == 'buy') - \
-                       sum(trade.quantity for trade in all_trades 
-                          if trade.grid_type == 'long' and trade.trade_type == 'sell')
-        
-        short_position = sum(trade.quantity for trade in all_trades 
-                           if trade.grid_type == 'short' and trade.trade_type == 'sell') - \
-                        sum(trade.quantity for trade in all_trades 
-                           if trade.grid_type == 'short' and trade.trade_type == 'buy')
-        
+
+        # 统计交易次数（int8方向码上的掩码计数）
+        daily_grid = cols.grid_code[daily_idx]
+        daily_long_trades = int(np.count_nonzero(daily_grid == 0))
+        daily_short_trades = int(daily_grid.size - daily_long_trades)
+        grid_counts = np.bincount(grid_all, minlength=2)
+        long_trades = int(grid_counts[0])
+        short_trades = int(grid_counts[1])
+
+        # 计算持仓（简化计算，实际应根据具体策略调整）：
+        # 方向码组合成0..3，一次bincount同时得出四个量分量
+        # (0=多/买, 1=多/卖, 2=空/买, 3=空/卖)
+        combo = grid_all.astype(np.intp) * 2 + type_all
+        pos_sums = np.bincount(combo, weights=quantity_all, minlength=4)
+        long_position = float(pos_sums[0] - pos_sums[1])
+        short_position = float(pos_sums[3] - pos_sums[2])
+
         total_position = abs(long_position) + abs(short_position)
-        
-        # 计算风险指标
-        daily_returns = []
-        for i in range(30):  # 最近30天的收益率
-            check_date = (date_obj - timedelta(days=i)).strftime('%Y-%m-%d')
-            day_trades = [t for t in all_trades if t.timestamp.startswith(check_date)]
-            day_pnl = sum(t.profit for t in day_trades)
-            daily_returns.append(day_pnl / total_capital if total_capital > 0 else 0)
-        
+
+        # 计算风险指标：最近30天收益率直接查按日累计的盈亏桶，
+        # 不再对全量交易做30轮日期比较
+        pnl_by_date = self._pnl_by_date
+        if total_capital > 0:
+            daily_returns = [
+                pnl_by_date.get((date_obj - timedelta(days=i)).strftime('%Y-%m-%d'), 0.0) / total_capital
+                for i in range(30)
+            ]
+        else:
+            daily_returns = [0.0] * 30
+
         sharpe_ratio = self.calculate_sharpe_ratio(daily_returns)
-        
-        # 计算最大回撤
-        pnl_series = []
-        for i in range(len(all_trades)):
-            pnl_series.append(sum(t.profit for t in all_trades[:i+1]))
+
+        # 计算最大回撤：直接读写入时维护的累计盈亏列。命中行号为
+        # 连续前缀（正常按时序写入）时取零拷贝切片；乱序补录打断
+        # 前缀时退回对选中利润做一次cumsum
+        if all_idx.size and int(all_idx[-1]) == all_idx.size - 1:
+            pnl_series = cols.cum_pnl[:all_idx.size]
+        else:
+            pnl_series = np.cumsum(profit_all)
         max_drawdown = self.calculate_max_drawdown(pnl_series)
-        
+
         # 计算胜率
-        win_rate = self.calculate_win_rate(all_trades)
-        
+        win_rate = self.calculate_win_rate(profit_all)
+
         # 资金使用情况
         used_capital = total_position * current_price
         available_capital = total_capital - used_capital
-        
+
         return DailySummary(
             date=target_date,
             daily_pnl=daily_pnl,
             total_pnl=total_pnl,
             daily_return_rate=daily_return_rate,
             total_return_rate=total_return_rate,
-            total_trades=len(all_trades),
-            daily_trades=len(daily_trades),
+            total_trades=int(profit_all.size),
+            daily_trades=int(daily_idx.size),
             long_trades=long_trades,
             short_trades=short_trades,
             daily_long_trades=daily_long_trades,
@@ -232,100 +509,96 @@ class GridSummaryModule:
         """保存每日汇总报告"""
         # 保存为JSON格式
         json_file = os.path.join(self.summary_dir, f"summary_{summary.date}.json")
-        with open(json_file, 'w', encoding='utf-8') as f:
-            json.dump(asdict(summary), f, ensure_ascii=False, indent=2)
+        payload = _summary_dict(summary)
+        if orjson is not None:
+            raw = orjson.dumps(payload, option=orjson.OPT_INDENT_2)
+        else:
+            raw = json.dumps(payload, ensure_ascii=False, indent=2).encode('utf-8')
+        with open(json_file, 'wb') as f:
+            f.write(raw)
         
         # 保存为可读格式
         txt_file = os.path.join(self.summary_dir, f"summary_{summary.date}.txt")
         with open(txt_file, 'w', encoding='utf-8') as f:
             f.write(self._format_summary_report(summary))
         
-        # 更新内存中的汇总数据
+        # 更新内存中的汇总数据（新日期同步插入有序日期表）
+        if summary.date not in self.daily_summaries:
+            insort(self._summary_dates, summary.date)
         self.daily_summaries[summary.date] = summary
-        
+
+        # 重写合并索引（每天一次，量级为数百行；先写临时文件再原子改名）
+        self._save_index()
+
         self.logger.info(f"保存每日汇总报告: {summary.date}")
+
+    def _save_index(self):
+        """把全部每日汇总写成单个索引文件，供启动时一次读入"""
+        try:
+            index = {date: _summary_dict(s) for date, s in self.daily_summaries.items()}
+            tmp_file = self._index_file + '.tmp'
+            if orjson is not None:
+                raw = orjson.dumps(index)
+            else:
+                raw = json.dumps(index, ensure_ascii=False).encode('utf-8')
+            with open(tmp_file, 'wb') as f:
+                f.write(raw)
+            os.replace(tmp_file, self._index_file)
+        except Exception as e:
+            self.logger.error(f"保存汇总索引失败: {e}")
     
     def _format_summary_report(self, summary: DailySummary) -> str:
         """格式化汇总报告为可读文本"""
-        report = f"""
-==========================================
-网格交易策略每日汇总报告
-日期: {summary.date}
-==========================================
-
-📊 盈亏情况
-├─ 当日盈亏: {summary.daily_pnl:,.2f} USDT
-├─ 总盈亏: {summary.total_pnl:,.2f} USDT
-├─ 当日收益率: {summary.daily_return_rate:.4%}
-└─ 总收益率: {summary.total_return_rate:.4%}
-
-📈 交易统计
-├─ 总交易次数: {summary.total_trades}
-├─ 当日交易次数: {summary.daily_trades}
-├─ 做多交易次数: {summary.long_trades} (当日: {summary.daily_long_trades})
-└─ 做空交易次数: {summary.short_trades} (当日: {summary.daily_short_trades})
-
-💰 持仓情况
-├─ 总持仓量: {summary.total_position:.4f}
-├─ 做多持仓: {summary.long_position:.4f}
-└─ 做空持仓: {summary.short_position:.4f}
-
-⚡ 风险指标
-├─ 夏普比率: {summary.sharpe_ratio:.4f}
-├─ 最大回撤: {summary.max_drawdown:.4%}
-└─ 胜率: {summary.win_rate:.4%}
-
-🔧 网格状态
-├─ 活跃网格数: {summary.active_grids}
-├─ 网格间距: {summary.grid_spacing:.4f}
-└─ 当前价格: {summary.current_price:.4f}
-
-💵 资金使用
-├─ 总资金: {summary.total_capital:,.2f} USDT
-├─ 已用资金: {summary.used_capital:,.2f} USDT
-└─ 可用资金: {summary.available_capital:,.2f} USDT
-
-==========================================
-报告生成时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
-==========================================
-"""
-        return report
+        values = _summary_dict(summary)
+        values['now'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        return _REPORT_TPL.format_map(values)
     
     def cleanup_old_reports(self, days_to_keep: int = 30):
         """清理超过指定天数的旧报告"""
-        cutoff_date = datetime.now() - timedelta(days=days_to_keep)
-        
-        for filename in os.listdir(self.summary_dir):
-            if filename.startswith('summary_') and (filename.endswith('.json') or filename.endswith('.txt')):
-                try:
-                    # 从文件名提取日期
-                    date_str = filename.split('_')[1].split('.')[0]
-                    file_date = datetime.strptime(date_str, '%Y-%m-%d')
-                    
-                    if file_date < cutoff_date:
-                        file_path = os.path.join(self.summary_dir, filename)
-                        os.remove(file_path)
+        # ISO日期（YYYY-MM-DD）字典序与时间序一致，
+        # 直接字符串比较即可，无需对每个文件名strptime
+        cutoff_str = (datetime.now() - timedelta(days=days_to_keep)).strftime('%Y-%m-%d')
+
+        with os.scandir(self.summary_dir) as entries:
+            for entry in entries:
+                filename = entry.name
+                if filename.startswith('summary_') and (filename.endswith('.json') or filename.endswith('.txt')):
+                    # 文件名固定为 summary_YYYY-MM-DD.json/.txt，日期位于[8:18]
+                    date_str = filename[8:18]
+                    if date_str < cutoff_str:
+                        os.unlink(entry.path)
                         self.logger.info(f"删除过期报告: {filename}")
-                        
+
                         # 从内存中移除
                         if date_str in self.daily_summaries:
                             del self.daily_summaries[date_str]
-                            
-                except (ValueError, IndexError) as e:
-                    self.logger.warning(f"无法解析文件日期: {filename}, 错误: {e}")
+                            self._summary_dates.remove(date_str)
+
+        # 同步合并索引，避免索引里残留已清理日期
+        self._save_index()
     
     def _load_historical_data(self):
-        """加载历史汇总数据"""
+        """加载历史汇总数据
+
+        优先从合并索引一次读入全部汇总；索引不存在（首次运行或
+        旧目录）时退回逐日JSON文件扫描。
+        """
         try:
-            for filename in os.listdir(self.summary_dir):
-                if filename.startswith('summary_') and filename.endswith('.json'):
-                    date_str = filename.split('_')[1].split('.')[0]
-                    file_path = os.path.join(self.summary_dir, filename)
-                    
-                    with open(file_path, 'r', encoding='utf-8') as f:
-                        data = json.load(f)
-                        self.daily_summaries[date_str] = DailySummary(**data)
-                        
+            loads = orjson.loads if orjson is not None else json.loads
+            if os.path.exists(self._index_file):
+                with open(self._index_file, 'rb') as f:
+                    index = loads(f.read())
+                for date_str, data in index.items():
+                    self.daily_summaries[date_str] = DailySummary(**data)
+            else:
+                for filename in os.listdir(self.summary_dir):
+                    if filename.startswith('summary_') and filename.endswith('.json'):
+                        date_str = filename.split('_')[1].split('.')[0]
+                        file_path = os.path.join(self.summary_dir, filename)
+
+                        with open(file_path, 'rb') as f:
+                            self.daily_summaries[date_str] = DailySummary(**loads(f.read()))
+
             self.logger.info(f"加载历史汇总数据: {len(self.daily_summaries)} 条记录")
         except Exception as e:
             self.logger.error(f"加载历史数据失败: {e}")
@@ -335,16 +608,21 @@ class GridSummaryModule:
         return self.daily_summaries.get(date)
     
     def get_recent_summaries(self, days: int = 7) -> List[DailySummary]:
-        """获取最近几天的汇总数据"""
-        end_date = datetime.now()
-        summaries = []
-        
-        for i in range(days):
-            date = (end_date - timedelta(days=i)).strftime('%Y-%m-%d')
-            if date in self.daily_summaries:
-                summaries.append(self.daily_summaries[date])
-        
-        return summaries
+        """获取最近几天的汇总数据（按日期升序）"""
+        cutoff = (datetime.now() - timedelta(days=days - 1)).strftime('%Y-%m-%d')
+        i = bisect_left(self._summary_dates, cutoff)
+        return [self.daily_summaries[d] for d in self._summary_dates[i:]]
+
+# 全局汇总模块实例：延迟到首次访问时构建（PEP 562模块__getattr__），
+# 仅导入本模块不再触发建目录、打开日志文件和扫描历史数据；
+# `from grid_summary_module import grid_summary` 的用法保持不变
+_instance: Optional[GridSummaryModule] = None
+
 
-# 全局汇总模块实例
-grid_summary = GridSummaryModule()
\ No newline at end of file
+def __getattr__(name: str):
+    if name == 'grid_summary':
+        global _instance
+        if _instance is None:
+            _instance = GridSummaryModule()
+        return _instance
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
\ No newline at end of file